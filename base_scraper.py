@@ -5,50 +5,202 @@ import hashlib
 import logging
 import re
 import time
-from datetime import datetime
-from typing import Dict, List, Optional, Set
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from typing import Dict, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
 from bs4 import BeautifulSoup
 
+import metrics
+from circuit_breaker import get_circuit_breaker
+from config import ScrapingConfig
+from frontier import create_frontier, new_run_id
+from http_transport import ThreadLocalSession
+from page_cache import CachedPage, PageCache
+from profiling import stage
+from rate_limiter import AdaptiveRateLimiter, get_rate_limiter, parse_retry_after
+from recrawl import parse_http_date, parse_iso_datetime
+from retry_queue import RetryQueue
+from url_canonicalizer import canonical_url_from_soup, canonicalize_url
+from url_registry import create_url_registry
+from warc_archive import get_warc_archive
+
 logger = logging.getLogger(__name__)
 
+# Respuestas que indican que el servidor pide bajar el ritmo
+THROTTLE_STATUS = (429, 503)
+
+# Paginación WordPress (/page/N/ o ?paged=N) y rutas de sección
+PAGINATION_RE = re.compile(r'/page/(\d+)/?$')
+PAGED_PARAM_RE = re.compile(r'(?:^|&)paged?=(\d+)')
+SECTION_RE = re.compile(r'/(?:categoria|category|seccion|section)/')
+
+# Zona horaria de las fechas publicadas (sin tzdata se usa la de Perú, UTC-5 sin horario de verano)
+try:
+    SOURCE_TZ = ZoneInfo(ScrapingConfig.SOURCE_TIMEZONE)
+except ZoneInfoNotFoundError:
+    SOURCE_TZ = timezone(timedelta(hours=-5))
+
 class BaseNewsScraper:
     """Clase base para todos los scrapers de noticias"""
     
-    def __init__(self, source_name: str, base_url: str, delay: int = 2):
+    def __init__(self, source_name: str, base_url: str, delay: float = 2, source_key: str = None,
+                 min_delay: float = None, max_delay: float = None,
+                 max_rate: float = None, burst: float = None):
         self.source_name = source_name
+        self.source_key = source_key or source_name.replace(' ', '_').lower()
         self.base_url = base_url
+        # Intervalo inicial entre peticiones y límites del limitador adaptativo
         self.delay = delay
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'es-ES,es;q=0.8,en-US;q=0.5,en;q=0.3',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+        self.min_delay = delay if min_delay is None else min_delay
+        self.max_delay = delay if max_delay is None else max_delay
+        # Presupuesto del host para todo el cluster (peticiones/s); None = sin límite global
+        self.max_rate = max_rate
+        self.burst = burst
+        # Sesión por hilo sobre el pool de conexiones compartido del proceso
+        self._sessions = ThreadLocalSession()
+        self.timeout = (ScrapingConfig.CONNECT_TIMEOUT, ScrapingConfig.READ_TIMEOUT)
         
         # URLs ya procesadas para evitar duplicados
         self.processed_urls: Set[str] = set()
-        
-    def make_request(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
-        """Realizar petición HTTP con reintentos"""
+        # Registro compartido entre workers (se crea al primer scrape_news)
+        self.url_registry = None
+        # Ejecución a la que pertenece el descubrimiento (comparte la frontera Redis)
+        self.run_id: Optional[str] = None
+        # Intentos por petición (scrape_news usa 1 y agenda los reintentos en su cola)
+        self.request_attempts = ScrapingConfig.MAX_RETRIES
+        # Último fallo de make_request: {'url', 'status', 'retry_after', 'transient', 'skipped'}
+        # (y 'deferred' cuando no se pidió porque el host sigue bajo Retry-After)
+        self.last_failure: Optional[Dict] = None
+        # Última respuesta obtenida (red o caché), para leer sus cabeceras
+        self.last_page: Optional[CachedPage] = None
+        # Circuit breaker de la fuente y límite de tiempo (epoch) fijado por el gestor
+        self.breaker = get_circuit_breaker(source_name)
+        self.deadline: Optional[float] = None
+        # Páginas descargadas, compartidas entre descubrimiento y extracción
+        self.page_cache = PageCache()
+        
+    @property
+    def session(self) -> requests.Session:
+        """Sesión HTTP del hilo actual"""
+        return self._sessions.get()
+    
+    def time_left(self) -> Optional[float]:
+        """Segundos que quedan del presupuesto de tiempo (None si no hay límite)"""
+        return None if self.deadline is None else self.deadline - time.time()
+    
+    def should_stop(self) -> bool:
+        """True si la fuente agotó su presupuesto de tiempo o su circuito está abierto"""
+        time_left = self.time_left()
+        return self.breaker.is_open() or (time_left is not None and time_left <= 0)
+    
+    def get_rate_limiter(self, host: str) -> AdaptiveRateLimiter:
+        """Limitador adaptativo compartido para un host"""
+        return get_rate_limiter(host, self.delay, self.min_delay, self.max_delay,
+                                self.max_rate, self.burst)
+    
+    def make_request(self, url: str, retries: int = None) -> Optional[BeautifulSoup]:
+        """Realizar petición HTTP con reintentos, espaciada por el limitador del host"""
+        host = urlparse(url).netloc
+        limiter = self.get_rate_limiter(host)
+        retries = retries or self.request_attempts
+        self.last_failure = None
+        
+        # Página ya descargada en esta ejecución (p. ej. durante el descubrimiento)
+        cached = self.page_cache.get(url)
+        if cached is not None:
+            metrics.PAGE_CACHE_REQUESTS.labels(fuente=self.source_name, resultado='hit').inc()
+            self.last_page = cached
+            return self.parse_html(cached.content)
+        metrics.PAGE_CACHE_REQUESTS.labels(fuente=self.source_name, resultado='miss').inc()
+        
+        status, retry_after = None, None
         for attempt in range(retries):
+            # Un Retry-After más largo que el intervalo máximo no se espera bloqueando
+            # el hilo: la URL vuelve a la cola de reintentos para cuando venza. Se
+            # mira antes que el circuito para no tomar la prueba del semiabierto
+            # sin llegar a enviarla
+            blocked = limiter.blocked_for()
+            if blocked > limiter.max_delay:
+                self.last_failure = {'url': url, 'status': status, 'retry_after': blocked,
+                                     'transient': True, 'skipped': False, 'deferred': True}
+                logger.info(f"[{self.source_name}] {host} pidió esperar {blocked:.0f}s, se difiere {url}")
+                return None
+            # Fuente caída o sin tiempo: omitir sin tocar la red
+            time_left = self.time_left()
+            if (time_left is not None and time_left <= 0) or not self.breaker.allow_request():
+                self.last_failure = {'url': url, 'status': None, 'retry_after': None,
+                                     'transient': True, 'skipped': True}
+                logger.debug(f"[{self.source_name}] Petición omitida (circuito abierto o sin tiempo): {url}")
+                return None
+            if attempt:
+                metrics.REQUEST_RETRIES.labels(fuente=self.source_name, host=host).inc()
+            
+            # El limitador reemplaza los sleeps fijos y el backoff de los reintentos
+            limiter.wait()
+            timeout = self.timeout
+            if time_left is not None:
+                # La lectura no puede exceder el presupuesto restante
+                timeout = (self.timeout[0], max(1.0, min(self.timeout[1], time_left)))
+            start = time.perf_counter()
+            response = None
             try:
-                response = self.session.get(url, timeout=30)
+                with stage('fetch'):
+                    response = self.session.get(url, timeout=timeout)
+                elapsed = time.perf_counter() - start
+                metrics.observe_response(self.source_name, host, response.status_code, elapsed)
+                status = response.status_code
+                if status >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if status in THROTTLE_STATUS:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    limiter.record_throttle(retry_after)
+                elif status >= 500:
+                    # Un origen que falla no debe recibir más tráfico (sin aumento aditivo)
+                    limiter.record_error()
+                else:
+                    limiter.record_response(elapsed)
                 response.raise_for_status()
-                response.encoding = response.apparent_encoding or 'utf-8'
-                return BeautifulSoup(response.content, 'html.parser')
+                
+                self.last_page = CachedPage(url, response.content, status, dict(response.headers))
+                # Las portadas y listados no se vuelven a pedir en la extracción
+                if self.is_news_url(url):
+                    self.page_cache.put(self.last_page)
+                return self.parse_html(response.content)
+            except requests.HTTPError as e:
+                logger.warning(f"Intento {attempt + 1} fallido para {url}: {e}")
+                # Los 4xx (salvo 408/429) no cambian al reintentar
+                if 400 <= status < 500 and status not in (408, 429):
+                    self.last_failure = {'url': url, 'status': status, 'retry_after': None,
+                                         'transient': False, 'skipped': False}
+                    return None
             except Exception as e:
+                if response is None:
+                    metrics.observe_response(self.source_name, host, 'error',
+                                             time.perf_counter() - start)
+                    limiter.record_error()
+                    self.breaker.record_failure()
                 logger.warning(f"Intento {attempt + 1} fallido para {url}: {e}")
-                if attempt < retries - 1:
-                    time.sleep(2 ** attempt)  # Backoff exponencial
-        logger.error(f"No se pudo acceder a {url} después de {retries} intentos")
+        self.last_failure = {'url': url, 'status': status, 'retry_after': retry_after,
+                             'transient': True, 'skipped': False}
+        if retries > 1:
+            logger.error(f"No se pudo acceder a {url} después de {retries} intentos")
         return None
     
+    def parse_html(self, content: bytes) -> BeautifulSoup:
+        """Parsear HTML (BeautifulSoup detecta la codificación desde los bytes)"""
+        parse_start = time.perf_counter()
+        with stage('parse'):
+            soup = BeautifulSoup(content, 'html.parser')
+        metrics.HTML_PARSE_SECONDS.labels(fuente=self.source_name).observe(
+            time.perf_counter() - parse_start
+        )
+        return soup
+    
     def is_news_url(self, url: str) -> bool:
         """Verificar si una URL es de noticia (implementar en subclases)"""
         raise NotImplementedError("Subclases deben implementar is_news_url")
@@ -61,6 +213,22 @@ class BaseNewsScraper:
         """Extraer datos de una noticia específica (implementar en subclases)"""
         raise NotImplementedError("Subclases deben implementar extract_news_data")
     
+    def canonicalize_urls(self, urls) -> List[str]:
+        """Canonicalizar URLs eliminando las variantes duplicadas (conserva el orden)"""
+        return list(dict.fromkeys(canonicalize_url(url) for url in urls))
+    
+    def extract_canonical_url(self, soup: BeautifulSoup, url: str) -> str:
+        """URL canónica del artículo según rel=canonical / og:url
+        
+        Un canonical a la portada o a una sección (sitios mal configurados) haría
+        que todos sus artículos se guarden sobre una sola fila: solo se acepta si
+        es una URL de artículo de la fuente.
+        """
+        home = canonicalize_url(self.base_url)
+        return canonical_url_from_soup(
+            soup, url, accept=lambda candidate: candidate != home and self.is_news_url(candidate)
+        )
+    
     def extract_title(self, soup: BeautifulSoup) -> str:
         """Extraer título del artículo"""
         title_selectors = [
@@ -76,7 +244,7 @@ class BaseNewsScraper:
         return "Sin título"
     
     def extract_date_time(self, soup: BeautifulSoup) -> tuple:
-        """Extraer fecha y hora del artículo"""
+        """Extraer fecha y hora del artículo ('' en lo que la página no indique)"""
         fecha, hora = "", ""
         
         # Buscar en meta tags primero
@@ -125,7 +293,19 @@ class BaseNewsScraper:
                     if fecha or hora:
                         break
         
-        return fecha or datetime.now().strftime('%Y-%m-%d'), hora or "00:00:00"
+        # Los valores por defecto los pone format_news_data: así se distinguen de los extraídos
+        return fecha, hora
+    
+    def extract_modified_time(self, soup: BeautifulSoup, url: str) -> Optional[str]:
+        """Última modificación del artículo (ISO 8601): meta de la página o Last-Modified"""
+        modified_meta = soup.find('meta', {'property': 'article:modified_time'}) or \
+                        soup.find('meta', {'property': 'og:updated_time'}) or \
+                        soup.find('meta', {'itemprop': 'dateModified'})
+        modified = parse_iso_datetime(modified_meta.get('content')) if modified_meta else None
+        if not modified and self.last_page is not None and self.last_page.url == url:
+            headers = {key.lower(): value for key, value in self.last_page.headers.items()}
+            modified = parse_http_date(headers.get('last-modified'))
+        return modified
     
     def extract_content(self, soup: BeautifulSoup) -> str:
         """Extraer contenido del artículo"""
@@ -324,10 +504,12 @@ class BaseNewsScraper:
         tags_str = ', '.join(raw_data.get('tags', []))
         images_str = '; '.join(raw_data.get('link_imagenes', []))
         
+        # Sin fecha en la página se guarda la de hoy, pero published_at queda vacío
+        # y el hash de contenido no la cuenta (ver recrawl.content_hash)
         return {
             'titulo': raw_data.get('titulo', ''),
-            'fecha': raw_data.get('fecha', ''),
-            'hora': raw_data.get('hora', ''),
+            'fecha': raw_data.get('fecha') or datetime.now().strftime('%Y-%m-%d'),
+            'hora': raw_data.get('hora') or '00:00:00',
             'resumen': raw_data.get('resumen', ''),
             'contenido': raw_data.get('contenido', ''),
             'categoria': raw_data.get('categoria', ''),
@@ -335,37 +517,259 @@ class BaseNewsScraper:
             'tags': tags_str,
             'url': raw_data.get('url', ''),
             'link_imagenes': images_str,
-            'fuente': self.source_name
+            'fuente': self.source_name,
+            'modified_at': raw_data.get('modified_at') or '',
+            'published_at': self.published_at(raw_data.get('fecha'), raw_data.get('hora'))
         }
     
+    def published_at(self, fecha: str, hora: str) -> str:
+        """Fecha y hora locales del sitio como ISO 8601 con zona horaria ('' si no se entienden)"""
+        try:
+            published = datetime.strptime(f"{fecha} {hora or '00:00:00'}", '%Y-%m-%d %H:%M:%S')
+        except (TypeError, ValueError):
+            return ''
+        return published.replace(tzinfo=SOURCE_TZ).isoformat()
+    
     def discover_news_urls(self, max_pages: int = 50) -> List[str]:
         """Descubrir URLs de noticias (implementar en subclases)"""
         raise NotImplementedError("Subclases deben implementar discover_news_urls")
     
-    def scrape_news(self, urls: List[str]) -> List[Dict]:
-        """Scrapear noticias de una lista de URLs"""
-        news_data = []
-        
-        for i, url in enumerate(urls, 1):
-            if url in self.processed_urls:
-                continue
+    def create_frontier(self):
+        """Crear la frontera de descubrimiento de esta fuente"""
+        return create_frontier(self.source_key, self.run_id)
+    
+    def start_run(self, run_id: str = None):
+        """Empezar (o continuar) una ejecución; al cambiar de ejecución se olvidan
+        las URLs procesadas en la anterior
+        
+        El scraper vive tanto como el worker: sin esto processed_urls crecería sin
+        límite y una URL quedaría omitida para siempre. Entre ejecuciones el
+        registro de URLs (con TTL) es el que evita repetir artículos.
+        """
+        run_id = run_id or new_run_id()
+        if run_id != self.run_id:
+            self.processed_urls.clear()
+        self.run_id = run_id
+    
+    def discovery_priority(self, url: str) -> float:
+        """Prioridad de visita en el descubrimiento (mayor = antes)"""
+        path = urlparse(url).path.lower()
+        page = 1
+        match = PAGINATION_RE.search(path) or PAGED_PARAM_RE.search(urlparse(url).query)
+        if match:
+            page = int(match.group(1))
+            path = PAGINATION_RE.sub('/', path)
+        
+        score = 0.0
+        if self.is_news_url(url):
+            # Artículo: cuenta como encontrado y queda en caché para la extracción
+            score += 2.0
+        elif SECTION_RE.search(path):
+            # Portada de sección: concentra las noticias más recientes del tema
+            score += 1.0
+        # Cuanto más profunda la paginación o la ruta, más antiguo o marginal el contenido
+        score -= 0.25 * min(page - 1, 20)
+        score -= 0.1 * len([segment for segment in path.split('/') if segment])
+        return score
+    
+    def enqueue_urls(self, frontier, urls: List[str]):
+        """Encolar URLs nuevas en la frontera según su prioridad"""
+        for url in urls:
+            frontier.push(url, self.discovery_priority(url))
+    
+    def scrape_news(self, urls: List[str]) -> Tuple[List[Dict], List[str]]:
+        """Scrapear noticias de una lista de URLs; los fallos transitorios se reintentan sin bloquear
+        
+        Devuelve las noticias y las URLs extraídas. Estas siguen reclamadas: quien
+        guarda las noticias llama a confirm_urls para completarlas o liberarlas.
+        """
+        news_data, extracted_urls = [], []
+        start = time.perf_counter()
+        queue_depth = metrics.QUEUE_DEPTH.labels(fuente=self.source_name)
+        # Un registro local pasa al de Redis si Redis volvió desde la última vez
+        self.url_registry = create_url_registry(self.url_registry)
+        retries = RetryQueue()
+        
+        # Un intento por petición: en lugar de esperar, el fallo va a la cola de reintentos
+        self.request_attempts = 1
+        try:
+            for i, url in enumerate(urls, 1):
+                queue_depth.set(len(urls) - i + len(retries))
+                if self.should_stop():
+                    logger.warning(f"[{self.source_name}] Circuito abierto o tiempo agotado: "
+                                   f"se omiten {len(urls) - i + 1} URLs")
+                    break
+                
+                # Primero los reintentos que ya vencieron
+                due = retries.pop_due()
+                while due:
+                    self._scrape_claimed_url(*due, news_data, extracted_urls, retries)
+                    due = retries.pop_due()
+                
+                if url in self.processed_urls:
+                    continue
+                
+                # Falló en demasiadas ejecuciones (o dio 404/410): no insistir
+                if self.url_registry.is_dead(url):
+                    metrics.ARTICLES_PROCESSED.labels(fuente=self.source_name, resultado='descartada').inc()
+                    logger.debug(f"[{self.source_name}] URL descartada por fallos previos: {url}")
+                    continue
                 
-            logger.info(f"[{self.source_name}] Procesando {i}/{len(urls)}: {url}")
+                # Otro worker ya la tiene o ya la completó
+                if not self.url_registry.claim(url):
+                    metrics.ARTICLES_PROCESSED.labels(fuente=self.source_name, resultado='reclamada').inc()
+                    logger.debug(f"[{self.source_name}] URL reclamada por otro worker: {url}")
+                    continue
+                    
+                logger.info(f"[{self.source_name}] Procesando {i}/{len(urls)}: {url}")
+                self._scrape_claimed_url(url, 0, news_data, extracted_urls, retries)
             
+            # Reintentos pendientes al agotar la lista
+            while retries and not self.should_stop():
+                time_left = self.time_left()
+                if time_left is not None and retries.next_wait() > time_left:
+                    # Vencen después del presupuesto: quedan para otra ejecución
+                    logger.info(f"[{self.source_name}] {len(retries)} reintentos vencen fuera del presupuesto")
+                    break
+                queue_depth.set(len(retries))
+                self._scrape_claimed_url(*retries.pop_wait(), news_data, extracted_urls, retries)
+        finally:
+            self.request_attempts = ScrapingConfig.MAX_RETRIES
+            # Reintentos que ya no se harán: liberar sus reclamos para otra ejecución
+            for url, _ in retries.drain():
+                self.url_registry.release(url)
+        
+        queue_depth.set(0)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            metrics.ARTICLES_PER_MINUTE.labels(fuente=self.source_name).set(
+                len(news_data) * 60 / elapsed
+            )
+        
+        return news_data, extracted_urls
+    
+    def confirm_urls(self, urls: List[str], saved: bool):
+        """Completar en el registro las URLs cuyas noticias se guardaron, o liberarlas si falló el guardado
+        
+        Completar antes de guardar dejaría una noticia perdida durante URL_DONE_TTL
+        si la BD falla; liberadas, otra ejecución las vuelve a reclamar.
+        """
+        for url in urls:
+            if saved:
+                self.url_registry.complete(url)
+            else:
+                self.processed_urls.discard(url)
+                self.url_registry.release(url)
+    
+    def recheck_news(self, urls: List[str]) -> Tuple[List[Dict], List[str]]:
+        """Volver a extraer noticias ya guardadas para detectar cambios
+        
+        No pasa por el registro de URLs (ya están completadas). Devuelve las
+        noticias extraídas y las URLs que no se pudieron extraer.
+        """
+        news_data, failed = [], []
+        for i, url in enumerate(urls):
+            if self.should_stop():
+                logger.warning(f"[{self.source_name}] Revisión interrumpida, quedan {len(urls) - i} URLs")
+                break
             try:
-                news_item = self.extract_news_data(url)
-                if news_item and news_item.get('titulo'):
-                    formatted_data = self.format_news_data(news_item)
-                    news_data.append(formatted_data)
-                    self.processed_urls.add(url)
-                    logger.info(f"[{self.source_name}] Noticia extraída: {news_item['titulo'][:50]}...")
-                else:
-                    logger.warning(f"[{self.source_name}] No se pudo extraer datos de {url}")
-                    
+                with stage('extract'):
+                    news_item = self.extract_news_data(url)
             except Exception as e:
-                logger.error(f"[{self.source_name}] Error procesando {url}: {e}")
-            
-            # Delay entre requests
-            time.sleep(self.delay)
-        
-        return news_data
+                logger.error(f"[{self.source_name}] Error revisando {url}: {e}")
+                news_item = None
+            finally:
+                self.archive_page(url)
+                self.page_cache.pop(url)
+            if news_item and news_item.get('titulo'):
+                news_data.append(self.format_news_data(news_item))
+            else:
+                failed.append(url)
+        return news_data, failed
+    
+    def extract_from_page(self, page: CachedPage) -> Optional[Dict]:
+        """Extraer y formatear una noticia de una página ya descargada (p. ej. del archivo WARC)
+        
+        La página se sirve desde la caché y el presupuesto de tiempo queda en
+        cero mientras tanto, así que extract_news_data nunca toca la red.
+        """
+        deadline, self.deadline = self.deadline, 0
+        self.page_cache.put(page)
+        try:
+            news_item = self.extract_news_data(page.url)
+        finally:
+            self.page_cache.pop(page.url)
+            self.deadline = deadline
+        if news_item and news_item.get('titulo'):
+            return self.format_news_data(news_item)
+        return None
+    
+    def archive_page(self, url: str):
+        """Guardar en el archivo WARC la respuesta del artículo recién procesado
+        
+        También las que fallaron al extraer: son las que un extractor corregido
+        puede recuperar sin volver a descargarlas.
+        """
+        if self.last_page is None or self.last_page.url != url or self.last_page.status != 200:
+            return
+        archive = get_warc_archive()
+        if archive is not None:
+            archive.write(self.last_page, self.source_key)
+    
+    def _scrape_claimed_url(self, url: str, attempt: int, news_data: List[Dict],
+                            extracted_urls: List[str], retries: RetryQueue):
+        """Extraer una URL ya reclamada; si el fallo es transitorio se agenda un reintento"""
+        extract_start = time.perf_counter()
+        self.last_failure = None
+        try:
+            with stage('extract'):
+                news_item = self.extract_news_data(url)
+        except Exception as e:
+            self.url_registry.release(url)
+            metrics.ARTICLES_PROCESSED.labels(fuente=self.source_name, resultado='error').inc()
+            logger.error(f"[{self.source_name}] Error procesando {url}: {e}")
+            return
+        finally:
+            metrics.ARTICLE_EXTRACT_SECONDS.labels(fuente=self.source_name).observe(
+                time.perf_counter() - extract_start
+            )
+            # La página ya se usó: archivarla y liberar su espacio en la caché
+            self.archive_page(url)
+            self.page_cache.pop(url)
+        
+        if news_item and news_item.get('titulo'):
+            formatted_data = self.format_news_data(news_item)
+            news_data.append(formatted_data)
+            self.processed_urls.add(url)
+            # Se completa en el registro recién cuando la noticia quede guardada
+            extracted_urls.append(url)
+            metrics.ARTICLES_PROCESSED.labels(fuente=self.source_name, resultado='extraida').inc()
+            logger.info(f"[{self.source_name}] Noticia extraída: {news_item['titulo'][:50]}...")
+            return
+        
+        failure = self.last_failure if self.last_failure and self.last_failure['url'] == url else None
+        if failure and failure['skipped']:
+            # No es culpa de la URL: queda libre y sin fallo registrado
+            self.url_registry.release(url)
+            metrics.ARTICLES_PROCESSED.labels(fuente=self.source_name, resultado='omitida').inc()
+            return
+        if failure and failure.get('deferred'):
+            # No llegó a pedirse (el host pidió esperar): no gasta un intento
+            retries.schedule(url, attempt, failure['retry_after'])
+            metrics.ARTICLES_PROCESSED.labels(fuente=self.source_name, resultado='reintento').inc()
+            return
+        if failure and failure['transient'] and attempt + 1 < ScrapingConfig.MAX_RETRIES:
+            # El reclamo se conserva hasta el reintento
+            delay = retries.schedule(url, attempt + 1, failure['retry_after'])
+            metrics.ARTICLES_PROCESSED.labels(fuente=self.source_name, resultado='reintento').inc()
+            logger.info(f"[{self.source_name}] Reintento {attempt + 2} de {url} en {delay:.1f}s")
+            return
+        
+        self.url_registry.release(url)
+        if failure:
+            # Se cuenta por ejecución para dejar de intentar enlaces muertos
+            self.url_registry.record_failure(url, permanent=not failure['transient'])
+            metrics.ARTICLES_PROCESSED.labels(fuente=self.source_name, resultado='error').inc()
+        else:
+            metrics.ARTICLES_PROCESSED.labels(fuente=self.source_name, resultado='vacia').inc()
+        logger.warning(f"[{self.source_name}] No se pudo extraer datos de {url}")
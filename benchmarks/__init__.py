@@ -0,0 +1,3 @@
+"""
+Herramientas de benchmark y pruebas de carga sin red
+"""
@@ -0,0 +1,106 @@
+"""
+Presupuesto de tiempo de importación de los puntos de entrada
+
+Cada proceso worker de Celery (y cada ejecución de main.py) paga el import de
+tasks/news_scraper_manager antes de hacer trabajo útil. Este chequeo lo mide en
+un intérprete limpio con `python -X importtime`, lista los módulos más caros y
+falla si se supera el presupuesto o si se cuelan módulos que deben cargarse
+bajo demanda (los scrapers y sus dependencias de parseo).
+
+Uso:
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --module tasks --budget-ms 200 --top 15
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ['tasks', 'news_scraper_manager']
+
+# Módulos que ningún punto de entrada debe importar al arrancar
+FORBIDDEN_PREFIXES = (
+    'pandas',
+    'scrapers.',
+    'base_scraper',
+    'bs4',
+    'lxml',
+    'html5lib',
+)
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def measure(module: str) -> Tuple[int, List[Tuple[str, int, int]]]:
+    """Importar `module` en un intérprete nuevo; devuelve (total_us, [(módulo, propio_us, acumulado_us)])"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{result.stderr[-2000:]}")
+
+    entries = []
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        entries.append((name, int(self_us), int(cumulative_us)))
+        if len(indent) == 1:
+            # Entradas de primer nivel: su acumulado cubre todo lo que arrastran
+            total += int(cumulative_us)
+    return total, entries
+
+
+def check_module(module: str, budget_ms: float, top: int) -> Dict:
+    total_us, entries = measure(module)
+    forbidden = sorted({name for name, _, _ in entries if name.startswith(FORBIDDEN_PREFIXES)})
+    offenders = sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+    return {
+        'module': module,
+        'total_ms': total_us / 1000,
+        'budget_ms': budget_ms,
+        'modules_loaded': len(entries),
+        'forbidden': forbidden,
+        'offenders': [(name, self_us / 1000, cum_us / 1000) for name, self_us, cum_us in offenders],
+        'ok': total_us / 1000 <= budget_ms and not forbidden,
+    }
+
+
+def print_report(report: Dict):
+    status = 'OK' if report['ok'] else 'FALLA'
+    print(f"\n[{status}] import {report['module']}: {report['total_ms']:.1f} ms "
+          f"(presupuesto {report['budget_ms']:.0f} ms, {report['modules_loaded']} módulos)")
+    print(f"{'módulo':<45} {'propio ms':>10} {'acum. ms':>10}")
+    for name, self_ms, cum_ms in report['offenders']:
+        print(f"{name:<45} {self_ms:>10.1f} {cum_ms:>10.1f}")
+    if report['forbidden']:
+        print(f"Importados al arrancar y deberían ser perezosos: {', '.join(report['forbidden'])}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Presupuesto de tiempo de importación')
+    parser.add_argument('--module', action='append',
+                        help=f"Módulo a medir (repetible); por defecto {', '.join(DEFAULT_MODULES)}")
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('IMPORT_BUDGET_MS', 300)),
+                        help='Tiempo máximo de importación por módulo')
+    parser.add_argument('--top', type=int, default=10, help='Cantidad de módulos más caros a listar')
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.module or DEFAULT_MODULES:
+        report = check_module(module, args.budget_ms, args.top)
+        print_report(report)
+        failed = failed or not report['ok']
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
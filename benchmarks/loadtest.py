@@ -0,0 +1,113 @@
+"""
+Prueba de carga de punta a punta de NewsScraperManager contra sitios sintéticos
+
+Ejemplo (10x el volumen habitual, sin delays de cortesía para medir throughput):
+    python -m benchmarks.loadtest --articles 5000 --max-pages 300 --delay 0
+
+Sin --delay se usan los delays configurados y el reporte muestra el intervalo
+mínimo y medio entre peticiones que vio cada sitio (cortesía).
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from prometheus_client import REGISTRY
+
+from benchmarks.synthetic_site import STATS_PATH, add_site_arguments, sites_from_args
+from config import NewsSources, ScrapingConfig
+from http_transport import transport_stats
+
+
+def run(args) -> dict:
+    servers = sites_from_args(args)
+
+    # Apuntar las fuentes al sitio sintético y desactivar las que no participan
+    for source_key, source in NewsSources.SOURCES.items():
+        if source_key in servers:
+            source['base_url'] = servers[source_key].base_url
+            if args.delay is not None:
+                # Intervalo fijo: el limitador adaptativo queda sin margen y sin presupuesto global
+                source.update(delay=args.delay, min_delay=args.delay, max_delay=args.delay, max_rate=None)
+        else:
+            source['enabled'] = False
+    ScrapingConfig.MAX_DISCOVERY_PAGES = args.max_pages
+    ScrapingConfig.DELAY_BETWEEN_SOURCES = 0
+
+    from news_scraper_manager import NewsScraperManager
+
+    manager = NewsScraperManager()
+    if args.with_db and not manager.setup_database():
+        raise RuntimeError("No se pudo configurar la base de datos")
+
+    start = time.perf_counter()
+    try:
+        results = manager.scrape_all_sources()
+    finally:
+        elapsed = time.perf_counter() - start
+        manager.close()
+        for server in servers.values():
+            server.stop()
+
+    report = {'elapsed_seconds': elapsed, 'inserted': results, 'transport': transport_stats(), 'sources': {}}
+    for source_key, server in servers.items():
+        source_name = manager.scrapers[source_key].source_name
+        extracted = REGISTRY.get_sample_value(
+            'news_scraper_articles_total', {'fuente': source_name, 'resultado': 'extraida'}
+        ) or 0
+        report['sources'][source_key] = {
+            'articles_extracted': int(extracted),
+            'articles_per_sec': extracted / elapsed if elapsed else 0.0,
+            'server': server.stats.snapshot(),
+        }
+    return report
+
+
+def print_report(report: dict):
+    print(f"\nTiempo total: {report['elapsed_seconds']:.1f}s")
+    transport = report['transport']
+    print(f"Conexiones abiertas: {transport['connections']} para {transport['requests']} peticiones "
+          f"(reuso keep-alive {transport['reuse_ratio']:.0%})")
+    header = f"{'fuente':<22} {'artículos':>9} {'art/s':>7} {'peticiones':>10} {'req/s':>7} " \
+             f"{'gap min':>8} {'gap medio':>9} {'concurr.':>8}  status"
+    print(header)
+    print('-' * len(header))
+    for source_key, data in report['sources'].items():
+        stats = data['server']
+        min_gap = stats['min_gap_seconds']
+        mean_gap = stats['mean_gap_seconds']
+        print(f"{source_key:<22} {data['articles_extracted']:>9} {data['articles_per_sec']:>7.2f} "
+              f"{stats['requests']:>10} {stats['requests_per_sec']:>7.2f} "
+              f"{(min_gap if min_gap is not None else 0):>8.3f} {(mean_gap if mean_gap is not None else 0):>9.3f} "
+              f"{stats['max_in_flight']:>8}  {stats['status']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Prueba de carga contra sitios sintéticos')
+    add_site_arguments(parser)
+    parser.add_argument('--max-pages', type=int, default=ScrapingConfig.MAX_DISCOVERY_PAGES,
+                        help='Páginas de descubrimiento por fuente')
+    parser.add_argument('--delay', type=float, default=None,
+                        help='Intervalo fijo entre peticiones por host (0 para medir throughput)')
+    parser.add_argument('--with-db', action='store_true', help='Insertar en PostgreSQL (por defecto no)')
+    parser.add_argument('--json', help='Guardar el reporte en JSON')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    if not args.with_db:
+        # Sin BD los intentos de inserción solo generan ruido en el log
+        logging.getLogger('database').setLevel(logging.CRITICAL)
+
+    report = run(args)
+    print_report(report)
+    print(f"\nEstadísticas en vivo de cada sitio: <url>{STATS_PATH}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Benchmark offline de los scrapers sobre fixtures HTML (sin red ni base de datos)
+
+Uso:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --source los_andes --iterations 100 --json resultados.json
+"""
+import argparse
+import copy
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+
+from benchmarks.sitegen import FIXTURES_DIR
+from config import NewsSources, ScrapingConfig
+from scrapers import load_scraper_class
+
+
+class FixtureAdapter(requests.adapters.BaseAdapter):
+    """Adaptador de transporte que responde desde fixtures en disco (404 si no existe)"""
+
+    def __init__(self, pages: Dict[str, bytes]):
+        super().__init__()
+        self.pages = pages
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        content = self.pages.get(request.url)
+        if content is None:
+            response.status_code = 404
+            response._content = b''
+        else:
+            response.status_code = 200
+            response._content = content
+            response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        return response
+
+    def close(self):
+        pass
+
+
+def load_fixtures(source_key: str) -> Dict:
+    source_dir = os.path.join(FIXTURES_DIR, source_key)
+    with open(os.path.join(source_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    with open(os.path.join(source_dir, 'listing.html'), 'rb') as f:
+        manifest['listing_html'] = f.read()
+    with open(os.path.join(source_dir, 'article.html'), 'rb') as f:
+        manifest['article_html'] = f.read()
+    return manifest
+
+
+def measure(func: Callable, iterations: int, setup: Callable = None, units: int = 1) -> Dict:
+    """Medir tiempo por iteración y asignaciones de memoria de una función"""
+    args_per_iteration = [setup() if setup else () for _ in range(iterations + 1)]
+
+    # Pasada de calentamiento sin medir
+    func(*args_per_iteration[0])
+
+    elapsed = 0.0
+    for args in args_per_iteration[1:]:
+        start = time.perf_counter()
+        func(*args)
+        elapsed += time.perf_counter() - start
+
+    # Pasada separada con tracemalloc (su sobrecoste no contamina los tiempos)
+    args = setup() if setup else ()
+    tracemalloc.start()
+    blocks_before = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.reset_peak()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    blocks_after = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.stop()
+
+    per_call = elapsed / iterations
+    return {
+        'iterations': iterations,
+        'mean_ms': per_call * 1000,
+        'per_sec': units / per_call if per_call else float('inf'),
+        'alloc_peak_kib': peak / 1024,
+        'alloc_blocks': blocks_after - blocks_before,
+    }
+
+
+def benchmark_source(source_key: str, iterations: int) -> Dict[str, Dict]:
+    fixtures = load_fixtures(source_key)
+    scraper = load_scraper_class(source_key)()
+    adapter = FixtureAdapter({
+        fixtures['listing_url']: fixtures['listing_html'],
+        fixtures['article_url']: fixtures['article_html'],
+    })
+    scraper.session.mount('http://', adapter)
+    scraper.session.mount('https://', adapter)
+
+    listing_url = fixtures['listing_url']
+    article_url = fixtures['article_url']
+    listing_soup = BeautifulSoup(fixtures['listing_html'], 'html.parser')
+    article_soup = BeautifulSoup(fixtures['article_html'], 'html.parser')
+    hrefs = [urljoin(listing_url, a['href']) for a in listing_soup.select('a[href]')]
+    article_text = article_soup.get_text()
+    raw_item = scraper.extract_news_data(article_url)
+    if not raw_item:
+        raise RuntimeError(f"Fixture de artículo inválido para {source_key}")
+
+    fresh_article = lambda: (copy.copy(article_soup),)
+
+    def is_news_url_all():
+        for href in hrefs:
+            scraper.is_news_url(href)
+
+    results = {
+        'is_news_url': measure(is_news_url_all, iterations, units=len(hrefs)),
+        'extract_news_urls': measure(lambda: scraper.extract_news_urls(listing_soup, listing_url), iterations),
+        'extract_title': measure(scraper.extract_title, iterations, fresh_article),
+        'extract_date_time': measure(scraper.extract_date_time, iterations, fresh_article),
+        'extract_content': measure(scraper.extract_content, iterations, fresh_article),
+        'extract_summary': measure(scraper.extract_summary, iterations, fresh_article),
+        'extract_author': measure(scraper.extract_author, iterations, fresh_article),
+        'extract_category': measure(lambda soup: scraper.extract_category(soup, article_url),
+                                    iterations, fresh_article),
+        'extract_tags': measure(scraper.extract_tags, iterations, fresh_article),
+        'extract_images': measure(lambda soup: scraper.extract_images(soup, article_url),
+                                  iterations, fresh_article),
+        'extract_news_data': measure(lambda: scraper.extract_news_data(article_url), iterations),
+        'clean_text': measure(lambda: scraper.clean_text(article_text), iterations),
+        'format_news_data': measure(lambda: scraper.format_news_data(raw_item), iterations),
+    }
+    # Las operaciones de página completa se reportan en páginas/segundo
+    for name in ('extract_news_urls', 'extract_news_data'):
+        results[name]['unit'] = 'pages/s'
+    return results
+
+
+def print_report(all_results: Dict[str, Dict[str, Dict]]):
+    header = f"{'benchmark':<22} {'media ms':>10} {'por seg':>12} {'pico KiB':>10} {'bloques':>9}"
+    for source_key, results in all_results.items():
+        print(f"\n== {source_key} ==")
+        print(header)
+        print('-' * len(header))
+        for name, r in results.items():
+            unit = r.get('unit', 'ops/s')
+            print(f"{name:<22} {r['mean_ms']:>10.3f} {r['per_sec']:>8.1f} {unit:<5}"
+                  f"{r['alloc_peak_kib']:>8.1f} {r['alloc_blocks']:>9d}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark offline de scrapers')
+    parser.add_argument('--source', choices=sorted(NewsSources.SOURCES), action='append',
+                        help='Fuente a medir (repetible); por defecto todas')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--json', help='Guardar resultados en un archivo JSON')
+    args = parser.parse_args(argv)
+
+    # El logging por artículo distorsiona los tiempos
+    logging.disable(logging.WARNING)
+    # Sin red de por medio el limitador de cortesía solo agregaría esperas
+    for source in NewsSources.SOURCES.values():
+        source.update(delay=0, min_delay=0, max_delay=0, max_rate=None)
+    # Cada iteración de extract_news_data debe medir descarga y parseo, no la caché
+    ScrapingConfig.PAGE_CACHE_BYTES = 0
+
+    all_results = {}
+    for source_key in args.source or sorted(NewsSources.SOURCES):
+        all_results[source_key] = benchmark_source(source_key, args.iterations)
+
+    print_report(all_results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(all_results, f, indent=2)
+        print(f"\nResultados guardados en {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,414 @@
+"""
+Generador determinista de sitios tipo WordPress para las cuatro fuentes
+
+Lo usan los fixtures del benchmark offline y el servidor sintético de pruebas de carga.
+
+Uso para regenerar los fixtures versionados:
+    python -m benchmarks.sitegen --write-fixtures
+"""
+import argparse
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+from config import NewsSources
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+CATEGORIES = [
+    'actualidad', 'politica', 'economia', 'deportes', 'cultura',
+    'sociedad', 'opinion', 'tecnologia', 'salud', 'educacion'
+]
+
+# Nombres sin dígitos para no confundir los patrones "-<id>" de is_news_url
+SUBCATEGORIES = ['regional', 'nacional', 'provincias', 'internacional', 'local', 'especiales']
+
+SITEMAP_PAGE_SIZE = 1000
+FEED_SIZE = 20
+
+# Estructura de URLs de cada sitio (imitando sus permalinks reales)
+SOURCE_LAYOUTS = {
+    'diario_sin_fronteras': {
+        'article': '/{year}/{month}/{day}/{slug}/',
+        'category': '/categoria/{category}/',
+    },
+    'los_andes': {
+        'article': '/{year}/{month}/{day}/{slug}/',
+        'category': '/categoria/{category}/',
+    },
+    'pachamama': {
+        'article': '/{year}/{month}/{day}/{slug}/',
+        'category': '/category/{category}/',
+    },
+    'puno_noticias': {
+        'article': '/noticia/{slug}/',
+        'category': '/categoria/{category}/',
+    },
+}
+
+WORDS = (
+    'puno region gobierno alcalde lago titicaca juliaca comunidad productores '
+    'quinua alpaca festividad candelaria obras carretera salud hospital '
+    'educacion colegio estudiantes policia fiscalia denuncia congreso ministro '
+    'presupuesto inversion agua mineria protesta dirigentes mercado precios '
+    'lluvias heladas agricultura turismo universidad altiplano provincia distrito'
+).split()
+
+AUTHORS = ['Redacción', 'María Quispe', 'Juan Mamani', 'Rosa Condori', 'Luis Apaza']
+
+BASE_DATE = datetime(2024, 5, 12, 8, 30)
+
+
+class SiteGenerator:
+    """Genera listados, artículos y categorías de un sitio de noticias simulado"""
+
+    def __init__(self, source_key: str, base_url: str = None, seed: int = 0,
+                 articles_per_page: int = 20, total_articles: int = 500,
+                 categories: int = 6, subcategories: int = 0):
+        self.source_key = source_key
+        self.source = NewsSources.SOURCES[source_key]
+        self.base_url = base_url or self.source['base_url']
+        self.layout = SOURCE_LAYOUTS[source_key]
+        self.seed = seed
+        self.articles_per_page = articles_per_page
+        self.total_articles = total_articles
+        self.categories = CATEGORIES[:max(1, min(categories, len(CATEGORIES)))]
+        self.subcategories = SUBCATEGORIES[:max(0, min(subcategories, len(SUBCATEGORIES)))]
+        self._article_re = re.compile(r'-(\d+)/$')
+        self._page_re = re.compile(r'^(.*/)page/(\d+)/$')
+
+    def _rng(self, *key) -> random.Random:
+        return random.Random(f"{self.source_key}:{self.seed}:{':'.join(map(str, key))}")
+
+    def _words(self, rng: random.Random, count: int) -> str:
+        return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+    def absolute(self, path: str) -> str:
+        return urljoin(self.base_url, path)
+
+    def article_date(self, article_id: int) -> datetime:
+        # Los artículos más recientes tienen id más alto
+        return BASE_DATE - timedelta(hours=article_id * 3)
+
+    def article_category(self, article_id: int) -> str:
+        return self.categories[article_id % len(self.categories)]
+
+    def article_subcategory(self, article_id: int) -> Optional[str]:
+        if not self.subcategories:
+            return None
+        return self.subcategories[(article_id // len(self.categories)) % len(self.subcategories)]
+
+    def article_slug(self, article_id: int) -> str:
+        # El id al final del slug permite resolver la ruta sin índice en memoria
+        rng = self._rng('slug', article_id)
+        return '-'.join(rng.choice(WORDS) for _ in range(5)) + f"-{article_id}"
+
+    def article_path(self, article_id: int) -> str:
+        date = self.article_date(article_id)
+        return self.layout['article'].format(
+            year=date.strftime('%Y'), month=date.strftime('%m'), day=date.strftime('%d'),
+            slug=self.article_slug(article_id), id=article_id
+        )
+
+    def category_path(self, category: str, page: int = 1, subcategory: str = None) -> str:
+        path = self.layout['category'].format(category=category)
+        if subcategory:
+            path = f"{path}{subcategory}/"
+        return path if page == 1 else f"{path}page/{page}/"
+
+    def home_path(self, page: int = 1) -> str:
+        return '/' if page == 1 else f"/page/{page}/"
+
+    def _menu(self) -> str:
+        items = ''.join(
+            f'<li><a href="{self.absolute(self.category_path(c))}">{c.title()}</a>'
+            + (
+                '<ul class="sub-menu">' + ''.join(
+                    f'<li><a href="{self.absolute(self.category_path(c, subcategory=sub))}">{sub.title()}</a></li>'
+                    for sub in self.subcategories
+                ) + '</ul>' if self.subcategories else ''
+            )
+            + '</li>'
+            for c in self.categories
+        )
+        return (
+            f'<header class="site-header"><a class="logo" href="{self.base_url}">'
+            f'<img src="{self.absolute("/wp-content/uploads/logo.png")}" alt="logo"></a>'
+            f'<nav class="main-menu menu"><ul>{items}</ul></nav></header>'
+        )
+
+    def _footer(self) -> str:
+        return (
+            '<footer class="site-footer"><p>Todos los derechos reservados.</p>'
+            f'<a href="{self.absolute("/contacto/")}">Contacto</a>'
+            f'<a href="{self.absolute("/feed/")}">RSS</a></footer>'
+        )
+
+    def _pagination(self, path_for_page, page: int, total_pages: int) -> str:
+        links = []
+        for n in range(max(1, page - 2), min(total_pages, page + 2) + 1):
+            if n == page:
+                links.append(f'<span class="page-numbers current">{n}</span>')
+            else:
+                links.append(f'<a class="page-numbers" href="{self.absolute(path_for_page(n))}">{n}</a>')
+        if page < total_pages:
+            links.append(
+                f'<a class="next page-numbers" href="{self.absolute(path_for_page(page + 1))}">Siguiente</a>'
+            )
+        return f'<div class="pagination nav-links">{"".join(links)}</div>'
+
+    def _article_teaser(self, article_id: int) -> str:
+        rng = self._rng('teaser', article_id)
+        url = self.absolute(self.article_path(article_id))
+        title = self._words(rng, 8).capitalize()
+        return (
+            f'<article class="post type-post"><div class="post-thumbnail">'
+            f'<a href="{url}"><img src="{self.absolute(f"/wp-content/uploads/thumb-{article_id}.jpg")}"></a></div>'
+            f'<h2 class="entry-title"><a href="{url}">{title}</a></h2>'
+            f'<div class="entry-excerpt"><p>{self._words(rng, 30)}</p></div>'
+            f'<a class="more-link" href="{url}">Leer más</a></article>'
+        )
+
+    def listing_page(self, article_ids: List[int], path_for_page, page: int, total_pages: int,
+                     title: str) -> str:
+        """Página de listado (portada o categoría) con paginación"""
+        teasers = ''.join(self._article_teaser(i) for i in article_ids)
+        return (
+            f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">'
+            f'<title>{title} - {self.source["name"]}</title>'
+            f'<meta name="description" content="Noticias de {self.source["name"]}">'
+            f'<link rel="stylesheet" href="{self.absolute("/wp-content/themes/news/style.css")}">'
+            f'<script>var wpData = {{"ajaxurl": "/wp-admin/admin-ajax.php"}};</script>'
+            f'</head><body class="home blog">{self._menu()}'
+            f'<main class="site-main"><h1 class="page-title">{title}</h1>{teasers}'
+            f'{self._pagination(path_for_page, page, total_pages)}</main>'
+            f'{self._footer()}</body></html>'
+        )
+
+    def article_page(self, article_id: int, related_ids: List[int] = ()) -> str:
+        """Página de artículo individual con metadatos típicos de WordPress"""
+        rng = self._rng('article', article_id)
+        url = self.absolute(self.article_path(article_id))
+        category = self.article_category(article_id)
+        date = self.article_date(article_id)
+        title = self._words(rng, 9).capitalize()
+        summary = self._words(rng, 35).capitalize() + '.'
+        author = rng.choice(AUTHORS)
+        tags = sorted({rng.choice(WORDS) for _ in range(6)})
+        paragraphs = ''.join(
+            f'<p>{self._words(rng, rng.randint(40, 90)).capitalize()}.</p>' for _ in range(8)
+        )
+        images = ''.join(
+            f'<figure><img src="{self.absolute(f"/wp-content/uploads/{date:%Y/%m}/foto-{article_id}-{n}.jpg")}" '
+            f'alt="foto {n}"></figure>' for n in range(3)
+        )
+        tag_links = ''.join(
+            f'<a href="{self.absolute(f"/tag/{tag}/")}" rel="tag">{tag}</a>' for tag in tags
+        )
+        subcategory = self.article_subcategory(article_id)
+        subcategory_crumb = (
+            f'<a href="{self.absolute(self.category_path(category, subcategory=subcategory))}">'
+            f'{subcategory.title()}</a>' if subcategory else ''
+        )
+        related = ''.join(
+            f'<li><h3><a href="{self.absolute(self.article_path(i))}">'
+            f'{self._words(self._rng("teaser", i), 8).capitalize()}</a></h3></li>'
+            for i in related_ids
+        )
+        return (
+            f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">'
+            f'<title>{title} - {self.source["name"]}</title>'
+            f'<meta name="description" content="{summary}">'
+            f'<meta property="og:description" content="{summary}">'
+            f'<meta property="og:url" content="{url}"><link rel="canonical" href="{url}">'
+            f'<meta property="article:published_time" content="{date.isoformat()}-05:00">'
+            f'<meta property="article:modified_time" content="{(date + timedelta(minutes=45)).isoformat()}-05:00">'
+            f'<meta property="article:section" content="{category.title()}">'
+            f'<meta name="author" content="{author}">'
+            f'<meta name="keywords" content="{", ".join(tags)}">'
+            f'<script>window.dataLayer = window.dataLayer || [];</script>'
+            f'<style>.entry-content p {{ margin: 0 0 1em; }}</style>'
+            f'</head><body class="post-template-default single single-post">{self._menu()}'
+            f'<div class="breadcrumb"><a href="{self.base_url}">Inicio</a>'
+            f'<a href="{self.absolute(self.category_path(category))}">{category.title()}</a>'
+            f'{subcategory_crumb}<span>{title}</span></div>'
+            f'<main class="site-main"><article class="post type-post single-post">'
+            f'<h1 class="entry-title">{title}</h1>'
+            f'<div class="entry-meta"><span class="author">Por {author}</span>'
+            f'<time class="entry-date" datetime="{date.isoformat()}">{date:%d/%m/%Y %H:%M}</time></div>'
+            f'<div class="post-thumbnail"><img class="wp-post-image" '
+            f'src="{self.absolute(f"/wp-content/uploads/{date:%Y/%m}/portada-{article_id}.jpg")}"></div>'
+            f'<div class="entry-content">{paragraphs}{images}'
+            f'<script>googletag.cmd.push(function() {{}});</script>'
+            f'<div class="ad">Publicidad</div><div class="social-share">Compartir</div></div>'
+            f'<div class="tags">{tag_links}</div></article>'
+            f'<aside class="sidebar"><h2>Relacionadas</h2><ul>{related}</ul></aside></main>'
+            f'{self._footer()}</body></html>'
+        )
+
+    # --- Sitio completo (servidor sintético) ---
+
+    def total_pages(self, count: int) -> int:
+        return max(1, -(-count // self.articles_per_page))
+
+    def _category_ids(self, category: str, subcategory: str = None) -> range:
+        """Ids de una categoría/subcategoría como progresión aritmética"""
+        n = len(self.categories)
+        c = self.categories.index(category)
+        m = len(self.subcategories) if subcategory else 1
+        s = self.subcategories.index(subcategory) if subcategory else 0
+        start, step = c + n * s, n * m
+        if start == 0:
+            start = step
+        return range(start, self.total_articles + 1, step)
+
+    def _listing(self, ids: range, page: int, path_for_page, title: str) -> Optional[str]:
+        pages = self.total_pages(len(ids))
+        if page > pages:
+            return None
+        first = (page - 1) * self.articles_per_page
+        page_ids = list(ids[first:first + self.articles_per_page])
+        return self.listing_page(page_ids, path_for_page, page, pages, title)
+
+    def sitemap_index(self) -> str:
+        count = self.total_pages_sitemap()
+        entries = ''.join(
+            f'<sitemap><loc>{self.absolute(f"/post-sitemap{n}.xml")}</loc></sitemap>'
+            for n in range(1, count + 1)
+        )
+        entries += f'<sitemap><loc>{self.absolute("/news-sitemap.xml")}</loc></sitemap>'
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+        )
+
+    def total_pages_sitemap(self) -> int:
+        return max(1, -(-self.total_articles // SITEMAP_PAGE_SIZE))
+
+    def sitemap(self, ids) -> str:
+        entries = ''.join(
+            f'<url><loc>{self.absolute(self.article_path(i))}</loc>'
+            f'<lastmod>{self.article_date(i).isoformat()}-05:00</lastmod></url>'
+            for i in ids
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+        )
+
+    def feed(self) -> str:
+        items = ''.join(
+            f'<item><title>{self._words(self._rng("teaser", i), 8).capitalize()}</title>'
+            f'<link>{self.absolute(self.article_path(i))}</link>'
+            f'<pubDate>{self.article_date(i):%a, %d %b %Y %H:%M:%S} -0500</pubDate></item>'
+            for i in range(1, min(FEED_SIZE, self.total_articles) + 1)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f'<title>{self.source["name"]}</title><link>{self.base_url}</link>{items}</channel></rss>'
+        )
+
+    def resolve(self, path: str) -> Tuple[int, str, str]:
+        """Resolver una ruta del sitio: (status, content_type, cuerpo)"""
+        html, xml = 'text/html; charset=utf-8', 'application/xml; charset=utf-8'
+        path = path.split('?', 1)[0].split('#', 1)[0] or '/'
+        not_found = (404, html, '<html><body><h1>404</h1></body></html>')
+
+        if path == '/robots.txt':
+            return 200, 'text/plain', f"User-agent: *\nSitemap: {self.absolute('/sitemap.xml')}\n"
+        if path in ('/sitemap.xml', '/sitemap_index.xml'):
+            return 200, xml, self.sitemap_index()
+        if path == '/news-sitemap.xml':
+            return 200, xml, self.sitemap(range(1, min(100, self.total_articles) + 1))
+        match = re.match(r'^/post-sitemap(\d+)\.xml$', path)
+        if match:
+            n = int(match.group(1))
+            if not 1 <= n <= self.total_pages_sitemap():
+                return not_found
+            first = (n - 1) * SITEMAP_PAGE_SIZE + 1
+            return 200, xml, self.sitemap(range(first, min(first + SITEMAP_PAGE_SIZE, self.total_articles + 1)))
+        if path in ('/feed/', '/feed'):
+            return 200, 'application/rss+xml; charset=utf-8', self.feed()
+
+        # Artículos: el id va al final del slug
+        match = self._article_re.search(path)
+        if match:
+            article_id = int(match.group(1))
+            if 1 <= article_id <= self.total_articles and self.article_path(article_id) == path:
+                related = range(article_id + 1, min(article_id + 11, self.total_articles + 1))
+                return 200, html, self.article_page(article_id, related_ids=related)
+            return not_found
+
+        page = 1
+        match = self._page_re.match(path)
+        if match:
+            path, page = match.group(1), int(match.group(2))
+
+        body = None
+        if path == '/':
+            body = self._listing(range(1, self.total_articles + 1), page, self.home_path, 'Últimas noticias')
+        else:
+            for category in self.categories:
+                for subcategory in [None] + self.subcategories:
+                    if path == self.category_path(category, subcategory=subcategory):
+                        body = self._listing(
+                            self._category_ids(category, subcategory), page,
+                            lambda n, c=category, sc=subcategory: self.category_path(c, n, sc),
+                            (subcategory or category).title()
+                        )
+                        break
+                if body:
+                    break
+
+        return (200, html, body) if body else not_found
+
+
+def write_fixtures(output_dir: str = FIXTURES_DIR):
+    """Escribir un listado y un artículo por fuente, más un manifest con sus URLs"""
+    for source_key in SOURCE_LAYOUTS:
+        generator = SiteGenerator(source_key)
+        source_dir = os.path.join(output_dir, source_key)
+        os.makedirs(source_dir, exist_ok=True)
+
+        listing_ids = list(range(1, generator.articles_per_page + 1))
+        listing_html = generator.listing_page(
+            listing_ids, generator.home_path, page=1, total_pages=25, title='Últimas noticias'
+        )
+        article_id = 7
+        article_html = generator.article_page(article_id, related_ids=range(30, 40))
+
+        with open(os.path.join(source_dir, 'listing.html'), 'w', encoding='utf-8') as f:
+            f.write(listing_html)
+        with open(os.path.join(source_dir, 'article.html'), 'w', encoding='utf-8') as f:
+            f.write(article_html)
+
+        manifest = {
+            'listing_url': generator.base_url,
+            'article_url': generator.absolute(generator.article_path(article_id)),
+        }
+        with open(os.path.join(source_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.write('\n')
+
+        print(f"Fixtures escritos para {source_key} en {source_dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generador de sitios de noticias simulados')
+    parser.add_argument('--write-fixtures', action='store_true',
+                        help='Regenerar los fixtures HTML del benchmark')
+    parser.add_argument('--output-dir', default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    if args.write_fixtures:
+        write_fixtures(args.output_dir)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+Servidor local de sitios de noticias sintéticos para pruebas de carga
+
+Levanta un sitio tipo WordPress por fuente (un puerto por fuente, así cada una
+tiene su propio host) con latencias y errores configurables. Para apuntar los
+scrapers a él basta con sobrescribir las URLs base de NewsSources.SOURCES:
+
+    python -m benchmarks.synthetic_site --articles 5000 --port 8100
+    LOS_ANDES_URL=http://127.0.0.1:8101 python scheduler.py --mode once
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from benchmarks.sitegen import SOURCE_LAYOUTS, SiteGenerator
+
+logger = logging.getLogger(__name__)
+
+STATS_PATH = '/__stats__'
+
+
+class FaultProfile:
+    """Distribución de latencias y tasas de error de un sitio"""
+
+    def __init__(self, latency_ms: float = 80.0, latency_sigma: float = 0.5,
+                 rate_429: float = 0.0, rate_5xx: float = 0.0, rate_timeout: float = 0.0,
+                 timeout_seconds: float = 35.0, retry_after: int = 5, seed: int = None):
+        # Latencia log-normal con mediana latency_ms
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rate_timeout = rate_timeout
+        self.timeout_seconds = timeout_seconds
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Sortear (latencia_segundos, falla) para una petición"""
+        with self._lock:
+            latency = self._rng.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+            roll = self._rng.random()
+            server_error = self._rng.choice((500, 502, 503))
+        if roll < self.rate_timeout:
+            return self.timeout_seconds, 'timeout'
+        roll -= self.rate_timeout
+        if roll < self.rate_429:
+            return latency, 429
+        roll -= self.rate_429
+        if roll < self.rate_5xx:
+            return latency, server_error
+        return latency, None
+
+
+class SiteStats:
+    """Contadores por sitio para medir volumen y cortesía del crawler"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.status = Counter()
+            self.kinds = Counter()
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.min_gap = None
+            self._gap_total = 0.0
+            self._last_arrival = None
+            self.started = time.time()
+
+    def begin(self, kind: str):
+        now = time.perf_counter()
+        with self._lock:
+            self.requests += 1
+            self.kinds[kind] += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            if self._last_arrival is not None:
+                gap = now - self._last_arrival
+                self._gap_total += gap
+                self.min_gap = gap if self.min_gap is None else min(self.min_gap, gap)
+            self._last_arrival = now
+
+    def end(self, status):
+        with self._lock:
+            self.in_flight -= 1
+            self.status[str(status)] += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            elapsed = time.time() - self.started
+            return {
+                'requests': self.requests,
+                'requests_per_sec': self.requests / elapsed if elapsed else 0.0,
+                'status': dict(self.status),
+                'kinds': dict(self.kinds),
+                'max_in_flight': self.max_in_flight,
+                'min_gap_seconds': self.min_gap,
+                'mean_gap_seconds': self._gap_total / (self.requests - 1) if self.requests > 1 else None,
+            }
+
+
+def _request_kind(path: str) -> str:
+    if path.endswith('.xml') or path.startswith('/feed') or path == '/robots.txt':
+        return 'feed'
+    if '/page/' in path:
+        return 'pagination'
+    return 'page'
+
+
+class SyntheticSiteHandler(BaseHTTPRequestHandler):
+    """Manejador HTTP: resuelve la ruta en el generador aplicando el perfil de fallas"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def _send(self, status: int, content_type: str, body: bytes, headers: Dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        server = self.server
+        if self.path == STATS_PATH:
+            body = json.dumps(server.stats.snapshot()).encode('utf-8')
+            self._send(200, 'application/json', body)
+            return
+
+        server.stats.begin(_request_kind(self.path))
+        status = 'error'
+        try:
+            latency, fault = server.faults.draw()
+            time.sleep(latency)
+
+            if fault == 'timeout':
+                # Se deja al cliente esperar más que su timeout y se corta la conexión
+                status = 'timeout'
+                self.close_connection = True
+                return
+            if fault == 429:
+                status = 429
+                self._send(429, 'text/plain', b'Too Many Requests',
+                           {'Retry-After': str(server.faults.retry_after)})
+                return
+            if fault:
+                status = fault
+                self._send(fault, 'text/plain', b'Server Error')
+                return
+
+            status, content_type, body = server.site.resolve(self.path)
+            self._send(status, content_type, body.encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            status = 'client_closed'
+        finally:
+            server.stats.end(status)
+
+
+class SyntheticSiteServer(ThreadingHTTPServer):
+    """Un sitio sintético escuchando en su propio puerto"""
+
+    daemon_threads = True
+
+    def __init__(self, source_key: str, host: str, port: int, faults: FaultProfile, **site_options):
+        super().__init__((host, port), SyntheticSiteHandler)
+        self.source_key = source_key
+        self.base_url = f"http://{host}:{self.server_address[1]}/"
+        self.site = SiteGenerator(source_key, base_url=self.base_url, **site_options)
+        self.faults = faults
+        self.stats = SiteStats()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name=f"site-{self.source_key}", daemon=True)
+        self._thread.start()
+        logger.info(f"Sitio sintético {self.source_key} en {self.base_url}")
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def start_sites(sources: List[str], host: str = '127.0.0.1', base_port: int = 0,
+                faults: Dict = None, **site_options) -> Dict[str, SyntheticSiteServer]:
+    """Levantar un servidor por fuente (puertos consecutivos o aleatorios si base_port=0)"""
+    servers = {}
+    for index, source_key in enumerate(sources):
+        port = base_port + index if base_port else 0
+        server = SyntheticSiteServer(source_key, host, port, FaultProfile(**(faults or {})), **site_options)
+        server.start()
+        servers[source_key] = server
+    return servers
+
+
+def add_site_arguments(parser: argparse.ArgumentParser):
+    """Opciones comunes del sitio sintético (también las usa benchmarks.loadtest)"""
+    parser.add_argument('--sources', nargs='+', choices=sorted(SOURCE_LAYOUTS), default=sorted(SOURCE_LAYOUTS))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--articles', type=int, default=2000, help='Artículos por sitio')
+    parser.add_argument('--per-page', type=int, default=20, help='Artículos por página de listado')
+    parser.add_argument('--categories', type=int, default=10)
+    parser.add_argument('--subcategories', type=int, default=2, help='Subcategorías por categoría')
+    parser.add_argument('--latency-ms', type=float, default=80.0, help='Mediana de latencia')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Dispersión log-normal')
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--rate-5xx', type=float, default=0.0)
+    parser.add_argument('--rate-timeout', type=float, default=0.0)
+    parser.add_argument('--timeout-seconds', type=float, default=35.0)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def sites_from_args(args, base_port: int = 0) -> Dict[str, SyntheticSiteServer]:
+    faults = {
+        'latency_ms': args.latency_ms, 'latency_sigma': args.latency_sigma,
+        'rate_429': args.rate_429, 'rate_5xx': args.rate_5xx,
+        'rate_timeout': args.rate_timeout, 'timeout_seconds': args.timeout_seconds,
+        'seed': args.seed,
+    }
+    return start_sites(
+        args.sources, host=args.host, base_port=base_port, faults=faults,
+        seed=args.seed, articles_per_page=args.per_page, total_articles=args.articles,
+        categories=args.categories, subcategories=args.subcategories
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor de sitios de noticias sintéticos')
+    add_site_arguments(parser)
+    parser.add_argument('--port', type=int, default=8100, help='Puerto de la primera fuente')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    servers = sites_from_args(args, base_port=args.port)
+
+    print("Variables para apuntar los scrapers al sitio sintético:")
+    for source_key, server in servers.items():
+        print(f"  export {source_key.upper()}_URL={server.base_url}")
+    print(f"Estadísticas por sitio en <url>{STATS_PATH}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers.values():
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Circuit breaker por fuente
+
+Tras CIRCUIT_FAILURE_THRESHOLD fallos seguidos (red, timeout o 5xx) el circuito
+se abre y las peticiones a la fuente se omiten sin tocar la red. Pasados
+CIRCUIT_RESET_TIMEOUT segundos se deja pasar una petición de prueba
+(semiabierto): si responde se cierra, si falla vuelve a abrirse.
+"""
+import logging
+import threading
+import time
+from typing import Dict
+
+import metrics
+from config import ScrapingConfig
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Estado cerrado / abierto / semiabierto de una fuente"""
+
+    CLOSED = 'cerrado'
+    OPEN = 'abierto'
+    HALF_OPEN = 'semiabierto'
+
+    # Valor del gauge de Prometheus para cada estado
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int = None, reset_timeout: float = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or ScrapingConfig.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = ScrapingConfig.CIRCUIT_RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._gauge = metrics.CIRCUIT_STATE.labels(fuente=name)
+        self._gauge.set(0)
+
+    def allow_request(self) -> bool:
+        """True si la petición puede salir (en semiabierto, solo una prueba a la vez)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._set_state(self.HALF_OPEN)
+                logger.info(f"[{self.name}] Circuito semiabierto, enviando petición de prueba")
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def is_open(self) -> bool:
+        """True mientras el circuito esté abierto y aún no toque probar"""
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_in_flight = False
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+                logger.info(f"[{self.name}] Circuito cerrado, la fuente responde otra vez")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED
+                                                and self.failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self._set_state(self.OPEN)
+                logger.warning(f"[{self.name}] Circuito abierto tras {self.failures} fallos seguidos; "
+                               f"se omiten peticiones durante {self.reset_timeout:.0f}s")
+
+    def _set_state(self, state: str):
+        self.state = state
+        self._gauge.set(self.STATE_VALUES[state])
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(source_name: str) -> CircuitBreaker:
+    """Circuit breaker del proceso para una fuente (sobrevive entre tareas del worker)"""
+    with _breakers_lock:
+        breaker = _breakers.get(source_name)
+        if breaker is None:
+            breaker = CircuitBreaker(source_name)
+            _breakers[source_name] = breaker
+        return breaker
@@ -15,6 +15,11 @@ class DatabaseConfig:
     DATABASE = os.getenv('DB_NAME', 'news_scraping')
     USER = os.getenv('DB_USER', 'postgres')
     PASSWORD = os.getenv('DB_PASSWORD', '123456')
+    # Segundos sin verificar la conexión antes de hacer SELECT 1 (procesos de larga vida)
+    HEALTH_CHECK_INTERVAL = float(os.getenv('DB_HEALTH_CHECK_INTERVAL', 30))
+    CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 10))
+    # Guardar la versión anterior (delta comprimido) cuando una noticia cambia
+    REVISION_HISTORY = os.getenv('REVISION_HISTORY', 'true').lower() == 'true'
     
     @classmethod
     def get_connection_string(cls):
@@ -29,6 +34,35 @@ class CeleryConfig:
     RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', BROKER_URL)
     TIMEZONE = os.getenv('CELERY_TIMEZONE', 'America/Lima')
     CONCURRENCY = int(os.getenv('CELERY_CONCURRENCY', '2'))
+    # URLs de artículos por tarea en el flujo fan-out
+    ARTICLE_BATCH_SIZE = int(os.getenv('CELERY_ARTICLE_BATCH_SIZE', '10'))
+    # Segundos que un proceso hijo puede tardar en inicializarse (conexión y esquema de BD)
+    PROCESS_INIT_TIMEOUT = float(os.getenv('CELERY_PROCESS_INIT_TIMEOUT', '60'))
+
+class DistributedConfig:
+    """Coordinación entre procesos/workers a través de Redis"""
+    REDIS_URL = os.getenv(
+        'COORDINATION_REDIS_URL',
+        f"redis://{CeleryConfig.REDIS_HOST}:{CeleryConfig.REDIS_PORT}/{CeleryConfig.REDIS_DB}"
+    )
+    KEY_PREFIX = os.getenv('COORDINATION_KEY_PREFIX', 'news')
+    
+    # Registro de URLs reclamadas: cada artículo lo descarga un solo worker
+    URL_CLAIMS_ENABLED = os.getenv('URL_CLAIMS_ENABLED', 'true').lower() == 'true'
+    URL_CLAIM_TTL = int(os.getenv('URL_CLAIM_TTL', '600'))  # segundos
+    URL_DONE_TTL = int(os.getenv('URL_DONE_TTL', str(7 * 24 * 3600)))
+    # Ejecuciones fallidas tras las que una URL se deja de intentar (hasta que venza el TTL)
+    URL_MAX_FAILURES = int(os.getenv('URL_MAX_FAILURES', '3'))
+    URL_FAILURE_TTL = int(os.getenv('URL_FAILURE_TTL', str(7 * 24 * 3600)))
+    
+    # Frontera de descubrimiento: 'redis' (compartida y reanudable) o 'memory'
+    FRONTIER_BACKEND = os.getenv('FRONTIER_BACKEND', 'redis')
+    FRONTIER_TTL = int(os.getenv('FRONTIER_TTL', str(2 * 3600)))
+    # Segundos antes de volver a intentar conectar a Redis tras un fallo
+    REDIS_RETRY_INTERVAL = float(os.getenv('REDIS_RETRY_INTERVAL', '60'))
+    
+    # Presupuesto de peticiones por host para todo el cluster (max_rate/burst en cada fuente)
+    RATE_BUDGET_ENABLED = os.getenv('RATE_BUDGET_ENABLED', 'true').lower() == 'true'
 
 class ScrapingConfig:
     """Configuración general del scraping"""
@@ -36,12 +70,47 @@ class ScrapingConfig:
     DELAY_BETWEEN_REQUESTS = int(os.getenv('DELAY_BETWEEN_REQUESTS', '2'))
     DELAY_BETWEEN_SOURCES = int(os.getenv('DELAY_BETWEEN_SOURCES', '5'))
     
+    # Páginas de listado a explorar por fuente en el descubrimiento
+    MAX_DISCOVERY_PAGES = int(os.getenv('MAX_DISCOVERY_PAGES', '30'))
+    
     # Configuración de threading
     MAX_WORKERS = int(os.getenv('MAX_WORKERS', '3'))
     
-    # Timeouts
-    REQUEST_TIMEOUT = 30
-    MAX_RETRIES = 3
+    # Timeouts (segundos): conexión TCP/TLS y lectura de la respuesta por separado
+    CONNECT_TIMEOUT = float(os.getenv('CONNECT_TIMEOUT', '5'))
+    # REQUEST_TIMEOUT era el timeout único anterior: sigue valiendo como lectura
+    READ_TIMEOUT = float(os.getenv('READ_TIMEOUT', os.getenv('REQUEST_TIMEOUT', '30')))
+    REQUEST_TIMEOUT = READ_TIMEOUT
+    MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
+    
+    # Reintentos diferidos de artículos: backoff exponencial con jitter (segundos)
+    RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', '2'))
+    RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', '60'))
+    
+    # Caché de páginas entre descubrimiento y extracción (tope en MB y antigüedad en segundos)
+    PAGE_CACHE_BYTES = int(float(os.getenv('PAGE_CACHE_MB', '64')) * 1024 * 1024)
+    PAGE_CACHE_TTL = float(os.getenv('PAGE_CACHE_TTL', '900'))
+    
+    # Circuit breaker por fuente: fallos seguidos para abrir y espera hasta la petición de prueba
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', '120'))
+    
+    # Presupuesto de tiempo (segundos, 0 = sin límite); la ejecución debe terminar antes del próximo beat
+    SOURCE_TIME_BUDGET = int(os.getenv('SOURCE_TIME_BUDGET', '1200'))
+    RUN_TIME_BUDGET = int(os.getenv('RUN_TIME_BUDGET', '3300'))
+    
+    # Pool de conexiones HTTP del proceso: hosts distintos y conexiones keep-alive por host
+    POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '10'))
+    POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', str(max(MAX_WORKERS, 4))))
+    
+    # Limitador adaptativo por host (AIMD); piso y techo del intervalo en cada fuente
+    RATE_INCREASE_STEP = float(os.getenv('RATE_INCREASE_STEP', '0.05'))  # peticiones/s por respuesta rápida
+    RATE_DECREASE_FACTOR = float(os.getenv('RATE_DECREASE_FACTOR', '0.5'))  # la tasa se multiplica por esto al frenar
+    RATE_TARGET_LATENCY = float(os.getenv('RATE_TARGET_LATENCY', '2.0'))  # segundos
+    RATE_LATENCY_RISE = float(os.getenv('RATE_LATENCY_RISE', '2.0'))  # latencia / media móvil que cuenta como alza
+    
+    # Zona horaria de las fechas y horas que publican los sitios (published_at)
+    SOURCE_TIMEZONE = os.getenv('SOURCE_TIMEZONE', 'America/Lima')
     
     # Límites
     MAX_IMAGES_PER_ARTICLE = 2
@@ -54,63 +123,119 @@ class ScrapingConfig:
     # Configuración de ejecución recursiva
     EXECUTION_INTERVAL_HOURS = int(os.getenv('EXECUTION_INTERVAL_HOURS', '1'))
 
+class RecrawlConfig:
+    """Revisita de artículos ya guardados para detectar correcciones"""
+    ENABLED = os.getenv('RECRAWL_ENABLED', 'true').lower() == 'true'
+    # Intervalo hasta la próxima revisión = antigüedad del artículo * AGE_FACTOR,
+    # acotado entre MIN_INTERVAL y MAX_INTERVAL (segundos); pasada MAX_AGE no se revisa más
+    AGE_FACTOR = float(os.getenv('RECRAWL_AGE_FACTOR', '0.5'))
+    MIN_INTERVAL = int(os.getenv('RECRAWL_MIN_INTERVAL', str(15 * 60)))
+    MAX_INTERVAL = int(os.getenv('RECRAWL_MAX_INTERVAL', str(24 * 3600)))
+    MAX_AGE = int(os.getenv('RECRAWL_MAX_AGE', str(7 * 24 * 3600)))
+    # Artículos vencidos por ejecución y cada cuántos minutos corre la tarea de Celery
+    BATCH_SIZE = int(os.getenv('RECRAWL_BATCH_SIZE', '200'))
+    SCHEDULE_MINUTES = int(os.getenv('RECRAWL_SCHEDULE_MINUTES', '15'))
+
+class RetentionConfig:
+    """Archivo en frío del contenido de noticias antiguas"""
+    ENABLED = os.getenv('RETENTION_ENABLED', 'true').lower() == 'true'
+    # Días desde la extracción tras los cuales el contenido pasa a la tabla fría
+    HOT_DAYS = int(os.getenv('RETENTION_HOT_DAYS', '365'))
+    # Filas por transacción y tope de lotes por ejecución
+    BATCH_SIZE = int(os.getenv('RETENTION_BATCH_SIZE', '500'))
+    MAX_BATCHES = int(os.getenv('RETENTION_MAX_BATCHES', '200'))
+    COMPRESSION_LEVEL = int(os.getenv('RETENTION_COMPRESSION_LEVEL', '9'))
+    # Hora del día (zona de Celery) en que corre la tarea diaria
+    SCHEDULE_HOUR = int(os.getenv('RETENTION_SCHEDULE_HOUR', '4'))
+
+class ArchiveConfig:
+    """Archivo WARC de las páginas de artículos descargadas (warc_archive.py)"""
+    ENABLED = os.getenv('WARC_ARCHIVE_ENABLED', 'false').lower() == 'true'
+    DIR = os.getenv('WARC_DIR', os.path.join(ScrapingConfig.OUTPUT_DIR, 'warc'))
+    # Tamaño (comprimido) a partir del cual se abre un archivo nuevo
+    MAX_FILE_BYTES = int(float(os.getenv('WARC_MAX_FILE_MB', '1024')) * 1024 * 1024)
+    ZSTD_LEVEL = int(os.getenv('WARC_ZSTD_LEVEL', '9'))
+
+class MetricsConfig:
+    """Configuración de métricas Prometheus"""
+    ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    HOST = os.getenv('METRICS_HOST', '0.0.0.0')
+    # Puerto del scheduler; los procesos del worker Celery usan WORKER_PORT + índice
+    PORT = int(os.getenv('METRICS_PORT', '9100'))
+    WORKER_PORT = int(os.getenv('METRICS_WORKER_PORT', '9101'))
+
+class ProfilingConfig:
+    """Configuración del modo de perfilado (--profile)"""
+    # Intervalo de muestreo de pilas para las salidas .collapsed (segundos)
+    SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.005'))
+
 class NewsSources:
     """Configuración de las fuentes de noticias"""
+    # Las URLs base se pueden sobrescribir (p. ej. para apuntar al sitio sintético de pruebas de carga).
+    # El intervalo entre peticiones a cada host se adapta entre min_delay y max_delay (segundos);
+    # max_rate (peticiones/s) y burst son el presupuesto del host sumando todos los workers.
+    # url_rules: reglas de canonicalización propias (ver url_canonicalizer.py):
+    # trailing_slash, strip_amp (quitar /amp/ y ?amp) y strip_params.
+    # scraper: clase 'modulo.Clase' que se importa solo cuando la fuente se usa.
     SOURCES = {
         'diario_sin_fronteras': {
             'name': 'Diario Sin Fronteras',
-            'base_url': 'https://diariosinfronteras.com.pe/',
+            'scraper': 'scrapers.diario_sin_fronteras_scraper.DiarioSinFronterasScraper',
+            'base_url': os.getenv('DIARIO_SIN_FRONTERAS_URL', 'https://diariosinfronteras.com.pe/'),
             'enabled': True,
-            'delay': 2
+            'delay': 2,  # intervalo inicial
+            'min_delay': 0.5,
+            'max_delay': 30,
+            'max_rate': 1,
+            'burst': 5,
+            # WordPress: respuestas a comentarios, botones de compartir y versión AMP
+            'url_rules': {'trailing_slash': True, 'strip_amp': True,
+                          'strip_params': ['replytocom', 'share', 'nb']}
         },
         'los_andes': {
             'name': 'Los Andes',
-            'base_url': 'https://losandes.com.pe',
+            'scraper': 'scrapers.los_andes_scraper.LosAndesScraper',
+            'base_url': os.getenv('LOS_ANDES_URL', 'https://losandes.com.pe'),
             'enabled': True,
-            'delay': 1
+            'delay': 1,  # intervalo inicial
+            'min_delay': 0.25,
+            'max_delay': 30,
+            'max_rate': 2,
+            'burst': 5,
+            # WordPress: respuestas a comentarios, botones de compartir y versión AMP
+            'url_rules': {'trailing_slash': True, 'strip_amp': True,
+                          'strip_params': ['replytocom', 'share', 'nb']}
         },
         'pachamama': {
             'name': 'Pachamama Radio',
-            'base_url': 'https://pachamamaradio.org/',
+            'scraper': 'scrapers.pachamama_scraper.PachamamaScraper',
+            'base_url': os.getenv('PACHAMAMA_URL', 'https://pachamamaradio.org/'),
             'enabled': True,
-            'delay': 2
+            'delay': 2,  # intervalo inicial
+            'min_delay': 0.5,
+            'max_delay': 30,
+            'max_rate': 1,
+            'burst': 5,
+            # WordPress: respuestas a comentarios, botones de compartir y versión AMP
+            'url_rules': {'trailing_slash': True, 'strip_amp': True,
+                          'strip_params': ['replytocom', 'share', 'nb']}
         },
         'puno_noticias': {
             'name': 'Puno Noticias',
-            'base_url': 'https://punonoticias.pe/',
+            'scraper': 'scrapers.puno_noticias_scraper.PunoNoticiasScraper',
+            'base_url': os.getenv('PUNO_NOTICIAS_URL', 'https://punonoticias.pe/'),
             'enabled': True,
-            'delay': 1
+            'delay': 1,  # intervalo inicial
+            'min_delay': 0.25,
+            'max_delay': 30,
+            'max_rate': 2,
+            'burst': 5,
+            # WordPress: respuestas a comentarios, botones de compartir y versión AMP
+            'url_rules': {'trailing_slash': True, 'strip_amp': True,
+                          'strip_params': ['replytocom', 'share', 'nb']}
         }
     }
 
-class DatabaseSchema:
-    """Esquema de la base de datos"""
-    CREATE_TABLE_SQL = """
-    CREATE TABLE IF NOT EXISTS noticias (
-        id SERIAL PRIMARY KEY,
-        titulo TEXT,
-        fecha TIMESTAMP,
-        hora TIME,
-        resumen TEXT,
-        contenido TEXT,
-        categoria VARCHAR(100),
-        autor VARCHAR(200),
-        tags TEXT,
-        url TEXT UNIQUE,
-        fecha_extraccion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        link_imagenes TEXT,
-        fuente VARCHAR(100),
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    """
-    
-    CREATE_INDEXES_SQL = [
-        "CREATE INDEX IF NOT EXISTS idx_noticias_fuente ON noticias(fuente);",
-        "CREATE INDEX IF NOT EXISTS idx_noticias_fecha ON noticias(fecha);",
-        "CREATE INDEX IF NOT EXISTS idx_noticias_categoria ON noticias(categoria);",
-        "CREATE INDEX IF NOT EXISTS idx_noticias_fecha_extraccion ON noticias(fecha_extraccion);"
-    ]
-
 class LoggingConfig:
     """Configuración de logging"""
     LEVEL = os.getenv('LOG_LEVEL', 'INFO')
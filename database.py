@@ -2,39 +2,253 @@
 Módulo para manejo de la base de datos PostgreSQL
 """
 import logging
+import time
 from typing import Dict, List, Optional
 
 import psycopg2
 import psycopg2.extras
 
-from config import DatabaseConfig, DatabaseSchema
+import migrations
+from config import DatabaseConfig, RetentionConfig
+from recrawl import content_hash, first_check_sql, next_check_sql
+from retention import compress_content, decompress_content
+from revisions import apply_delta, make_delta
+from url_canonicalizer import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
+
+def normalize_tag(tag: str) -> str:
+    """Forma de búsqueda de un tag: minúsculas y espacios simples"""
+    return ' '.join(tag.split()).lower()
+
+
+def split_tags(tags: Optional[str]) -> List[str]:
+    """Tags únicos de la cadena 'a, b, c' que guarda format_news_data"""
+    unique = {}
+    for tag in (tags or '').split(','):
+        tag = normalize_tag(tag)
+        if tag:
+            unique.setdefault(tag, None)
+    return list(unique)
+
+
+def split_images(images: Optional[str]) -> List[str]:
+    """URLs de la cadena 'url1; url2' que guarda format_news_data, en orden"""
+    return [url.strip() for url in (images or '').split(';') if url.strip()]
+
+# Columnas que vienen del scraper (más el hash calculado al guardar)
+NEWS_COLUMNS = (
+    'titulo', 'fecha', 'hora', 'resumen', 'contenido', 'categoria', 'autor',
+    'tags', 'url', 'link_imagenes', 'fuente', 'content_hash', 'modified_at', 'published_at',
+)
+
+# Inserta las nuevas y reescribe solo las filas cuyo hash cambió; las filas sin
+# cambios no se tocan aquí (RETURNING no las devuelve) y solo se reprograman
+UPSERT_NEWS_SQL = f"""
+INSERT INTO noticias ({', '.join(NEWS_COLUMNS)}, last_checked, next_check)
+VALUES %s
+ON CONFLICT (url) DO UPDATE SET
+    titulo = EXCLUDED.titulo,
+    fecha = EXCLUDED.fecha,
+    hora = EXCLUDED.hora,
+    resumen = EXCLUDED.resumen,
+    contenido = EXCLUDED.contenido,
+    contenido_archivado_at = NULL,
+    categoria = EXCLUDED.categoria,
+    autor = EXCLUDED.autor,
+    tags = EXCLUDED.tags,
+    link_imagenes = EXCLUDED.link_imagenes,
+    content_hash = EXCLUDED.content_hash,
+    modified_at = COALESCE(EXCLUDED.modified_at, noticias.modified_at),
+    published_at = EXCLUDED.published_at,
+    last_checked = NOW(),
+    next_check = {next_check_sql('noticias.created_at')}
+WHERE noticias.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+RETURNING id, url, (xmax = 0) AS inserted
+"""
+UPSERT_NEWS_TEMPLATE = (
+    '(' + ', '.join(f'%({column})s' for column in NEWS_COLUMNS) + f', NOW(), {first_check_sql()})'
+)
+
+MARK_CHECKED_SQL = f"""
+UPDATE noticias SET last_checked = NOW(), next_check = {next_check_sql()}
+WHERE url = ANY(%s)
+"""
+
+# Filas existentes del lote cuyo contenido va a cambiar, bloqueadas hasta el commit
+# para que su versión anterior no cambie entre la lectura y el upsert
+LOCK_CHANGED_NEWS_SQL = """
+SELECT n.id, n.url, n.content_hash, n.titulo, n.resumen, n.contenido, f.contenido AS contenido_frio
+FROM noticias n
+JOIN (VALUES %s) AS v(url, content_hash) ON n.url = v.url
+LEFT JOIN noticias_contenido_frio f ON f.noticia_id = n.id
+WHERE n.content_hash IS DISTINCT FROM v.content_hash
+FOR UPDATE OF n
+"""
+
+INSERT_REVISIONS_SQL = """
+INSERT INTO noticias_revisiones (noticia_id, revision, content_hash, delta) VALUES %s
+"""
+INSERT_REVISIONS_TEMPLATE = (
+    "(%(noticia_id)s, (SELECT COALESCE(MAX(revision), 0) + 1 FROM noticias_revisiones "
+    "WHERE noticia_id = %(noticia_id)s), %(content_hash)s, %(delta)s)"
+)
+
+DELETE_TAGS_SQL = "DELETE FROM noticia_tags WHERE noticia_id = ANY(%s)"
+INSERT_TAGS_SQL = "INSERT INTO noticia_tags (noticia_id, tag, published_at) VALUES %s ON CONFLICT DO NOTHING"
+DELETE_IMAGES_SQL = "DELETE FROM noticia_imagenes WHERE noticia_id = ANY(%s)"
+INSERT_IMAGES_SQL = "INSERT INTO noticia_imagenes (noticia_id, posicion, url) VALUES %s ON CONFLICT DO NOTHING"
+
+# noticia_tags repite published_at para que el orden salga del índice (tag, published_at)
+NEWS_BY_TAG_SQL = """
+SELECT n.* FROM noticia_tags t
+JOIN noticias n ON n.id = t.noticia_id
+WHERE t.tag = %s
+ORDER BY t.published_at DESC NULLS LAST
+LIMIT %s
+"""
+
+NEWS_PUBLISHED_BETWEEN_SQL = """
+SELECT * FROM noticias
+WHERE published_at >= %s AND published_at < %s
+ORDER BY published_at DESC
+LIMIT %s
+"""
+
+NEWS_TAGS_SQL = "SELECT tag FROM noticia_tags WHERE noticia_id = %s ORDER BY tag"
+NEWS_IMAGES_SQL = "SELECT url FROM noticia_imagenes WHERE noticia_id = %s ORDER BY posicion"
+
+REVISIONS_BY_URL_SQL = """
+SELECT r.revision, r.content_hash, r.created_at, length(r.delta) AS delta_bytes, r.delta
+FROM noticias_revisiones r
+JOIN noticias n ON n.id = r.noticia_id
+WHERE n.url = %s
+ORDER BY r.revision DESC
+"""
+
+NEWS_BY_SOURCE_SQL = """
+SELECT * FROM noticias
+WHERE fuente = %s
+ORDER BY fecha_extraccion DESC
+LIMIT %s
+"""
+
+# Solo columnas del índice idx_noticias_fuente_extraccion: index-only scan
+HEADLINES_BY_SOURCE_SQL = """
+SELECT fuente, fecha_extraccion, titulo, url, published_at FROM noticias
+WHERE fuente = %s
+ORDER BY fecha_extraccion DESC
+LIMIT %s
+"""
+
+RECENT_NEWS_SQL = """
+SELECT * FROM noticias
+WHERE fecha_extraccion >= NOW() - make_interval(hours => %s)
+ORDER BY fecha_extraccion DESC
+"""
+
+NEWS_BY_URL_SQL = "SELECT * FROM noticias WHERE url = %s"
+
+COUNT_NEWS_SQL = "SELECT COUNT(*) AS total FROM noticias"
+# Sin ORDER BY: son pocas fuentes y se ordenan en Python
+COUNT_BY_SOURCE_SQL = "SELECT fuente, COUNT(*) AS count FROM noticias GROUP BY fuente"
+COUNT_RECENT_SQL = """
+SELECT COUNT(*) AS count FROM noticias
+WHERE fecha_extraccion >= NOW() - INTERVAL '24 hours'
+"""
+
+# Retención (ver retention.py): las más antiguas primero, sin esperar filas bloqueadas
+ARCHIVE_CANDIDATES_SQL = """
+SELECT id, contenido FROM noticias
+WHERE fecha_extraccion < NOW() - make_interval(days => %s)
+  AND contenido_archivado_at IS NULL AND contenido IS NOT NULL
+ORDER BY fecha_extraccion
+LIMIT %s
+FOR UPDATE SKIP LOCKED
+"""
+INSERT_COLD_CONTENT_SQL = """
+INSERT INTO noticias_contenido_frio (noticia_id, contenido) VALUES %s
+ON CONFLICT (noticia_id) DO UPDATE SET contenido = EXCLUDED.contenido, archived_at = NOW()
+"""
+MARK_ARCHIVED_SQL = """
+UPDATE noticias SET contenido = NULL, contenido_archivado_at = NOW()
+WHERE id = ANY(%s)
+"""
+COLD_CONTENT_SQL = "SELECT noticia_id, contenido FROM noticias_contenido_frio WHERE noticia_id = ANY(%s)"
+# Una noticia archivada que se reescribe vuelve a estar en caliente
+DELETE_COLD_CONTENT_SQL = "DELETE FROM noticias_contenido_frio WHERE noticia_id = ANY(%s)"
+
+DUE_FOR_CHECK_SQL = """
+SELECT url, fuente FROM noticias
+WHERE next_check <= NOW()
+ORDER BY next_check
+LIMIT %s
+"""
+
 class DatabaseManager:
     """Manejador de la base de datos PostgreSQL"""
     
     def __init__(self):
         self.connection = None
         self.cursor = None
+        # Momento del último SELECT 1 exitoso (health_check)
+        self._last_checked = 0.0
+        # __enter__ abrió la conexión y __exit__ debe cerrarla
+        self._context_owned = False
         
     def connect(self):
         """Establecer conexión con la base de datos"""
+        if self.connection is not None:
+            # No dejar abierta una conexión anterior al reconectar
+            self.close()
         try:
             self.connection = psycopg2.connect(
                 host=DatabaseConfig.HOST,
                 port=DatabaseConfig.PORT,
                 database=DatabaseConfig.DATABASE,
                 user=DatabaseConfig.USER,
-                password=DatabaseConfig.PASSWORD
+                password=DatabaseConfig.PASSWORD,
+                connect_timeout=DatabaseConfig.CONNECT_TIMEOUT
             )
             self.cursor = self.connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            self._last_checked = time.monotonic()
             logger.info("Conexión a PostgreSQL establecida correctamente")
             return True
         except Exception as e:
             logger.error(f"Error conectando a PostgreSQL: {e}")
             return False
     
+    def is_connected(self) -> bool:
+        """Hay una conexión abierta (sin consultar al servidor)"""
+        return self.connection is not None and not self.connection.closed
+    
+    def ensure_connection(self) -> bool:
+        """Conectar si no hay conexión o si la anterior quedó cerrada"""
+        return self.is_connected() or self.connect()
+    
+    def health_check(self, force: bool = False) -> bool:
+        """Verificar con SELECT 1 que el servidor sigue respondiendo; reconectar si no
+        
+        Solo consulta si pasaron DB_HEALTH_CHECK_INTERVAL segundos desde la última
+        verificación, para que llamarlo al inicio de cada tarea sea casi gratis.
+        """
+        if not self.is_connected():
+            return self.connect()
+        now = time.monotonic()
+        if not force and now - self._last_checked < DatabaseConfig.HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            self.cursor.execute("SELECT 1")
+            self.cursor.fetchone()
+            # No dejar la conexión "idle in transaction" entre tareas
+            self.connection.rollback()
+            self._last_checked = now
+            return True
+        except psycopg2.Error as e:
+            logger.warning(f"Conexión a PostgreSQL perdida ({e}), reconectando...")
+            return self.connect()
+    
     def create_database_if_not_exists(self):
         """Crear la base de datos si no existe"""
         try:
@@ -44,7 +258,8 @@ class DatabaseManager:
                 port=DatabaseConfig.PORT,
                 database='postgres',
                 user=DatabaseConfig.USER,
-                password=DatabaseConfig.PASSWORD
+                password=DatabaseConfig.PASSWORD,
+                connect_timeout=DatabaseConfig.CONNECT_TIMEOUT
             )
             temp_conn.autocommit = True
             temp_cursor = temp_conn.cursor()
@@ -70,166 +285,407 @@ class DatabaseManager:
             logger.error(f"Error creando base de datos: {e}")
             return False
     
-    def create_tables(self):
-        """Crear las tablas necesarias"""
+    def schema_version(self) -> int:
+        """Versión del esquema aplicada en la BD (0 si nunca se migró)"""
+        self.ensure_connection()
+        return migrations.current_version(self.connection)
+    
+    def is_schema_current(self) -> bool:
+        """Comprobación barata del camino normal: una sola consulta a schema_version"""
         try:
-            if not self.connection:
-                self.connect()
-            
-            # Crear tabla principal
-            self.cursor.execute(DatabaseSchema.CREATE_TABLE_SQL)
-            logger.info("Tabla 'noticias' creada/verificada correctamente")
-            
-            # Crear índices
-            for index_sql in DatabaseSchema.CREATE_INDEXES_SQL:
-                self.cursor.execute(index_sql)
-            
-            self.connection.commit()
-            logger.info("Índices creados correctamente")
-            return True
-            
+            return self.schema_version() >= migrations.LATEST_VERSION
         except Exception as e:
-            logger.error(f"Error creando tablas: {e}")
-            if self.connection:
-                self.connection.rollback()
+            logger.error(f"Error consultando la versión del esquema: {e}")
             return False
     
-    def insert_news(self, news_data: Dict) -> bool:
-        """Insertar una noticia en la base de datos"""
+    def create_tables(self):
+        """Aplicar las migraciones pendientes del esquema (ver migrations.py)"""
         try:
-            if not self.connection:
-                self.connect()
-            
-            insert_sql = """
-            INSERT INTO noticias (
-                titulo, fecha, hora, resumen, contenido, categoria, 
-                autor, tags, url, link_imagenes, fuente
-            ) VALUES (
-                %(titulo)s, %(fecha)s, %(hora)s, %(resumen)s, %(contenido)s, 
-                %(categoria)s, %(autor)s, %(tags)s, %(url)s, %(link_imagenes)s, %(fuente)s
-            ) ON CONFLICT (url) DO NOTHING
-            """
-            
-            self.cursor.execute(insert_sql, news_data)
-            self.connection.commit()
+            self.ensure_connection()
+            version = migrations.migrate(self.connection)
+            logger.info(f"Esquema en la versión {version}")
             return True
             
         except Exception as e:
-            logger.error(f"Error insertando noticia: {e}")
-            if self.connection:
+            logger.error(f"Error aplicando migraciones: {e}")
+            if self.is_connected():
                 self.connection.rollback()
             return False
     
+    def insert_news(self, news_data: Dict) -> bool:
+        """Insertar una noticia en la base de datos (o actualizarla si cambió)"""
+        result = self.upsert_news([news_data])
+        return result is not None and result['inserted'] + result['updated'] > 0
+    
     def insert_multiple_news(self, news_list: List[Dict]) -> int:
-        """Insertar múltiples noticias en lote"""
+        """Insertar múltiples noticias en lote (las existentes se actualizan si cambiaron)"""
+        result = self.upsert_news(news_list)
+        return result['inserted'] if result else 0
+    
+    def upsert_news(self, news_list: List[Dict], reschedule_unchanged: bool = True) -> Optional[Dict[str, int]]:
+        """Insertar noticias nuevas y reescribir solo las que cambiaron
+        
+        Devuelve cuántas se insertaron, cuántas cambiaron y cuántas seguían
+        iguales (a estas solo se les reprograma la próxima revisión, salvo con
+        reschedule_unchanged=False: la reextracción no escribe filas sin cambios).
+        Si la transacción falla devuelve None: nada del lote quedó guardado.
+        """
+        result = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        rows = self._prepare_news_rows(news_list)
+        if not rows:
+            return result
         try:
-            if not self.connection:
-                self.connect()
-            
-            insert_sql = """
-            INSERT INTO noticias (
-                titulo, fecha, hora, resumen, contenido, categoria, 
-                autor, tags, url, link_imagenes, fuente
-            ) VALUES (
-                %(titulo)s, %(fecha)s, %(hora)s, %(resumen)s, %(contenido)s, 
-                %(categoria)s, %(autor)s, %(tags)s, %(url)s, %(link_imagenes)s, %(fuente)s
-            ) ON CONFLICT (url) DO NOTHING
-            """
+            self.ensure_connection()
+            previous = self._lock_changed_news(rows)
+            try:
+                written = psycopg2.extras.execute_values(
+                    self.cursor, UPSERT_NEWS_SQL, rows,
+                    template=UPSERT_NEWS_TEMPLATE, page_size=100, fetch=True
+                )
+            except psycopg2.Error as e:
+                # Una fila inválida aborta todo el lote: reintentar fila por fila
+                logger.warning(f"Lote de noticias rechazado ({e}), se inserta fila por fila")
+                self.connection.rollback()
+                previous = self._lock_changed_news(rows)
+                written = self._upsert_rows_individually(rows)
             
-            inserted_count = 0
-            for news_data in news_list:
-                try:
-                    self.cursor.execute(insert_sql, news_data)
-                    if self.cursor.rowcount > 0:
-                        inserted_count += 1
-                except Exception as e:
-                    logger.warning(f"Error insertando noticia individual: {e}")
-                    continue
+            # Versiones anteriores de las filas reescritas, en la misma transacción
+            self._insert_revisions(rows, previous, written)
+            self._replace_tags_and_images(rows, written)
+            updated_ids = [row['id'] for row in written if not row['inserted']]
+            if updated_ids:
+                self.cursor.execute(DELETE_COLD_CONTENT_SQL, (updated_ids,))
             
+            written_urls = {row['url'] for row in written}
+            unchanged = [row['url'] for row in rows if row['url'] not in written_urls]
+            if unchanged and reschedule_unchanged:
+                self.cursor.execute(MARK_CHECKED_SQL, (unchanged,))
             self.connection.commit()
-            logger.info(f"Insertadas {inserted_count} noticias nuevas")
-            return inserted_count
+            
+            result['inserted'] = sum(1 for row in written if row['inserted'])
+            result['updated'] = len(written) - result['inserted']
+            result['unchanged'] = len(unchanged)
+            logger.info(f"Insertadas {result['inserted']} noticias nuevas, "
+                        f"{result['updated']} actualizadas, {result['unchanged']} sin cambios")
+            return result
             
         except Exception as e:
             logger.error(f"Error insertando noticias en lote: {e}")
-            if self.connection:
+            if self.is_connected():
                 self.connection.rollback()
-            return 0
+            return None
     
-    def get_news_by_source(self, source: str, limit: int = 100) -> List[Dict]:
-        """Obtener noticias por fuente"""
+    def _prepare_news_rows(self, news_list: List[Dict]) -> List[Dict]:
+        """URL canónica, sin duplicados, con hash de contenido y todas las columnas"""
+        # Variantes de una misma URL no deben generar filas distintas
+        unique_news = {}
+        for news_data in news_list:
+            row = {column: news_data.get(column) for column in NEWS_COLUMNS}
+            row['url'] = canonicalize_url(news_data.get('url', ''))
+            row['modified_at'] = news_data.get('modified_at') or None
+            row['published_at'] = news_data.get('published_at') or None
+            row['content_hash'] = content_hash(news_data)
+            unique_news.setdefault(row['url'], row)
+        return list(unique_news.values())
+    
+    def _lock_changed_news(self, rows: List[Dict]) -> Dict[str, Dict]:
+        """Versión actual de las filas del lote que van a cambiar (url -> fila)"""
+        if not DatabaseConfig.REVISION_HISTORY:
+            return {}
+        previous = psycopg2.extras.execute_values(
+            self.cursor, LOCK_CHANGED_NEWS_SQL,
+            [(row['url'], row['content_hash']) for row in rows],
+            page_size=500, fetch=True
+        )
+        for row in previous:
+            # La versión anterior de una noticia archivada está en la tabla fría
+            if row['contenido'] is None:
+                row['contenido'] = decompress_content(row['contenido_frio'])
+        return {row['url']: row for row in previous}
+    
+    def _insert_revisions(self, rows: List[Dict], previous: Dict[str, Dict], written: List[Dict]):
+        """Guardar el delta inverso de cada fila reescrita (un solo INSERT por lote)"""
+        if not previous:
+            return
+        new_rows = {row['url']: row for row in rows}
+        revisions = []
+        for row in written:
+            old = previous.get(row['url'])
+            if row['inserted'] or old is None:
+                continue
+            delta = make_delta(new_rows[row['url']], old)
+            if delta is not None:
+                revisions.append({'noticia_id': old['id'], 'content_hash': old['content_hash'], 'delta': delta})
+        if not revisions:
+            return
+        # Un fallo del historial no debe perder la ingesta
+        self.cursor.execute("SAVEPOINT revisiones")
         try:
-            if not self.connection:
-                self.connect()
-            
-            query = """
-            SELECT * FROM noticias 
-            WHERE fuente = %s 
-            ORDER BY fecha_extraccion DESC 
-            LIMIT %s
-            """
-            
-            self.cursor.execute(query, (source, limit))
-            return self.cursor.fetchall()
-            
+            psycopg2.extras.execute_values(
+                self.cursor, INSERT_REVISIONS_SQL, revisions,
+                template=INSERT_REVISIONS_TEMPLATE, page_size=100
+            )
+            self.cursor.execute("RELEASE SAVEPOINT revisiones")
+        except psycopg2.Error as e:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT revisiones")
+            logger.warning(f"No se pudo guardar el historial de {len(revisions)} noticias: {e}")
+    
+    def _replace_tags_and_images(self, rows: List[Dict], written: List[Dict]):
+        """Reescribir noticia_tags / noticia_imagenes de las filas insertadas o cambiadas"""
+        if not written:
+            return
+        new_rows = {row['url']: row for row in rows}
+        tags, images = [], []
+        for row in written:
+            news = new_rows[row['url']]
+            tags.extend((row['id'], tag, news.get('published_at')) for tag in split_tags(news.get('tags')))
+            images.extend((row['id'], position, url)
+                          for position, url in enumerate(split_images(news.get('link_imagenes')), 1))
+        
+        updated_ids = [row['id'] for row in written if not row['inserted']]
+        if updated_ids:
+            self.cursor.execute(DELETE_TAGS_SQL, (updated_ids,))
+            self.cursor.execute(DELETE_IMAGES_SQL, (updated_ids,))
+        if tags:
+            psycopg2.extras.execute_values(self.cursor, INSERT_TAGS_SQL, tags, page_size=500)
+        if images:
+            psycopg2.extras.execute_values(self.cursor, INSERT_IMAGES_SQL, images, page_size=500)
+    
+    def _upsert_rows_individually(self, rows: List[Dict]) -> List[Dict]:
+        """Upsert de cada fila en su propio savepoint, descartando las inválidas"""
+        written = []
+        for row in rows:
+            self.cursor.execute("SAVEPOINT noticia")
+            try:
+                written.extend(psycopg2.extras.execute_values(
+                    self.cursor, UPSERT_NEWS_SQL, [row],
+                    template=UPSERT_NEWS_TEMPLATE, fetch=True
+                ))
+                self.cursor.execute("RELEASE SAVEPOINT noticia")
+            except psycopg2.Error as e:
+                self.cursor.execute("ROLLBACK TO SAVEPOINT noticia")
+                logger.warning(f"Error insertando noticia individual {row['url']}: {e}")
+        return written
+    
+    def get_news_by_tag(self, tag: str, limit: int = 100) -> List[Dict]:
+        """Noticias con un tag (búsqueda por índice), las más recientes primero"""
+        return self._fetch_all(NEWS_BY_TAG_SQL, (normalize_tag(tag), limit), f"noticias con el tag {tag}")
+    
+    def get_news_published_between(self, start, end, limit: int = 1000) -> List[Dict]:
+        """Noticias publicadas en [start, end) según published_at (datetimes con zona)"""
+        return self._fetch_all(NEWS_PUBLISHED_BETWEEN_SQL, (start, end, limit),
+                               f"noticias entre {start} y {end}")
+    
+    def get_news_tags_and_images(self, news_id: int) -> Dict[str, List[str]]:
+        """Tags e imágenes normalizados de una noticia"""
+        try:
+            self.ensure_connection()
+            self.cursor.execute(NEWS_TAGS_SQL, (news_id,))
+            tags = [row['tag'] for row in self.cursor.fetchall()]
+            self.cursor.execute(NEWS_IMAGES_SQL, (news_id,))
+            images = [row['url'] for row in self.cursor.fetchall()]
+            return {'tags': tags, 'imagenes': images}
         except Exception as e:
-            logger.error(f"Error obteniendo noticias por fuente: {e}")
+            logger.error(f"Error obteniendo tags e imágenes de la noticia {news_id}: {e}")
+            if self.is_connected():
+                self.connection.rollback()
+            return {'tags': [], 'imagenes': []}
+    
+    def get_news_revisions(self, url: str) -> List[Dict]:
+        """Revisiones anteriores de una noticia, de la más reciente a la más antigua"""
+        try:
+            self.ensure_connection()
+            self.cursor.execute(REVISIONS_BY_URL_SQL, (canonicalize_url(url),))
+            rows = self.cursor.fetchall()
+            self.connection.commit()
+            return [{key: value for key, value in row.items() if key != 'delta'} for row in rows]
+        except Exception as e:
+            logger.error(f"Error obteniendo revisiones de {url}: {e}")
+            if self.is_connected():
+                self.connection.rollback()
             return []
     
-    def get_recent_news(self, hours: int = 24) -> List[Dict]:
-        """Obtener noticias recientes"""
+    def get_news_version(self, url: str, revision: int) -> Optional[Dict]:
+        """Reconstruir una revisión anterior de una noticia
+        
+        Parte de la fila actual y aplica los deltas inversos desde la revisión más
+        reciente hasta `revision`. Las columnas sin historial quedan como en la fila
+        actual; una revisión inexistente devuelve None.
+        """
         try:
-            if not self.connection:
-                self.connect()
-            
-            query = """
-            SELECT * FROM noticias 
-            WHERE fecha_extraccion >= NOW() - INTERVAL '%s hours'
-            ORDER BY fecha_extraccion DESC
-            """
-            
-            self.cursor.execute(query, (hours,))
-            return self.cursor.fetchall()
-            
+            self.ensure_connection()
+            url = canonicalize_url(url)
+            self.cursor.execute(NEWS_BY_URL_SQL, (url,))
+            current = self.cursor.fetchone()
+            if current is None:
+                self.connection.commit()
+                return None
+            self._hydrate_content([current])
+            self.cursor.execute(REVISIONS_BY_URL_SQL, (url,))
+            deltas = self.cursor.fetchall()
+            self.connection.commit()
+        except Exception as e:
+            logger.error(f"Error reconstruyendo la revisión {revision} de {url}: {e}")
+            if self.is_connected():
+                self.connection.rollback()
+            return None
+        
+        if not any(row['revision'] == revision for row in deltas):
+            return None
+        version = dict(current)
+        for row in deltas:
+            if row['revision'] < revision:
+                break
+            version.update(apply_delta(version, bytes(row['delta'])))
+            version['content_hash'] = row['content_hash']
+        version['revision'] = revision
+        return version
+    
+    def get_due_for_recheck(self, limit: int = 100) -> List[Dict]:
+        """Noticias cuya próxima revisión ya venció, las más atrasadas primero"""
+        try:
+            self.ensure_connection()
+            self.cursor.execute(DUE_FOR_CHECK_SQL, (limit,))
+            rows = self.cursor.fetchall()
+            self.connection.commit()
+            return rows
         except Exception as e:
-            logger.error(f"Error obteniendo noticias recientes: {e}")
+            logger.error(f"Error obteniendo noticias a revisar: {e}")
+            if self.is_connected():
+                self.connection.rollback()
             return []
     
+    def mark_checked(self, urls: List[str]) -> int:
+        """Reprogramar la revisión de URLs que no se pudieron volver a extraer"""
+        if not urls:
+            return 0
+        try:
+            self.ensure_connection()
+            self.cursor.execute(MARK_CHECKED_SQL, (list(urls),))
+            self.connection.commit()
+            return self.cursor.rowcount
+        except Exception as e:
+            logger.error(f"Error reprogramando revisiones: {e}")
+            if self.is_connected():
+                self.connection.rollback()
+            return 0
+    
+    def get_news_by_url(self, url: str) -> Optional[Dict]:
+        """Una noticia por URL (con su contenido, aunque esté archivado)"""
+        rows = self._fetch_all(NEWS_BY_URL_SQL, (canonicalize_url(url),), f"la noticia {url}")
+        return rows[0] if rows else None
+    
+    def get_news_by_source(self, source: str, limit: int = 100) -> List[Dict]:
+        """Obtener noticias por fuente"""
+        return self._fetch_all(NEWS_BY_SOURCE_SQL, (source, limit), 'noticias por fuente')
+    
+    def get_headlines_by_source(self, source: str, limit: int = 100) -> List[Dict]:
+        """Titulares de una fuente (listados): sale entero del índice, sin leer contenido"""
+        return self._fetch_all(HEADLINES_BY_SOURCE_SQL, (source, limit), 'titulares por fuente')
+    
+    def get_recent_news(self, hours: int = 24) -> List[Dict]:
+        """Obtener noticias recientes"""
+        return self._fetch_all(RECENT_NEWS_SQL, (hours,), 'noticias recientes')
+    
     def get_statistics(self) -> Dict:
         """Obtener estadísticas de la base de datos"""
         try:
-            if not self.connection:
-                self.connect()
+            self.ensure_connection()
             
             stats = {}
             
             # Total de noticias
-            self.cursor.execute("SELECT COUNT(*) as total FROM noticias")
+            self.cursor.execute(COUNT_NEWS_SQL)
             stats['total_noticias'] = self.cursor.fetchone()['total']
             
             # Por fuente
-            self.cursor.execute("""
-                SELECT fuente, COUNT(*) as count 
-                FROM noticias 
-                GROUP BY fuente 
-                ORDER BY count DESC
-            """)
-            stats['por_fuente'] = dict(self.cursor.fetchall())
+            self.cursor.execute(COUNT_BY_SOURCE_SQL)
+            by_source = sorted(self.cursor.fetchall(), key=lambda row: row['count'], reverse=True)
+            stats['por_fuente'] = {row['fuente']: row['count'] for row in by_source}
             
             # Últimas 24 horas
-            self.cursor.execute("""
-                SELECT COUNT(*) as count 
-                FROM noticias 
-                WHERE fecha_extraccion >= NOW() - INTERVAL '24 hours'
-            """)
+            self.cursor.execute(COUNT_RECENT_SQL)
             stats['ultimas_24h'] = self.cursor.fetchone()['count']
             
+            self.connection.commit()
             return stats
             
         except Exception as e:
             logger.error(f"Error obteniendo estadísticas: {e}")
+            if self.is_connected():
+                self.connection.rollback()
             return {}
     
+    def _fetch_all(self, sql: str, params: tuple, description: str) -> List[Dict]:
+        """Ejecutar una consulta de lectura y cerrar su transacción
+        
+        Con un manager de larga vida, una transacción abierta entre tareas
+        retendría el snapshot y frenaría el VACUUM.
+        """
+        try:
+            self.ensure_connection()
+            self.cursor.execute(sql, params)
+            rows = self.cursor.fetchall()
+            self._hydrate_content(rows)
+            self.connection.commit()
+            return rows
+        except Exception as e:
+            logger.error(f"Error obteniendo {description}: {e}")
+            if self.is_connected():
+                self.connection.rollback()
+            return []
+    
+    def _hydrate_content(self, rows: List[Dict]):
+        """Recuperar de la tabla fría el contenido de las filas archivadas (una consulta)"""
+        archived = {row['id']: row for row in rows
+                    if row.get('contenido') is None and row.get('contenido_archivado_at')}
+        if not archived:
+            return
+        self.cursor.execute(COLD_CONTENT_SQL, (list(archived),))
+        for cold in self.cursor.fetchall():
+            archived[cold['noticia_id']]['contenido'] = decompress_content(cold['contenido'])
+    
+    def archive_old_content(self, hot_days: int = None, batch_size: int = None,
+                            max_batches: int = None) -> Dict[str, int]:
+        """Mover a la tabla fría el contenido de las noticias más antiguas que hot_days
+        
+        Cada lote es una transacción: comprime el contenido, lo guarda en
+        noticias_contenido_frio y lo borra de noticias. Las filas bloqueadas por
+        un upsert en curso se saltan y quedan para la próxima ejecución.
+        """
+        hot_days = RetentionConfig.HOT_DAYS if hot_days is None else hot_days
+        batch_size = batch_size or RetentionConfig.BATCH_SIZE
+        max_batches = max_batches or RetentionConfig.MAX_BATCHES
+        result = {'archived': 0, 'bytes_hot': 0, 'bytes_cold': 0}
+        try:
+            self.ensure_connection()
+            for _ in range(max_batches):
+                self.cursor.execute(ARCHIVE_CANDIDATES_SQL, (hot_days, batch_size))
+                candidates = self.cursor.fetchall()
+                if not candidates:
+                    self.connection.commit()
+                    break
+                cold_rows = []
+                for row in candidates:
+                    compressed = compress_content(row['contenido'])
+                    cold_rows.append((row['id'], compressed))
+                    result['bytes_hot'] += len(row['contenido'].encode('utf-8'))
+                    result['bytes_cold'] += len(compressed)
+                psycopg2.extras.execute_values(self.cursor, INSERT_COLD_CONTENT_SQL, cold_rows, page_size=100)
+                self.cursor.execute(MARK_ARCHIVED_SQL, ([row['id'] for row in candidates],))
+                self.connection.commit()
+                result['archived'] += len(candidates)
+                if len(candidates) < batch_size:
+                    break
+            logger.info(f"Contenido archivado en frío: {result['archived']} noticias "
+                        f"({result['bytes_hot']} -> {result['bytes_cold']} bytes)")
+            return result
+        except Exception as e:
+            logger.error(f"Error archivando contenido antiguo: {e}")
+            if self.is_connected():
+                self.connection.rollback()
+            return result
+    
     def close(self):
         """Cerrar conexión a la base de datos"""
         try:
@@ -240,12 +696,20 @@ class DatabaseManager:
             logger.info("Conexión a PostgreSQL cerrada")
         except Exception as e:
             logger.error(f"Error cerrando conexión: {e}")
+        finally:
+            # Sin esto los métodos verían una conexión cerrada y no reconectarían
+            self.connection = None
+            self.cursor = None
     
     def __enter__(self):
-        """Context manager entry"""
-        self.connect()
+        """Context manager entry (reutiliza la conexión si ya está abierta)"""
+        self._context_owned = not self.is_connected()
+        if self._context_owned:
+            self.connect()
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Context manager exit"""
-        self.close()
+        """Context manager exit (cierra solo la conexión que abrió __enter__)"""
+        if self._context_owned:
+            self._context_owned = False
+            self.close()
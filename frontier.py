@@ -0,0 +1,162 @@
+"""
+Frontera de descubrimiento (URLs por visitar, visitadas y noticias encontradas)
+
+MemoryFrontier sirve para un solo proceso; RedisFrontier comparte la misma
+frontera entre procesos y nodos y sobrevive a reinicios durante FRONTIER_TTL.
+Ambas entregan primero las URLs de mayor prioridad (ver
+BaseNewsScraper.discovery_priority).
+"""
+import heapq
+import itertools
+import logging
+import uuid
+from datetime import datetime
+from typing import Iterable, List, Optional, Set, Tuple
+
+from config import DistributedConfig
+from redis_client import get_redis, redis_key
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryFrontier:
+    """Frontera en memoria: montículo por prioridad con índice de URLs ya encoladas"""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._seen: Set[str] = set()
+        self._visited: Set[str] = set()
+        self._found: Set[str] = set()
+        self._processed = 0
+
+    def push(self, url: str, priority: float = 0.0) -> bool:
+        """Encolar una URL si nunca se encoló; devuelve True si se agregó"""
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        # Mayor prioridad primero; a igual prioridad, orden de llegada
+        heapq.heappush(self._heap, (-priority, next(self._seq), url))
+        return True
+
+    def pop(self) -> Optional[str]:
+        return heapq.heappop(self._heap)[2] if self._heap else None
+
+    def mark_visited(self, url: str):
+        self._visited.add(url)
+
+    def is_visited(self, url: str) -> bool:
+        return url in self._visited
+
+    def visited_count(self) -> int:
+        return len(self._visited)
+
+    def mark_processed(self):
+        """Registrar una página descargada con éxito (la que cuenta para max_pages)"""
+        self._processed += 1
+
+    def processed_count(self) -> int:
+        return self._processed
+
+    def add_found(self, urls: Iterable[str]):
+        self._found.update(urls)
+
+    def found(self) -> Set[str]:
+        return set(self._found)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class RedisFrontier:
+    """Frontera en Redis: cola de prioridad (ZSET) más conjuntos de vistas, visitadas y encontradas"""
+
+    # Encolar solo si es nueva; a igual prioridad se respeta el orden de llegada
+    PUSH_SCRIPT = """
+    if redis.call('SADD', KEYS[2], ARGV[1]) == 0 then
+        return 0
+    end
+    local seq = redis.call('INCR', KEYS[3])
+    redis.call('ZADD', KEYS[1], -tonumber(ARGV[2]) * 1000000000 + seq, ARGV[1])
+    for i = 1, 3 do
+        redis.call('EXPIRE', KEYS[i], ARGV[3])
+    end
+    return 1
+    """
+
+    def __init__(self, client, source_key: str, run_id: str = None, ttl: int = None):
+        self.client = client
+        # Sin identificador de ejecución la frontera no se comparte con nadie
+        self.run_id = run_id or new_run_id()
+        self.ttl = ttl or DistributedConfig.FRONTIER_TTL
+        base = ('frontier', source_key, self.run_id)
+        self.queue_key = redis_key(*base, 'queue')
+        self.seen_key = redis_key(*base, 'seen')
+        self.seq_key = redis_key(*base, 'seq')
+        self.visited_key = redis_key(*base, 'visited')
+        self.processed_key = redis_key(*base, 'processed')
+        self.found_key = redis_key(*base, 'found')
+        self._push = client.register_script(self.PUSH_SCRIPT)
+
+    def push(self, url: str, priority: float = 0.0) -> bool:
+        return bool(self._push(keys=[self.queue_key, self.seen_key, self.seq_key],
+                               args=[url, priority, self.ttl]))
+
+    def pop(self) -> Optional[str]:
+        popped = self.client.zpopmin(self.queue_key)
+        return popped[0][0].decode('utf-8') if popped else None
+
+    def mark_visited(self, url: str):
+        pipe = self.client.pipeline()
+        pipe.sadd(self.visited_key, url)
+        pipe.expire(self.visited_key, self.ttl)
+        pipe.execute()
+
+    def is_visited(self, url: str) -> bool:
+        return bool(self.client.sismember(self.visited_key, url))
+
+    def visited_count(self) -> int:
+        return self.client.scard(self.visited_key)
+
+    def mark_processed(self):
+        pipe = self.client.pipeline()
+        pipe.incr(self.processed_key)
+        pipe.expire(self.processed_key, self.ttl)
+        pipe.execute()
+
+    def processed_count(self) -> int:
+        return int(self.client.get(self.processed_key) or 0)
+
+    def add_found(self, urls: Iterable[str]):
+        urls = list(urls)
+        if not urls:
+            return
+        pipe = self.client.pipeline()
+        pipe.sadd(self.found_key, *urls)
+        pipe.expire(self.found_key, self.ttl)
+        pipe.execute()
+
+    def found(self) -> Set[str]:
+        return {url.decode('utf-8') for url in self.client.smembers(self.found_key)}
+
+    def __len__(self) -> int:
+        return self.client.zcard(self.queue_key)
+
+
+def new_run_id() -> str:
+    """Identificador único de una ejecución de scraping"""
+    return f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def create_frontier(source_key: str, run_id: str = None):
+    """Frontera Redis si está configurada y disponible; si no, en memoria
+
+    Los procesos que reciben el mismo run_id comparten la frontera, y una tarea
+    reintentada con él continúa donde quedó. Cada ejecución nueva trae su propio
+    run_id, así que nunca reutiliza las visitadas y encontradas de otra.
+    """
+    if DistributedConfig.FRONTIER_BACKEND == 'redis':
+        client = get_redis()
+        if client is not None:
+            return RedisFrontier(client, source_key, run_id)
+    return MemoryFrontier()
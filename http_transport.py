@@ -0,0 +1,109 @@
+"""
+Capa de transporte HTTP compartida por los scrapers
+
+Un único HTTPAdapter por proceso (pool de conexiones de urllib3) montado en una
+sesión por hilo: los hilos no comparten cookies ni estado de la sesión, pero sí
+reutilizan las conexiones keep-alive ya abiertas hacia cada host.
+"""
+import logging
+import threading
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+import metrics
+from config import ScrapingConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'es-ES,es;q=0.8,en-US;q=0.5,en;q=0.3',
+    # urllib3 agrega br y zstd cuando brotli/zstandard están instalados
+    'Accept-Encoding': ACCEPT_ENCODING.replace(',', ', '),
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+_adapter = None
+_adapter_lock = threading.Lock()
+
+
+def get_adapter() -> HTTPAdapter:
+    """HTTPAdapter del proceso, dimensionado según ScrapingConfig"""
+    global _adapter
+
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                # Los reintentos los maneja make_request junto con el limitador
+                _adapter = HTTPAdapter(
+                    pool_connections=ScrapingConfig.POOL_CONNECTIONS,
+                    pool_maxsize=ScrapingConfig.POOL_MAXSIZE,
+                    max_retries=0
+                )
+                metrics.HTTP_CONNECTIONS_OPENED.set_function(lambda: transport_stats()['connections'])
+                metrics.HTTP_REQUESTS_SENT.set_function(lambda: transport_stats()['requests'])
+    return _adapter
+
+
+def create_session() -> requests.Session:
+    """Nueva sesión con los headers por defecto y el adaptador compartido"""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = get_adapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _active_pools() -> List:
+    """Pools de conexiones vivos del adaptador
+
+    urllib3 no expone los pools sin efectos: se leen del contenedor interno si
+    existe y, si no, por clave (lo que solo los marca como usados recientemente).
+    Las métricas no deben romper el scraping si urllib3 cambia.
+    """
+    pools = _adapter.poolmanager.pools
+    try:
+        container = getattr(pools, '_container', None)
+        if container is not None:
+            with pools.lock:
+                return list(container.values())
+        active = []
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                active.append(pool)
+        return active
+    except Exception as e:
+        logger.debug(f"No se pudieron leer los pools de urllib3: {e}")
+        return []
+
+
+def transport_stats() -> Dict[str, float]:
+    """Conexiones abiertas vs. peticiones enviadas por los pools activos"""
+    connections = requests_sent = 0
+    if _adapter is not None:
+        for pool in _active_pools():
+            connections += getattr(pool, 'num_connections', 0)
+            requests_sent += getattr(pool, 'num_requests', 0)
+    reuse = 1 - connections / requests_sent if requests_sent else 0.0
+    return {'connections': connections, 'requests': requests_sent, 'reuse_ratio': reuse}
+
+
+class ThreadLocalSession:
+    """Una sesión por hilo, creada al primer uso"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = create_session()
+            self._local.session = session
+        return session
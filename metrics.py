@@ -0,0 +1,176 @@
+"""
+Métricas Prometheus para el scraper y los workers Celery
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+from config import MetricsConfig
+
+logger = logging.getLogger(__name__)
+
+# Buckets pensados para sitios lentos (hasta el timeout de 30s)
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30)
+PARSE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+REQUEST_LATENCY = Histogram(
+    'news_scraper_request_duration_seconds',
+    'Latencia de las peticiones HTTP por host',
+    ['fuente', 'host'],
+    buckets=REQUEST_BUCKETS
+)
+
+HTTP_RESPONSES = Counter(
+    'news_scraper_http_responses_total',
+    'Respuestas HTTP por código de estado (error = sin respuesta)',
+    ['fuente', 'host', 'status']
+)
+
+REQUEST_RETRIES = Counter(
+    'news_scraper_request_retries_total',
+    'Reintentos de peticiones HTTP',
+    ['fuente', 'host']
+)
+
+HTML_PARSE_SECONDS = Histogram(
+    'news_scraper_html_parse_seconds',
+    'Tiempo de parseo HTML con BeautifulSoup',
+    ['fuente'],
+    buckets=PARSE_BUCKETS
+)
+
+ARTICLE_EXTRACT_SECONDS = Histogram(
+    'news_scraper_article_extract_seconds',
+    'Tiempo total de extracción por artículo (petición + parseo + extract_*)',
+    ['fuente'],
+    buckets=REQUEST_BUCKETS
+)
+
+ARTICLES_PROCESSED = Counter(
+    'news_scraper_articles_total',
+    'Artículos procesados por resultado',
+    ['fuente', 'resultado']
+)
+
+ARTICLES_PER_MINUTE = Gauge(
+    'news_scraper_articles_per_minute',
+    'Artículos extraídos por minuto en la última ejecución',
+    ['fuente']
+)
+
+ARTICLES_INSERTED = Counter(
+    'news_scraper_articles_inserted_total',
+    'Noticias nuevas insertadas en la base de datos',
+    ['fuente']
+)
+
+ARTICLES_UPDATED = Counter(
+    'news_scraper_articles_updated_total',
+    'Noticias ya guardadas cuyo contenido cambió y se reescribió',
+    ['fuente']
+)
+
+ARTICLES_RECHECKED = Counter(
+    'news_scraper_articles_rechecked_total',
+    'Noticias revisitadas por la revisión de cambios, por resultado',
+    ['fuente', 'resultado']
+)
+
+DB_INSERT_LATENCY = Histogram(
+    'news_scraper_db_insert_duration_seconds',
+    'Latencia de inserción en lote en PostgreSQL',
+    ['fuente'],
+    buckets=PARSE_BUCKETS + (5, 10)
+)
+
+QUEUE_DEPTH = Gauge(
+    'news_scraper_queue_depth',
+    'URLs pendientes de procesar',
+    ['fuente']
+)
+
+HOST_DELAY = Gauge(
+    'news_scraper_host_delay_seconds',
+    'Intervalo actual entre peticiones del limitador adaptativo',
+    ['host']
+)
+
+RATE_BUDGET_WAIT = Counter(
+    'news_scraper_rate_budget_wait_seconds_total',
+    'Tiempo esperando tokens del presupuesto de peticiones del cluster',
+    ['host']
+)
+
+HTTP_CONNECTIONS_OPENED = Gauge(
+    'news_scraper_http_connections_opened',
+    'Conexiones TCP/TLS abiertas por los pools activos del proceso'
+)
+
+HTTP_REQUESTS_SENT = Gauge(
+    'news_scraper_http_pool_requests',
+    'Peticiones enviadas por los pools activos (reuso = 1 - conexiones / peticiones)'
+)
+
+CIRCUIT_STATE = Gauge(
+    'news_scraper_circuit_state',
+    'Estado del circuit breaker por fuente (0 cerrado, 1 semiabierto, 2 abierto)',
+    ['fuente']
+)
+
+WARC_RECORDS = Counter(
+    'news_scraper_warc_records_total',
+    'Páginas de artículos enviadas al archivo WARC (duplicada = mismo contenido que la última)',
+    ['fuente', 'resultado']
+)
+
+WARC_BYTES = Counter(
+    'news_scraper_warc_bytes_total',
+    'Bytes comprimidos escritos en el archivo WARC',
+    ['fuente']
+)
+
+PAGE_CACHE_REQUESTS = Counter(
+    'news_scraper_page_cache_requests_total',
+    'Consultas a la caché de páginas (hit = página reutilizada sin petición HTTP)',
+    ['fuente', 'resultado']
+)
+
+_server_port = None
+
+
+def start_metrics_server(port: int = None) -> bool:
+    """Iniciar el servidor HTTP de métricas (una sola vez por proceso)"""
+    global _server_port
+
+    if not MetricsConfig.ENABLED:
+        return False
+    if _server_port is not None:
+        return True
+
+    port = port or MetricsConfig.PORT
+    try:
+        start_http_server(port, addr=MetricsConfig.HOST)
+        _server_port = port
+        logger.info(f"Servidor de métricas escuchando en {MetricsConfig.HOST}:{port}")
+        return True
+    except OSError as e:
+        logger.error(f"No se pudo iniciar el servidor de métricas en el puerto {port}: {e}")
+        return False
+
+
+def observe_response(fuente: str, host: str, status, elapsed: float):
+    """Registrar latencia y código de estado de una petición"""
+    REQUEST_LATENCY.labels(fuente=fuente, host=host).observe(elapsed)
+    HTTP_RESPONSES.labels(fuente=fuente, host=host, status=str(status)).inc()
+
+
+@contextmanager
+def time_db_insert(fuente: str):
+    """Medir la latencia de una inserción en la base de datos"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        DB_INSERT_LATENCY.labels(fuente=fuente).observe(time.perf_counter() - start)
@@ -0,0 +1,427 @@
+"""
+Migraciones versionadas del esquema PostgreSQL
+
+Cada migración se aplica una sola vez, en orden, y queda registrada en la tabla
+schema_version. Las ejecuciones normales solo comparan la versión de la BD con
+LATEST_VERSION (una consulta); el DDL corre únicamente cuando hay migraciones
+pendientes, bajo un advisory lock para que dos workers que arrancan a la vez
+no las apliquen en paralelo.
+
+Para cambiar el esquema se agrega una migración al final de MIGRATIONS; nunca
+se edita una ya publicada. Un paso puede ser SQL o una función que recibe el
+cursor, para las migraciones de datos que necesitan código Python.
+
+Uso:
+    python migrations.py            # aplicar migraciones pendientes
+    python migrations.py --status   # versión actual y pendientes
+"""
+import logging
+import re
+from collections import defaultdict
+from typing import Callable, List, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import psycopg2
+import psycopg2.extras
+from psycopg2 import errors
+
+from config import ScrapingConfig
+
+logger = logging.getLogger(__name__)
+
+# Clave del pg_advisory_lock que serializa la aplicación de migraciones
+MIGRATION_LOCK_ID = 4_631_873_201
+
+SCHEMA_VERSION_SQL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    descripcion TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+"""
+
+
+
+def backfill_published_at(cursor):
+    """published_at de las filas existentes: fecha + hora en la zona horaria de los sitios"""
+    cursor.execute(
+        """
+        UPDATE noticias
+        SET published_at = (fecha::date + COALESCE(hora, TIME '00:00')) AT TIME ZONE %s
+        WHERE published_at IS NULL AND fecha IS NOT NULL
+        """,
+        (ScrapingConfig.SOURCE_TIMEZONE,)
+    )
+
+
+# Reglas de canonicalización con las que corre la migración 8, fijas: una migración
+# publicada no puede cambiar de resultado si después cambian url_canonicalizer o
+# las base_url configuradas. Son las de la versión 8 con las fuentes por defecto.
+V8_TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', '_ga', '_gl',
+}
+V8_TRACKING_PREFIXES = ('utm_',)
+# host sin www -> (esquema, netloc) de la base_url por defecto de cada fuente
+V8_SOURCE_HOSTS = {
+    'diariosinfronteras.com.pe': ('https', 'diariosinfronteras.com.pe'),
+    'losandes.com.pe': ('https', 'losandes.com.pe'),
+    'pachamamaradio.org': ('https', 'pachamamaradio.org'),
+    'punonoticias.pe': ('https', 'punonoticias.pe'),
+}
+# Las cuatro son WordPress: barra final, sin AMP y sin estos parámetros
+V8_SOURCE_STRIP_PARAMS = {'replytocom', 'share', 'nb', 'amp'}
+V8_AMP_SUFFIX_RE = re.compile(r'/amp/?$')
+V8_MULTIPLE_SLASHES_RE = re.compile(r'/{2,}')
+V8_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonical_url_v8(url: str) -> str:
+    """Forma canónica de una URL según las reglas fijas de la migración 8"""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in V8_DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    bare_host = host[4:] if host.startswith('www.') else host
+    # Las base_url son https: sin puerto o con el 443 es la fuente
+    source = V8_SOURCE_HOSTS.get(bare_host) if port in (None, 443) else None
+    if source:
+        scheme, netloc = source
+    else:
+        netloc = host if port in (None, V8_DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    path = V8_MULTIPLE_SLASHES_RE.sub('/', parts.path) or '/'
+    strip_params = set(V8_TRACKING_PARAMS)
+    if source:
+        path = V8_AMP_SUFFIX_RE.sub('/', path)
+        last_segment = path.rsplit('/', 1)[-1]
+        if last_segment and '.' not in last_segment:
+            path += '/'
+        strip_params |= V8_SOURCE_STRIP_PARAMS
+
+    params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in strip_params and not key.lower().startswith(V8_TRACKING_PREFIXES)
+    ]
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(params)), ''))
+
+
+def canonicalize_stored_urls(cursor):
+    """Reescribir noticias.url en forma canónica (reglas fijas de canonical_url_v8)
+
+    Las variantes de una misma noticia guardadas como filas distintas se
+    reducen a una: la de más revisiones en el historial (luego la que ya tenía
+    la URL canónica, luego la de menor id). Sus tags pasan a la fila que queda,
+    y sus imágenes si esa no tenía. Las revisiones de las filas borradas son
+    deltas sobre su propio texto y no se pueden reasignar: se cuentan en el log.
+    """
+    cursor.execute(
+        """
+        SELECT n.id, n.url, COUNT(r.id) FROM noticias n
+        LEFT JOIN noticias_revisiones r ON r.noticia_id = n.id
+        WHERE n.url IS NOT NULL GROUP BY n.id ORDER BY n.id
+        """
+    )
+    groups = defaultdict(list)
+    for row_id, url, revisions in cursor.fetchall():
+        groups[canonical_url_v8(url)].append((row_id, url, revisions))
+
+    updates, merges, lost_revisions = [], [], 0
+    for canonical, rows in groups.items():
+        keeper = min(rows, key=lambda row: (-row[2], row[1] != canonical, row[0]))
+        for row_id, _, revisions in rows:
+            if row_id != keeper[0]:
+                merges.append((row_id, keeper[0]))
+                lost_revisions += revisions
+        if keeper[1] != canonical:
+            updates.append((keeper[0], canonical))
+
+    if merges:
+        psycopg2.extras.execute_values(
+            cursor,
+            """
+            INSERT INTO noticia_tags (noticia_id, tag, published_at)
+            SELECT m.keeper, t.tag, t.published_at
+            FROM noticia_tags t JOIN (VALUES %s) AS m(duplicate, keeper) ON t.noticia_id = m.duplicate
+            ON CONFLICT DO NOTHING
+            """,
+            merges
+        )
+        psycopg2.extras.execute_values(
+            cursor,
+            """
+            INSERT INTO noticia_imagenes (noticia_id, posicion, url)
+            SELECT m.keeper, i.posicion, i.url
+            FROM noticia_imagenes i JOIN (VALUES %s) AS m(duplicate, keeper) ON i.noticia_id = m.duplicate
+            WHERE NOT EXISTS (SELECT 1 FROM noticia_imagenes k WHERE k.noticia_id = m.keeper)
+            ON CONFLICT DO NOTHING
+            """,
+            merges
+        )
+        # Borrar antes de reescribir: la URL canónica puede estar ocupada por una variante
+        cursor.execute("DELETE FROM noticias WHERE id = ANY(%s)", ([row_id for row_id, _ in merges],))
+        logger.warning(f"Migración de URLs: {len(merges)} filas duplicadas fusionadas y borradas "
+                       f"({lost_revisions} revisiones de esas filas descartadas)")
+    if updates:
+        psycopg2.extras.execute_values(
+            cursor,
+            "UPDATE noticias n SET url = v.url FROM (VALUES %s) AS v(id, url) WHERE n.id = v.id",
+            updates
+        )
+    logger.info(f"URLs canonicalizadas: {len(updates)} reescritas, {len(merges)} duplicadas borradas")
+
+
+MigrationStep = Union[str, Callable]
+
+# (versión, descripción, pasos) en orden estricto de versión
+MIGRATIONS: List[Tuple[int, str, List[MigrationStep]]] = [
+    (1, 'esquema inicial: noticias, scraping_logs y scraping_stats', [
+        """
+        CREATE TABLE IF NOT EXISTS noticias (
+            id SERIAL PRIMARY KEY,
+            titulo TEXT,
+            fecha TIMESTAMP,
+            hora TIME,
+            resumen TEXT,
+            contenido TEXT,
+            categoria VARCHAR(100),
+            autor VARCHAR(200),
+            tags TEXT,
+            url TEXT UNIQUE,
+            fecha_extraccion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            link_imagenes TEXT,
+            fuente VARCHAR(100),
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_noticias_fuente ON noticias(fuente)",
+        "CREATE INDEX IF NOT EXISTS idx_noticias_fecha ON noticias(fecha)",
+        "CREATE INDEX IF NOT EXISTS idx_noticias_categoria ON noticias(categoria)",
+        "CREATE INDEX IF NOT EXISTS idx_noticias_fecha_extraccion ON noticias(fecha_extraccion)",
+        # Tablas que antes solo creaba init.sql
+        """
+        CREATE TABLE IF NOT EXISTS scraping_logs (
+            id SERIAL PRIMARY KEY,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            level VARCHAR(20),
+            source VARCHAR(100),
+            message TEXT,
+            details TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS scraping_stats (
+            id SERIAL PRIMARY KEY,
+            date DATE DEFAULT CURRENT_DATE,
+            source VARCHAR(100),
+            total_articles INTEGER DEFAULT 0,
+            new_articles INTEGER DEFAULT 0,
+            execution_time INTEGER,
+            status VARCHAR(20) DEFAULT 'success'
+        )
+        """,
+    ]),
+    (2, 'eliminar idx_noticias_url (duplica el índice de la restricción UNIQUE)', [
+        "DROP INDEX IF EXISTS idx_noticias_url",
+    ]),
+    (3, 'detección de cambios: content_hash, modified_at, last_checked, next_check', [
+        "ALTER TABLE noticias ADD COLUMN IF NOT EXISTS content_hash CHAR(64)",
+        "ALTER TABLE noticias ADD COLUMN IF NOT EXISTS modified_at TIMESTAMPTZ",
+        "ALTER TABLE noticias ADD COLUMN IF NOT EXISTS last_checked TIMESTAMPTZ",
+        "ALTER TABLE noticias ADD COLUMN IF NOT EXISTS next_check TIMESTAMPTZ",
+        # Solo las filas con revisión pendiente entran al índice
+        "CREATE INDEX IF NOT EXISTS idx_noticias_next_check ON noticias(next_check) "
+        "WHERE next_check IS NOT NULL",
+        # Las noticias de la última semana entran al calendario de revisión. Backfill
+        # único con la ventana fija del RECRAWL_MAX_AGE por defecto: una migración
+        # publicada no cambia con la configuración, y next_check_sql deja de
+        # reprogramar las que superen el RECRAWL_MAX_AGE vigente
+        "UPDATE noticias SET next_check = NOW() WHERE created_at >= NOW() - INTERVAL '7 days'",
+    ]),
+    (4, 'historial de revisiones: noticias_revisiones con deltas inversos comprimidos', [
+        """
+        CREATE TABLE IF NOT EXISTS noticias_revisiones (
+            id BIGSERIAL PRIMARY KEY,
+            noticia_id INTEGER NOT NULL REFERENCES noticias(id) ON DELETE CASCADE,
+            revision INTEGER NOT NULL,
+            content_hash CHAR(64),
+            delta BYTEA NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            UNIQUE (noticia_id, revision)
+        )
+        """,
+    ]),
+    (5, 'published_at tipado y tablas normalizadas noticia_tags / noticia_imagenes', [
+        "ALTER TABLE noticias ADD COLUMN IF NOT EXISTS published_at TIMESTAMPTZ",
+        # fecha + hora se guardaban como hora local de los sitios (SOURCE_TIMEZONE)
+        backfill_published_at,
+        "CREATE INDEX IF NOT EXISTS idx_noticias_published_at ON noticias(published_at)",
+        """
+        CREATE TABLE IF NOT EXISTS noticia_tags (
+            noticia_id INTEGER NOT NULL REFERENCES noticias(id) ON DELETE CASCADE,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (noticia_id, tag)
+        )
+        """,
+        # Búsqueda por tag: la PK sirve para "tags de una noticia", este índice para lo inverso
+        "CREATE INDEX IF NOT EXISTS idx_noticia_tags_tag ON noticia_tags(tag, noticia_id)",
+        """
+        CREATE TABLE IF NOT EXISTS noticia_imagenes (
+            noticia_id INTEGER NOT NULL REFERENCES noticias(id) ON DELETE CASCADE,
+            posicion SMALLINT NOT NULL,
+            url TEXT NOT NULL,
+            PRIMARY KEY (noticia_id, posicion)
+        )
+        """,
+        # Migrar las cadenas delimitadas existentes
+        """
+        INSERT INTO noticia_tags (noticia_id, tag)
+        SELECT DISTINCT n.id, lower(regexp_replace(btrim(t.tag), '\\s+', ' ', 'g'))
+        FROM noticias n, unnest(string_to_array(n.tags, ',')) AS t(tag)
+        WHERE btrim(t.tag) <> ''
+        ON CONFLICT DO NOTHING
+        """,
+        """
+        INSERT INTO noticia_imagenes (noticia_id, posicion, url)
+        SELECT n.id, i.posicion, btrim(i.url)
+        FROM noticias n, unnest(string_to_array(n.link_imagenes, ';')) WITH ORDINALITY AS i(url, posicion)
+        WHERE btrim(i.url) <> ''
+        ON CONFLICT DO NOTHING
+        """,
+    ]),
+    (6, 'índices compuestos y de cobertura según las consultas de DatabaseManager', [
+        # Noticias por fuente ordenadas por extracción; INCLUDE permite listar titulares
+        # con un index-only scan. Reemplaza a idx_noticias_fuente (es su prefijo)
+        "CREATE INDEX IF NOT EXISTS idx_noticias_fuente_extraccion ON noticias "
+        "(fuente, fecha_extraccion DESC) INCLUDE (titulo, url, published_at)",
+        "DROP INDEX IF EXISTS idx_noticias_fuente",
+        # Las consultas por fecha usan published_at (índice de la migración 5)
+        "DROP INDEX IF EXISTS idx_noticias_fecha",
+        # Cola de revisión: parcial (solo las filas con revisión pendiente; next_check
+        # vuelve a NULL pasada RECRAWL_MAX_AGE) y de cobertura, get_due_for_recheck no
+        # toca la tabla. Las consultas de las últimas 24 horas usan idx_noticias_fecha_extraccion
+        "CREATE INDEX IF NOT EXISTS idx_noticias_next_check_due ON noticias (next_check) "
+        "INCLUDE (url, fuente) WHERE next_check IS NOT NULL",
+        "DROP INDEX IF EXISTS idx_noticias_next_check",
+        # Noticias por tag ordenadas por publicación sin ordenar después del join
+        "ALTER TABLE noticia_tags ADD COLUMN IF NOT EXISTS published_at TIMESTAMPTZ",
+        """
+        UPDATE noticia_tags t SET published_at = n.published_at
+        FROM noticias n WHERE n.id = t.noticia_id AND n.published_at IS NOT NULL
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_noticia_tags_tag_published ON noticia_tags "
+        "(tag, published_at DESC NULLS LAST, noticia_id)",
+        "DROP INDEX IF EXISTS idx_noticia_tags_tag",
+    ]),
+    (7, 'archivo en frío del contenido: noticias_contenido_frio', [
+        "ALTER TABLE noticias ADD COLUMN IF NOT EXISTS contenido_archivado_at TIMESTAMPTZ",
+        """
+        CREATE TABLE IF NOT EXISTS noticias_contenido_frio (
+            noticia_id INTEGER PRIMARY KEY REFERENCES noticias(id) ON DELETE CASCADE,
+            contenido BYTEA NOT NULL,
+            archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+        """,
+        # Ya viene comprimido con zlib: que TOAST no intente comprimirlo otra vez
+        "ALTER TABLE noticias_contenido_frio ALTER COLUMN contenido SET STORAGE EXTERNAL",
+        # Candidatas a archivar: solo las filas que todavía tienen el contenido en caliente
+        "CREATE INDEX IF NOT EXISTS idx_noticias_contenido_caliente ON noticias (fecha_extraccion) "
+        "WHERE contenido_archivado_at IS NULL AND contenido IS NOT NULL",
+    ]),
+    (8, 'URLs existentes en forma canónica (reglas fijas de canonical_url_v8)', [
+        canonicalize_stored_urls,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(connection) -> int:
+    """Versión del esquema aplicada en la BD (0 si nunca se migró)"""
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+            version = cursor.fetchone()[0]
+        except errors.UndefinedTable:
+            version = 0
+    # No dejar una transacción abierta (o abortada) por la consulta
+    connection.rollback()
+    return version
+
+
+def pending_migrations(version: int) -> List[Tuple[int, str, List[MigrationStep]]]:
+    return [migration for migration in MIGRATIONS if migration[0] > version]
+
+
+def migrate(connection) -> int:
+    """Aplicar las migraciones pendientes; devuelve la versión final del esquema"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        try:
+            cursor.execute(SCHEMA_VERSION_SQL)
+            connection.commit()
+
+            # Releer con el lock tomado: otro proceso pudo migrar mientras esperábamos
+            version = current_version(connection)
+            for number, description, statements in pending_migrations(version):
+                logger.info(f"Aplicando migración {number}: {description}")
+                try:
+                    for statement in statements:
+                        if callable(statement):
+                            statement(cursor)
+                        else:
+                            cursor.execute(statement)
+                    cursor.execute(
+                        "INSERT INTO schema_version (version, descripcion) VALUES (%s, %s)",
+                        (number, description)
+                    )
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    logger.error(f"Migración {number} fallida, el esquema queda en la versión {version}")
+                    raise
+                version = number
+            return version
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            connection.commit()
+
+
+def main(argv: List[str] = None) -> int:
+    import argparse
+
+    from database import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Migraciones del esquema de noticias')
+    parser.add_argument('--status', action='store_true', help='Mostrar la versión sin migrar')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    db_manager = DatabaseManager()
+    if not db_manager.ensure_connection():
+        return 1
+    try:
+        version = current_version(db_manager.connection)
+        if args.status:
+            print(f"Versión del esquema: {version} (última: {LATEST_VERSION})")
+            for number, description, _ in pending_migrations(version):
+                print(f"  pendiente {number}: {description}")
+            return 0
+        print(f"Esquema en la versión {migrate(db_manager.connection)}")
+        return 0
+    except psycopg2.Error as e:
+        logger.error(f"Error aplicando migraciones: {e}")
+        return 1
+    finally:
+        db_manager.close()
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
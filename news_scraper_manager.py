@@ -5,15 +5,17 @@ import csv
 import json
 import logging
 import os
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
-import pandas as pd
-
-from config import LoggingConfig, NewsSources, ScrapingConfig
+import metrics
+from config import LoggingConfig, NewsSources, RecrawlConfig, ScrapingConfig
 from database import DatabaseManager
-from scrapers import (DiarioSinFronterasScraper, LosAndesScraper,
-                      PachamamaScraper, PunoNoticiasScraper)
+from frontier import new_run_id
+from profiling import RunProfiler, stage
+from scrapers import ScraperRegistry
 
 # Configurar logging
 logging.basicConfig(
@@ -32,54 +34,43 @@ class NewsScraperManager:
     
     def __init__(self):
         self.db_manager = DatabaseManager()
-        self.scrapers = self._initialize_scrapers()
+        # Cada scraper se importa y crea la primera vez que se usa su fuente
+        self.scrapers = ScraperRegistry()
         self.output_dir = ScrapingConfig.OUTPUT_DIR
+        # RunProfiler opcional (modo --profile)
+        self.profiler = None
+        # El esquema ya se verificó en esta instancia (no repetir el DDL)
+        self._schema_ready = False
         
         # Crear directorio de salida si no existe
         os.makedirs(self.output_dir, exist_ok=True)
         
-    def _initialize_scrapers(self) -> Dict:
-        """Inicializar todos los scrapers disponibles"""
-        scrapers = {}
+    def setup_database(self) -> bool:
+        """Configurar la base de datos
         
-        for source_key, source_config in NewsSources.SOURCES.items():
-            if not source_config['enabled']:
-                continue
-                
-            try:
-                if source_key == 'diario_sin_fronteras':
-                    scrapers[source_key] = DiarioSinFronterasScraper()
-                elif source_key == 'los_andes':
-                    scrapers[source_key] = LosAndesScraper()
-                elif source_key == 'pachamama':
-                    scrapers[source_key] = PachamamaScraper()
-                elif source_key == 'puno_noticias':
-                    scrapers[source_key] = PunoNoticiasScraper()
-                
-                logger.info(f"Scraper inicializado: {source_config['name']}")
-                
-            except Exception as e:
-                logger.error(f"Error inicializando scraper {source_key}: {e}")
+        El camino normal solo conecta y compara la versión del esquema; la BD se
+        crea si la conexión falla y las migraciones corren solo si hay pendientes.
+        Las llamadas siguientes (un manager de larga vida en un worker) solo
+        verifican la conexión.
+        """
+        if self._schema_ready:
+            return self.db_manager.health_check()
         
-        return scrapers
-    
-    def setup_database(self) -> bool:
-        """Configurar la base de datos"""
         try:
             logger.info("Configurando base de datos...")
             
-            # Crear base de datos si no existe
-            if not self.db_manager.create_database_if_not_exists():
-                return False
-            
-            # Conectar a la base de datos
-            if not self.db_manager.connect():
-                return False
+            # Conectar; crear la base de datos solo si todavía no existe
+            if not self.db_manager.ensure_connection():
+                if not self.db_manager.create_database_if_not_exists():
+                    return False
+                if not self.db_manager.connect():
+                    return False
             
-            # Crear tablas
-            if not self.db_manager.create_tables():
+            # Aplicar migraciones pendientes
+            if not self.db_manager.is_schema_current() and not self.db_manager.create_tables():
                 return False
             
+            self._schema_ready = True
             logger.info("Base de datos configurada correctamente")
             return True
             
@@ -93,33 +84,47 @@ class NewsScraperManager:
         total_news = 0
         
         logger.info("=== INICIANDO SCRAPING DE TODAS LAS FUENTES ===")
+        run_deadline = self.run_deadline()
+        run_id = new_run_id()
         
-        for source_key, scraper in self.scrapers.items():
+        for source_key in self.scrapers:
+            if run_deadline is not None and time.time() >= run_deadline:
+                logger.warning(f"Presupuesto de la ejecución agotado, se omite {NewsSources.SOURCES[source_key]['name']}")
+                results[source_key] = 0
+                continue
+            
             try:
-                logger.info(f"Procesando fuente: {scraper.source_name}")
-                
-                # Descubrir URLs de noticias
-                news_urls = scraper.discover_news_urls(max_pages=30)
-                logger.info(f"Encontradas {len(news_urls)} URLs en {scraper.source_name}")
-                
-                # Scrapear noticias
-                news_data = scraper.scrape_news(news_urls)
-                logger.info(f"Extraídas {len(news_data)} noticias de {scraper.source_name}")
-                
-                # Guardar en base de datos
-                if news_data:
-                    inserted_count = self.db_manager.insert_multiple_news(news_data)
-                    results[source_key] = inserted_count
-                    total_news += inserted_count
-                    logger.info(f"Insertadas {inserted_count} noticias nuevas en BD")
-                else:
-                    results[source_key] = 0
-                
-                # Generar archivos individuales por fuente
-                self._save_source_files(source_key, news_data)
+                # Un scraper que no importa o no inicializa solo afecta a su fuente
+                scraper = self.scrapers[source_key]
+                scraper.deadline = self._source_deadline(run_deadline)
+                scraper.start_run(run_id)
+                with self._profile_source(source_key):
+                    logger.info(f"Procesando fuente: {scraper.source_name}")
+                    
+                    # Descubrir URLs de noticias
+                    with stage('discover'):
+                        news_urls = scraper.discover_news_urls(max_pages=ScrapingConfig.MAX_DISCOVERY_PAGES)
+                    logger.info(f"Encontradas {len(news_urls)} URLs en {scraper.source_name}")
+                    
+                    # Scrapear noticias
+                    news_data, extracted_urls = scraper.scrape_news(news_urls)
+                    logger.info(f"Extraídas {len(news_data)} noticias de {scraper.source_name}")
+                    
+                    # Guardar en base de datos
+                    if news_data:
+                        inserted_count = self._save_scraped(scraper, news_data, extracted_urls)
+                        results[source_key] = inserted_count
+                        total_news += inserted_count
+                        logger.info(f"Insertadas {inserted_count} noticias nuevas en BD")
+                    else:
+                        results[source_key] = 0
+                    
+                    # Generar archivos individuales por fuente
+                    with stage('export'):
+                        self._save_source_files(source_key, news_data)
+                    scraper.page_cache.clear()
                 
                 # Delay entre fuentes
-                import time
                 time.sleep(ScrapingConfig.DELAY_BETWEEN_SOURCES)
                 
             except Exception as e:
@@ -140,32 +145,170 @@ class NewsScraperManager:
         
         scraper = self.scrapers[source_key]
         logger.info(f"Procesando fuente individual: {scraper.source_name}")
+        scraper.deadline = self._source_deadline()
+        scraper.start_run()
         
         try:
-            # Descubrir URLs de noticias
-            news_urls = scraper.discover_news_urls(max_pages=30)
-            logger.info(f"Encontradas {len(news_urls)} URLs en {scraper.source_name}")
-            
-            # Scrapear noticias
-            news_data = scraper.scrape_news(news_urls)
-            logger.info(f"Extraídas {len(news_data)} noticias de {scraper.source_name}")
-            
-            # Guardar en base de datos
-            if news_data:
-                inserted_count = self.db_manager.insert_multiple_news(news_data)
-                logger.info(f"Insertadas {inserted_count} noticias nuevas en BD")
+            with self._profile_source(source_key):
+                # Descubrir URLs de noticias
+                with stage('discover'):
+                    news_urls = scraper.discover_news_urls(max_pages=ScrapingConfig.MAX_DISCOVERY_PAGES)
+                logger.info(f"Encontradas {len(news_urls)} URLs en {scraper.source_name}")
                 
-                # Generar archivos individuales por fuente
-                self._save_source_files(source_key, news_data)
+                # Scrapear noticias
+                news_data, extracted_urls = scraper.scrape_news(news_urls)
+                scraper.page_cache.clear()
+                logger.info(f"Extraídas {len(news_data)} noticias de {scraper.source_name}")
                 
-                return inserted_count
-            else:
-                return 0
+                # Guardar en base de datos
+                if news_data:
+                    inserted_count = self._save_scraped(scraper, news_data, extracted_urls)
+                    logger.info(f"Insertadas {inserted_count} noticias nuevas en BD")
+                    
+                    # Generar archivos individuales por fuente
+                    with stage('export'):
+                        self._save_source_files(source_key, news_data)
+                    
+                    return inserted_count
+                else:
+                    return 0
                 
         except Exception as e:
             logger.error(f"Error procesando fuente {source_key}: {e}")
             return 0
     
+    def discover_source(self, source_key: str, run_deadline: float = None,
+                        run_id: str = None) -> List[str]:
+        """Descubrir las URLs de noticias de una fuente (etapa de descubrimiento en Celery)"""
+        scraper = self.scrapers[source_key]
+        scraper.deadline = self._source_deadline(run_deadline)
+        scraper.start_run(run_id)
+        try:
+            with stage('discover'):
+                news_urls = scraper.discover_news_urls(max_pages=ScrapingConfig.MAX_DISCOVERY_PAGES)
+        except Exception:
+            scraper.page_cache.clear()
+            raise
+        logger.info(f"Encontradas {len(news_urls)} URLs en {scraper.source_name}")
+        return news_urls
+    
+    def scrape_prefetched(self, source_key: str, urls: List[str], run_deadline: float = None,
+                          run_id: str = None) -> Tuple[List[str], Dict[str, int]]:
+        """Extraer en este proceso los artículos que el descubrimiento ya descargó
+        
+        En Celery los lotes corren en otras tareas, sin esta caché: los artículos
+        que están en ella se extraen y guardan aquí y el resto se devuelve para
+        los lotes. Después la caché se vacía.
+        """
+        scraper = self.scrapers[source_key]
+        result = {'extracted': 0, 'inserted': 0}
+        try:
+            prefetched = [url for url in urls if url in scraper.page_cache]
+            if not prefetched or not self.setup_database():
+                return urls, result
+            result = self.scrape_url_batch(source_key, prefetched, run_deadline, run_id)
+            prefetched = set(prefetched)
+            return [url for url in urls if url not in prefetched], result
+        finally:
+            scraper.page_cache.clear()
+    
+    def scrape_url_batch(self, source_key: str, urls: List[str], run_deadline: float = None,
+                         run_id: str = None) -> Dict[str, int]:
+        """Scrapear un lote de URLs de una fuente e insertarlo en la BD"""
+        scraper = self.scrapers[source_key]
+        scraper.deadline = self._source_deadline(run_deadline)
+        scraper.start_run(run_id)
+        news_data, extracted_urls = scraper.scrape_news(urls)
+        inserted_count = self._save_scraped(scraper, news_data, extracted_urls) if news_data else 0
+        logger.info(f"[{scraper.source_name}] Lote de {len(urls)} URLs: "
+                    f"{len(news_data)} extraídas, {inserted_count} nuevas")
+        return {'extracted': len(news_data), 'inserted': inserted_count}
+    
+    @staticmethod
+    def run_deadline() -> Optional[float]:
+        """Límite (epoch) de una ejecución completa que empieza ahora; None si no hay límite"""
+        if ScrapingConfig.RUN_TIME_BUDGET <= 0:
+            return None
+        return time.time() + ScrapingConfig.RUN_TIME_BUDGET
+    
+    @staticmethod
+    def _source_deadline(run_deadline: float = None) -> Optional[float]:
+        """Límite de una fuente: su propio presupuesto sin pasar el de la ejecución"""
+        deadline = None
+        if ScrapingConfig.SOURCE_TIME_BUDGET > 0:
+            deadline = time.time() + ScrapingConfig.SOURCE_TIME_BUDGET
+        if run_deadline is not None:
+            deadline = run_deadline if deadline is None else min(deadline, run_deadline)
+        return deadline
+    
+    def enable_profiling(self):
+        """Activar perfilado por fuente; los resultados se guardan en OUTPUT_DIR"""
+        self.profiler = RunProfiler(self.output_dir)
+        logger.info(f"Perfilado activado, salidas en {self.output_dir}")
+    
+    def disable_profiling(self):
+        """Desactivar el perfilado (manager reutilizado entre tareas)"""
+        self.profiler = None
+    
+    def _profile_source(self, source_key: str):
+        """Contexto de perfilado por fuente (no-op si --profile no está activo)"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.profile_source(source_key)
+    
+    def _save_scraped(self, scraper, news_data: List[Dict], extracted_urls: List[str]) -> int:
+        """Guardar las noticias de scrape_news y recién entonces completar sus URLs en el registro"""
+        result = self._upsert_news(scraper.source_name, news_data)
+        # Si el guardado falla las URLs se liberan para que otra ejecución las reintente
+        scraper.confirm_urls(extracted_urls, saved=result is not None)
+        return result['inserted'] if result else 0
+    
+    def _upsert_news(self, source_name: str, news_data: List[Dict]) -> Optional[Dict[str, int]]:
+        """Insertar nuevas y reescribir las que cambiaron, registrando latencia y conteos (None si falla)"""
+        with metrics.time_db_insert(source_name), stage('db_insert'):
+            result = self.db_manager.upsert_news(news_data)
+        if result is None:
+            return None
+        metrics.ARTICLES_INSERTED.labels(fuente=source_name).inc(result['inserted'])
+        metrics.ARTICLES_UPDATED.labels(fuente=source_name).inc(result['updated'])
+        return result
+    
+    def recrawl_due_articles(self, limit: int = None) -> Dict[str, Dict[str, int]]:
+        """Revisitar las noticias cuya próxima revisión venció y guardar solo las que cambiaron"""
+        due = self.db_manager.get_due_for_recheck(limit or RecrawlConfig.BATCH_SIZE)
+        source_keys = {source['name']: key for key, source in NewsSources.SOURCES.items()}
+        by_source = {}
+        for row in due:
+            by_source.setdefault(row['fuente'], []).append(row['url'])
+        
+        results = {}
+        for source_name, urls in by_source.items():
+            source_key = source_keys.get(source_name)
+            if source_key not in self.scrapers:
+                # Fuente deshabilitada o renombrada: solo se reprograma
+                self.db_manager.mark_checked(urls)
+                continue
+            try:
+                scraper = self.scrapers[source_key]
+                scraper.deadline = self._source_deadline()
+                news_data, failed = scraper.recheck_news(urls)
+                result = self._upsert_news(source_name, news_data) if news_data else \
+                    {'inserted': 0, 'updated': 0, 'unchanged': 0}
+                if result is None:
+                    raise RuntimeError('no se pudieron guardar las noticias revisadas')
+                # Fallidas, sin tiempo o con otra URL canónica: reprogramar la fila original
+                extracted = {news['url'] for news in news_data}
+                self.db_manager.mark_checked([url for url in urls if url not in extracted])
+                result['failed'] = len(failed)
+            except Exception as e:
+                logger.error(f"Error revisando noticias de {source_name}: {e}")
+                result = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': len(urls)}
+            for outcome in ('updated', 'unchanged', 'failed'):
+                metrics.ARTICLES_RECHECKED.labels(fuente=source_name, resultado=outcome).inc(result[outcome])
+            results[source_key or source_name] = result
+            logger.info(f"[{source_name}] Revisión de {len(urls)} noticias: {result}")
+        return results
+    
     def _save_source_files(self, source_key: str, news_data: List[Dict]):
         """Guardar archivos CSV y JSON para una fuente específica"""
         if not news_data:
@@ -220,7 +363,7 @@ class NewsScraperManager:
                 f"noticias_consolidadas_{timestamp}.json"
             )
             with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(news_dicts, f, ensure_ascii=False, indent=2)
+                json.dump(news_dicts, f, ensure_ascii=False, indent=2, default=str)
             
             # Archivo CSV consolidado
             csv_filename = os.path.join(
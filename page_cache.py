@@ -0,0 +1,96 @@
+"""
+Caché LRU de páginas descargadas, acotada por bytes
+
+Las páginas que el descubrimiento ya descargó (p. ej. artículos que Pachamama
+visita para reconocerlos) se extraen luego desde la caché, sin segunda petición.
+Solo se guardan artículos (is_news_url): las portadas y listados no se repiten.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import ScrapingConfig
+
+
+class CachedPage:
+    """Respuesta HTTP guardada en la caché"""
+
+    __slots__ = ('url', 'content', 'status', 'headers', 'fetched_at')
+
+    def __init__(self, url: str, content: bytes, status: int = 200, headers: Dict[str, str] = None,
+                 fetched_at: float = None):
+        self.url = url
+        self.content = content
+        self.status = status
+        self.headers = headers or {}
+        # Epoch de la descarga (la del registro WARC si la página viene del archivo)
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + len(self.url)
+
+
+class PageCache:
+    """LRU de CachedPage por URL con tope de bytes y antigüedad máxima
+
+    La antigüedad se cuenta desde que la página entra en la caché, no desde su
+    descarga: una página del archivo WARC se sirve aunque sea de hace meses.
+    """
+
+    def __init__(self, max_bytes: int = None, ttl: float = None):
+        self.max_bytes = ScrapingConfig.PAGE_CACHE_BYTES if max_bytes is None else max_bytes
+        self.ttl = ScrapingConfig.PAGE_CACHE_TTL if ttl is None else ttl
+        # url -> (página, momento en que entró en la caché)
+        self._pages: 'OrderedDict[str, Tuple[CachedPage, float]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            entry = self._pages.get(url)
+            if entry is None:
+                return None
+            page, stored_at = entry
+            if time.time() - stored_at > self.ttl:
+                self._remove(url)
+                return None
+            self._pages.move_to_end(url)
+            return page
+
+    def put(self, page: CachedPage):
+        """Guardar una página, desalojando las menos usadas si no entra"""
+        if page.size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(page.url)
+            while self._pages and self._bytes + page.size > self.max_bytes:
+                self._remove(next(iter(self._pages)))
+            self._pages[page.url] = (page, time.time())
+            self._bytes += page.size
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url) is not None
+
+    def pop(self, url: str):
+        """Quitar una página que ya no se va a volver a leer"""
+        with self._lock:
+            self._remove(url)
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+            self._bytes = 0
+
+    def _remove(self, url: str):
+        entry = self._pages.pop(url, None)
+        if entry is not None:
+            self._bytes -= entry[0].size
+
+    @property
+    def size(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._pages)
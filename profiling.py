@@ -0,0 +1,139 @@
+"""
+Modo de perfilado: cProfile determinista + muestreo de pilas anotadas por etapa
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import ProfilingConfig
+
+logger = logging.getLogger(__name__)
+
+# Perfilador activo (solo uno por proceso, igual que cProfile)
+_active = None
+
+
+@contextmanager
+def stage(name: str):
+    """Anotar una etapa (fetch, parse, extract, db_insert...) si hay perfilado activo"""
+    profiler = _active
+    if profiler is None or threading.get_ident() != profiler.thread_id:
+        yield
+        return
+
+    profiler._push_stage(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler._pop_stage(name, time.perf_counter() - start)
+
+
+class RunProfiler:
+    """Perfilador de una ejecución; genera un perfil por fuente en OUTPUT_DIR"""
+
+    def __init__(self, output_dir: str, interval: float = None):
+        self.output_dir = output_dir
+        self.interval = interval or ProfilingConfig.SAMPLE_INTERVAL
+        self.thread_id = None
+        self._stages = ()
+        self._stage_times = defaultdict(float)
+        self._stage_calls = Counter()
+        self._samples = Counter()
+        self._sampling = False
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def _push_stage(self, name: str):
+        # Se reemplaza la tupla completa para que el hilo de muestreo lea un valor consistente
+        self._stages = self._stages + (name,)
+
+    def _pop_stage(self, name: str, elapsed: float):
+        self._stages = self._stages[:-1]
+        path = ';'.join(self._stages + (name,))
+        self._stage_times[path] += elapsed
+        self._stage_calls[path] += 1
+
+    def _sample_loop(self):
+        """Muestrear la pila del hilo perfilado a intervalos fijos"""
+        while self._sampling:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.reverse()
+                self._samples[';'.join(self._stages + tuple(stack))] += 1
+            time.sleep(self.interval)
+
+    @contextmanager
+    def profile_source(self, source_key: str):
+        """Perfilar el bloque y escribir .prof, .collapsed y resumen por etapas"""
+        global _active
+
+        if _active is not None:
+            # Perfilado anidado: el perfil externo ya cubre este bloque
+            yield
+            return
+
+        self.thread_id = threading.get_ident()
+        self._stages = (source_key,)
+        self._stage_times.clear()
+        self._stage_calls.clear()
+        self._samples.clear()
+
+        profile = cProfile.Profile()
+        sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+        _active = self
+        self._sampling = True
+        sampler.start()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            total = time.perf_counter() - start
+            self._sampling = False
+            sampler.join()
+            _active = None
+            self._write_outputs(source_key, profile, total)
+
+    def _write_outputs(self, source_key: str, profile: cProfile.Profile, total: float):
+        """Guardar perfil binario, pilas colapsadas y resumen legible"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        base = os.path.join(self.output_dir, f"profile_{source_key}_{timestamp}")
+
+        try:
+            profile.dump_stats(f"{base}.prof")
+
+            # Formato "pila;colapsada conteo", compatible con flamegraph.pl y speedscope
+            with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+                for stack, count in self._samples.most_common():
+                    f.write(f"{stack} {count}\n")
+
+            stats_stream = io.StringIO()
+            pstats.Stats(profile, stream=stats_stream).sort_stats('cumulative').print_stats(40)
+
+            with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+                f.write(f"Fuente: {source_key}\n")
+                f.write(f"Tiempo total: {total:.3f}s\n")
+                f.write(f"Muestras: {sum(self._samples.values())} (intervalo {self.interval}s)\n\n")
+                f.write("Tiempo por etapa (inclusivo):\n")
+                for path, seconds in sorted(self._stage_times.items(), key=lambda x: -x[1]):
+                    f.write(f"  {path:<50} {seconds:10.3f}s  {self._stage_calls[path]:6d} llamadas\n")
+                f.write("\n")
+                f.write(stats_stream.getvalue())
+
+            logger.info(f"Perfil de {source_key} guardado en {base}.prof/.collapsed/.txt")
+        except Exception as e:
+            logger.error(f"Error guardando perfil de {source_key}: {e}")
@@ -0,0 +1,202 @@
+"""
+Limitador de velocidad adaptativo (AIMD) por host
+
+Cada respuesta rápida acorta el intervalo entre peticiones (aumento aditivo de la
+tasa) y cada señal de saturación (429/503, Retry-After, errores de red o latencia
+en alza) lo multiplica (disminución multiplicativa), siempre entre el piso y el
+techo configurados para la fuente.
+
+Por encima del limitador de cada proceso, un token bucket en Redis fija el
+presupuesto de peticiones por segundo de todo el cluster hacia cada host.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import metrics
+from config import DistributedConfig, ScrapingConfig
+from redis_client import get_redis, redis_key
+
+logger = logging.getLogger(__name__)
+
+# Intervalo desde el que se retrocede cuando el intervalo actual es 0
+MIN_BACKOFF_DELAY = 0.5
+# Respuestas lentas seguidas necesarias para considerar que la latencia sube
+RISING_STREAK = 3
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Interpretar Retry-After en segundos o como fecha HTTP"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class DistributedTokenBucket:
+    """Presupuesto de peticiones por host compartido por todos los workers (Redis)"""
+
+    # Reserva un token y devuelve cuánto esperar por él (0 si había disponibles).
+    # Los tokens pueden quedar en negativo: cada reserva obtiene el siguiente turno libre.
+    ACQUIRE_SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate) - 1
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    if tokens >= 0 then
+        return '0'
+    end
+    return tostring(-tokens / rate)
+    """
+
+    def __init__(self, client, host: str, rate: float, burst: float):
+        self.client = client
+        self.host = host
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.key = redis_key('bucket', host)
+        # Sin uso durante el tiempo de llenar el bucket el estado ya no aporta nada
+        self.ttl = max(60, int(self.burst / rate) + 60)
+        self._acquire = client.register_script(self.ACQUIRE_SCRIPT)
+
+    def acquire(self):
+        """Bloquear hasta obtener un token del presupuesto del host"""
+        try:
+            wait = float(self._acquire(keys=[self.key], args=[self.rate, self.burst, self.ttl]))
+        except Exception as e:
+            # Sin Redis queda solo el limitador local
+            logger.warning(f"Error obteniendo token de {self.host} en Redis: {e}")
+            return
+        if wait > 0:
+            metrics.RATE_BUDGET_WAIT.labels(host=self.host).inc(wait)
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter:
+    """Espaciado adaptativo de peticiones hacia un host"""
+
+    def __init__(self, host: str, initial_delay: float, min_delay: float, max_delay: float,
+                 bucket: DistributedTokenBucket = None):
+        self.host = host
+        self.bucket = bucket
+        self.min_delay = min_delay
+        self.max_delay = max(max_delay, min_delay)
+        self.delay = self._clamp(initial_delay)
+        self.increase_step = ScrapingConfig.RATE_INCREASE_STEP
+        self.decrease_factor = ScrapingConfig.RATE_DECREASE_FACTOR
+        self.target_latency = ScrapingConfig.RATE_TARGET_LATENCY
+        self.latency_rise = ScrapingConfig.RATE_LATENCY_RISE
+        self._latency_avg = None
+        self._rising = 0
+        self._next_slot = 0.0
+        # Hasta cuándo pidió el servidor no recibir peticiones (Retry-After)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._gauge = metrics.HOST_DELAY.labels(host=host)
+        self._gauge.set(self.delay)
+
+    def _clamp(self, delay: float) -> float:
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def wait(self):
+        """Bloquear hasta el próximo turno disponible para este host (local y del cluster)"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+        if self.bucket is not None:
+            self.bucket.acquire()
+
+    def record_response(self, latency: float):
+        """Respuesta recibida: acelerar si es rápida, frenar si la latencia sube"""
+        with self._lock:
+            baseline = self._latency_avg
+            self._latency_avg = latency if baseline is None else 0.8 * baseline + 0.2 * latency
+
+            # Un pico aislado es ruido; varias respuestas lentas seguidas, no
+            if baseline is not None and latency > baseline * self.latency_rise:
+                self._rising += 1
+            else:
+                self._rising = 0
+
+            if self._latency_avg > self.target_latency or self._rising >= RISING_STREAK:
+                self._rising = 0
+                self._decrease()
+            elif self.delay > 0:
+                # Aumento aditivo de la tasa (peticiones/segundo)
+                rate = 1.0 / self.delay + self.increase_step
+                self._set_delay(1.0 / rate)
+
+    def blocked_for(self) -> float:
+        """Segundos que faltan para que venza el último Retry-After del host"""
+        with self._lock:
+            return max(0.0, self._blocked_until - time.monotonic())
+
+    def record_throttle(self, retry_after: float = None):
+        """429/503: frenar y respetar Retry-After completo si el servidor lo indica
+
+        Una espera más larga que max_delay no se hace dentro de wait(): quien
+        pide consulta blocked_for() y deja la URL a la cola de reintentos.
+        """
+        with self._lock:
+            self._decrease()
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                self._next_slot = max(self._next_slot, self._blocked_until)
+        logger.info(f"[{self.host}] Servidor saturado, nuevo intervalo {self.delay:.2f}s"
+                    + (f" (Retry-After {retry_after:.0f}s)" if retry_after else ""))
+
+    def record_error(self):
+        """Error de red o timeout: tratarlo como saturación"""
+        with self._lock:
+            self._decrease()
+
+    def _decrease(self):
+        self._set_delay((self.delay or MIN_BACKOFF_DELAY) / self.decrease_factor)
+
+    def _set_delay(self, delay: float):
+        self.delay = self._clamp(delay)
+        self._gauge.set(self.delay)
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def create_token_bucket(host: str, max_rate: float = None, burst: float = None) -> Optional[DistributedTokenBucket]:
+    """Token bucket del cluster si la fuente tiene presupuesto y Redis está disponible"""
+    if not max_rate or not DistributedConfig.RATE_BUDGET_ENABLED:
+        return None
+    client = get_redis()
+    if client is None:
+        return None
+    return DistributedTokenBucket(client, host, max_rate, burst or max_rate)
+
+
+def get_rate_limiter(host: str, initial_delay: float, min_delay: float, max_delay: float,
+                     max_rate: float = None, burst: float = None) -> AdaptiveRateLimiter:
+    """Limitador compartido del proceso para un host (se crea con los valores de la primera fuente)"""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter(host, initial_delay, min_delay, max_delay,
+                                          bucket=create_token_bucket(host, max_rate, burst))
+            _limiters[host] = limiter
+        return limiter
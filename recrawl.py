@@ -0,0 +1,81 @@
+"""
+Detección de cambios y revisita de artículos ya guardados
+
+Cada fila de noticias guarda un hash de su contenido extraído. Los artículos se
+vuelven a visitar con un calendario que decae con su antigüedad (cada pocos
+minutos las primeras horas, a lo sumo una vez al día después, nunca pasada
+RECRAWL_MAX_AGE) y la BD solo reescribe las filas cuyo hash cambió.
+"""
+import hashlib
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from config import RecrawlConfig
+
+# Campos extraídos que cuentan como contenido del artículo (url y fuente no cambian)
+HASHED_FIELDS = ('titulo', 'fecha', 'hora', 'resumen', 'contenido', 'categoria',
+                 'autor', 'tags', 'link_imagenes')
+# Solo cuentan si salieron de la página (entonces published_at tiene valor)
+DATE_FIELDS = ('fecha', 'hora')
+
+
+def content_hash(news_data: Dict) -> str:
+    """SHA-256 de los campos extraídos de una noticia ya formateada
+
+    Sin fecha extraída, fecha y hora son los valores por defecto de
+    format_news_data (la fecha de hoy) y se hashean vacías: si no, una noticia
+    sin fecha cambiaría de hash cada día sin haber cambiado.
+    """
+    extracted_date = bool(news_data.get('published_at'))
+    digest = hashlib.sha256()
+    for field in HASHED_FIELDS:
+        value = news_data.get(field) if extracted_date or field not in DATE_FIELDS else None
+        digest.update(str(value or '').encode('utf-8'))
+        # Separador para que ('ab', 'c') y ('a', 'bc') no colisionen
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def parse_http_date(value: Optional[str]) -> Optional[str]:
+    """Cabecera Last-Modified a ISO 8601 (None si falta o es inválida)"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_iso_datetime(value: Optional[str]) -> Optional[str]:
+    """Fecha ISO 8601 de una meta (article:modified_time, dateModified) normalizada"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.strip().replace('Z', '+00:00')).isoformat()
+    except ValueError:
+        return None
+
+
+def next_check_sql(created_column: str = 'created_at') -> str:
+    """Expresión SQL de la próxima revisión según la antigüedad de la fila
+
+    Los parámetros van como literales porque la expresión se usa dentro de
+    execute_values, que solo admite el placeholder de VALUES.
+    """
+    if not RecrawlConfig.ENABLED:
+        return 'NULL'
+    age = f"(NOW() - {created_column})"
+    return (
+        f"CASE WHEN {age} > make_interval(secs => {float(RecrawlConfig.MAX_AGE)}) THEN NULL "
+        f"ELSE NOW() + LEAST(GREATEST({age} * {float(RecrawlConfig.AGE_FACTOR)}, "
+        f"make_interval(secs => {float(RecrawlConfig.MIN_INTERVAL)})), "
+        f"make_interval(secs => {float(RecrawlConfig.MAX_INTERVAL)})) END"
+    )
+
+
+def first_check_sql() -> str:
+    """Próxima revisión de un artículo recién insertado"""
+    if not RecrawlConfig.ENABLED:
+        return 'NULL'
+    return f"NOW() + make_interval(secs => {float(RecrawlConfig.MIN_INTERVAL)})"
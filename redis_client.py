@@ -0,0 +1,61 @@
+"""
+Cliente Redis compartido para la coordinación entre workers
+"""
+import logging
+import threading
+import time
+from typing import Optional
+
+import redis
+
+from config import DistributedConfig
+
+logger = logging.getLogger(__name__)
+
+_client = None
+# Momento del último intento fallido (None = nunca se intentó o ya hay cliente)
+_failed_at: Optional[float] = None
+_lock = threading.Lock()
+
+
+def _should_connect() -> bool:
+    if _client is not None:
+        return False
+    return _failed_at is None or time.monotonic() - _failed_at >= DistributedConfig.REDIS_RETRY_INTERVAL
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Obtener el cliente Redis del proceso; None si Redis no está disponible
+
+    Tras un fallo se vuelve a intentar cada REDIS_RETRY_INTERVAL segundos, así un
+    worker de larga vida recupera la coordinación cuando Redis vuelve.
+    """
+    global _client, _failed_at
+
+    if not _should_connect():
+        return _client
+
+    with _lock:
+        if _should_connect():
+            try:
+                client = redis.Redis.from_url(
+                    DistributedConfig.REDIS_URL,
+                    socket_connect_timeout=2,
+                    socket_timeout=5,
+                    health_check_interval=30
+                )
+                client.ping()
+                _client = client
+                _failed_at = None
+                logger.info("Conexión a Redis de coordinación establecida")
+            except redis.RedisError as e:
+                logger.warning(f"Redis no disponible, se usa coordinación local: {e}")
+                _client = None
+                _failed_at = time.monotonic()
+
+    return _client
+
+
+def redis_key(*parts) -> str:
+    """Construir una clave con el prefijo común del sistema"""
+    return ':'.join((DistributedConfig.KEY_PREFIX,) + tuple(str(p) for p in parts))
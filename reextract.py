@@ -0,0 +1,208 @@
+"""
+Reextracción de noticias desde el archivo WARC
+
+Vuelve a correr extract_news_data de cada fuente sobre la última versión
+archivada de cada página (ver warc_archive.py), sin acceso a la red, en un pool
+de procesos con todos los núcleos. Las noticias pasan por el upsert normal: solo
+se reescriben las filas cuyo hash cambió (con su revisión en el historial) y las
+páginas que antes no se pudieron extraer se insertan.
+
+Los registros se recorren en el orden en que se indexaron (rowid del índice).
+Tras guardar cada lote se escribe un checkpoint en OUTPUT_DIR con el último
+rowid, así que una ejecución interrumpida continúa donde quedó aunque los
+workers hayan seguido archivando; al terminar el checkpoint se borra.
+
+Uso:
+    python reextract.py                           # todas las fuentes
+    python reextract.py --source los_andes --workers 8
+    python reextract.py --restart                 # ignorar el checkpoint
+    python reextract.py --dry-run                 # extraer y contar, sin escribir en la BD
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from config import ArchiveConfig, ScrapingConfig
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'reextract_checkpoint.json'
+# Registros por tarea del pool (y por upsert)
+BATCH_SIZE = 200
+
+COUNTERS = ('procesadas', 'extraidas', 'fallidas', 'insertadas', 'actualizadas', 'sin_cambios')
+
+# Scrapers del proceso del pool, uno por fuente
+_scrapers = {}
+
+
+def _get_scraper(source_key: str):
+    scraper = _scrapers.get(source_key)
+    if scraper is None:
+        from scrapers import load_scraper_class
+        scraper = load_scraper_class(source_key)()
+        _scrapers[source_key] = scraper
+    return scraper
+
+
+def extract_batch(directory: str, records: List[Tuple[str, str, str, int, int, int]]) -> Tuple[List[Dict], int]:
+    """Extraer un lote de registros (en un proceso del pool): (noticias, fallidas)"""
+    from warc_archive import read_record
+
+    news_data, failed = [], 0
+    for url, source_key, file_name, offset, length, _ in records:
+        try:
+            page = read_record(directory, file_name, offset, length)
+            news_item = _get_scraper(source_key).extract_from_page(page)
+        except Exception as e:
+            logger.warning(f"Error reextrayendo {url}: {e}")
+            news_item = None
+        if news_item:
+            news_data.append(news_item)
+        else:
+            failed += 1
+    return news_data, failed
+
+
+def load_checkpoint(path: str, sources: Optional[List[str]]) -> Optional[Dict]:
+    """Checkpoint de una ejecución anterior con las mismas fuentes (None si no hay)"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('sources') != sources:
+        logger.warning(f"El checkpoint {path} es de otras fuentes ({checkpoint.get('sources')}), se ignora")
+        return None
+    if checkpoint.get('after') is not None and not isinstance(checkpoint['after'], int):
+        logger.warning(f"El checkpoint {path} no guarda un rowid del índice, se ignora")
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: Dict):
+    """Escribir el checkpoint de forma atómica (un corte no deja un JSON a medias)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _batches(records, size: int):
+    records = iter(records)
+    batch = list(islice(records, size))
+    while batch:
+        yield batch
+        batch = list(islice(records, size))
+
+
+def run(sources: List[str] = None, workers: int = None, restart: bool = False,
+        dry_run: bool = False, directory: str = None, batch_size: int = BATCH_SIZE) -> Optional[Dict]:
+    """Reextraer el archivo completo (o las fuentes dadas); devuelve los contadores o None si falla"""
+    from warc_archive import WarcArchive
+
+    sources = sorted(sources) if sources else None
+    workers = workers or os.cpu_count() or 1
+    archive = WarcArchive(directory)
+    os.makedirs(ScrapingConfig.OUTPUT_DIR, exist_ok=True)
+    checkpoint_path = os.path.join(ScrapingConfig.OUTPUT_DIR, CHECKPOINT_FILE)
+
+    checkpoint = None if restart or dry_run else load_checkpoint(checkpoint_path, sources)
+    if checkpoint is None:
+        checkpoint = {'sources': sources, 'after': None, **{counter: 0 for counter in COUNTERS}}
+    else:
+        logger.info(f"Continuando desde {checkpoint['after']} ({checkpoint['procesadas']} ya procesadas)")
+    after = checkpoint['after']
+
+    db_manager = None
+    if not dry_run:
+        from database import DatabaseManager
+        db_manager = DatabaseManager()
+        if not db_manager.ensure_connection():
+            return None
+        if not db_manager.is_schema_current() and not db_manager.create_tables():
+            db_manager.close()
+            return None
+
+    pending = archive.count_latest(sources, after)
+    logger.info(f"Reextrayendo {pending} páginas archivadas con {workers} procesos")
+    start = time.perf_counter()
+    done = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            batches = _batches(archive.iter_latest(sources, after), batch_size)
+            while True:
+                # Unos pocos lotes por proceso en vuelo: la memoria no crece con el archivo
+                while len(in_flight) < workers * 2:
+                    batch = next(batches, None)
+                    if batch is None:
+                        break
+                    in_flight.append((batch[-1], executor.submit(extract_batch, archive.directory, batch)))
+                if not in_flight:
+                    break
+
+                # Los lotes se guardan en orden para que el checkpoint no salte ninguno
+                last_record, future = in_flight.popleft()
+                news_data, failed = future.result()
+                processed = len(news_data) + failed
+                if db_manager is not None and news_data:
+                    result = db_manager.upsert_news(news_data, reschedule_unchanged=False)
+                    if result is None:
+                        logger.error(f"No se pudo guardar el lote que termina en {last_record[2]}:{last_record[3]} "
+                                     f"(rowid {last_record[5]}); el checkpoint queda en el lote anterior")
+                        return None
+                    checkpoint['insertadas'] += result['inserted']
+                    checkpoint['actualizadas'] += result['updated']
+                    checkpoint['sin_cambios'] += result['unchanged']
+                checkpoint['procesadas'] += processed
+                checkpoint['extraidas'] += len(news_data)
+                checkpoint['fallidas'] += failed
+                checkpoint['after'] = last_record[5]
+                if not dry_run:
+                    save_checkpoint(checkpoint_path, checkpoint)
+
+                done += processed
+                elapsed = time.perf_counter() - start
+                rate = done / elapsed if elapsed > 0 else 0
+                eta = (pending - done) / rate if rate else 0
+                logger.info(f"{done}/{pending} páginas ({rate:.0f}/s, faltan ~{eta:.0f}s): "
+                            f"{checkpoint['actualizadas']} actualizadas, {checkpoint['insertadas']} insertadas, "
+                            f"{checkpoint['fallidas']} sin extraer")
+    finally:
+        archive.close()
+        if db_manager is not None:
+            db_manager.close()
+
+    if os.path.exists(checkpoint_path) and not dry_run:
+        os.remove(checkpoint_path)
+    return {counter: checkpoint[counter] for counter in COUNTERS}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Reextraer noticias desde el archivo WARC, sin red')
+    parser.add_argument('--source', action='append', dest='sources',
+                        help='Fuente a reextraer (clave de NewsSources.SOURCES; repetible)')
+    parser.add_argument('--workers', type=int, default=None, help='Procesos (por defecto, todos los núcleos)')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Páginas por lote')
+    parser.add_argument('--dir', default=None, help=f'Directorio del archivo (por defecto {ArchiveConfig.DIR})')
+    parser.add_argument('--restart', action='store_true', help='Empezar de cero ignorando el checkpoint')
+    parser.add_argument('--dry-run', action='store_true', help='Solo extraer y contar, sin escribir en la BD')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    result = run(args.sources, args.workers, args.restart, args.dry_run, args.dir, args.batch_size)
+    if result is None:
+        return 1
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+Retención en caliente / en frío del contenido de las noticias
+
+El contenido de los artículos con más de RETENTION_HOT_DAYS días se comprime con
+zlib y pasa a la tabla noticias_contenido_frio; en noticias queda NULL y
+contenido_archivado_at marca que existe en frío. Así la tabla caliente (la que
+recorren los listados, el recrawl y los backups incrementales) conserva solo
+filas chicas. DatabaseManager vuelve a poner el contenido en las filas que lee,
+de modo que quien consulta no nota la diferencia.
+"""
+import zlib
+from typing import Optional
+
+from config import RetentionConfig
+
+
+def compress_content(text: str) -> bytes:
+    """Contenido de una noticia comprimido para la tabla fría"""
+    return zlib.compress(text.encode('utf-8'), RetentionConfig.COMPRESSION_LEVEL)
+
+
+def decompress_content(data: Optional[bytes]) -> Optional[str]:
+    """Inverso de compress_content (acepta el memoryview que devuelve psycopg2)"""
+    if data is None:
+        return None
+    return zlib.decompress(bytes(data)).decode('utf-8')
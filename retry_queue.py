@@ -0,0 +1,72 @@
+"""
+Cola de reintentos diferidos
+
+Una URL que falla por un error transitorio no bloquea al hilo: se agenda con
+backoff exponencial con jitter (o con el Retry-After completo del servidor, si es
+mayor) y se vuelve a intentar cuando vence, entre las URLs pendientes.
+"""
+import heapq
+import itertools
+import random
+import time
+from typing import List, Optional, Tuple
+
+from config import ScrapingConfig
+
+
+class RetryQueue:
+    """Montículo de URLs ordenadas por el momento en que vence su reintento"""
+
+    def __init__(self, base_delay: float = None, max_delay: float = None):
+        self.base_delay = ScrapingConfig.RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = ScrapingConfig.RETRY_MAX_DELAY if max_delay is None else max_delay
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = itertools.count()
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Backoff exponencial con jitter completo, nunca menor que Retry-After
+
+        max_delay acota solo el backoff propio: el Retry-After del servidor se respeta entero.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    def schedule(self, url: str, attempt: int, retry_after: float = None) -> float:
+        """Agendar el intento número `attempt` de una URL; devuelve la espera asignada"""
+        delay = self.backoff(attempt, retry_after)
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), url, attempt))
+        return delay
+
+    def pop_due(self) -> Optional[Tuple[str, int]]:
+        """Siguiente reintento vencido, sin esperar"""
+        if self._heap and self._heap[0][0] <= time.monotonic():
+            _, _, url, attempt = heapq.heappop(self._heap)
+            return url, attempt
+        return None
+
+    def next_wait(self) -> float:
+        """Segundos hasta que venza el próximo reintento (0 si ya venció o no hay)"""
+        if not self._heap:
+            return 0.0
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def pop_wait(self) -> Optional[Tuple[str, int]]:
+        """Siguiente reintento, esperando a que venza si hace falta"""
+        if not self._heap:
+            return None
+        wait = self._heap[0][0] - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _, _, url, attempt = heapq.heappop(self._heap)
+        return url, attempt
+
+    def drain(self) -> List[Tuple[str, int]]:
+        """Vaciar la cola devolviendo los reintentos pendientes"""
+        pending = [(url, attempt) for _, _, url, attempt in self._heap]
+        self._heap = []
+        return pending
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -7,6 +7,8 @@ from datetime import datetime
 
 import schedule
 
+import metrics
+from config import MetricsConfig
 from news_scraper_manager import NewsScraperManager
 
 logger = logging.getLogger(__name__)
@@ -28,6 +30,11 @@ class NewsScrapingScheduler:
             logger.info("=== EJECUTANDO TAREA PROGRAMADA DE SCRAPING ===")
             logger.info(f"Hora de ejecución: {datetime.now()}")
             
+            # Tras una hora inactiva la conexión pudo cortarse: verificar y reconectar
+            if not self.manager.setup_database():
+                logger.error("Base de datos no disponible, se omite esta ejecución")
+                return
+            
             # Ejecutar scraping incremental
             results = self.manager.run_incremental_scraping()
             
@@ -97,11 +104,23 @@ def main():
     parser.add_argument('--source', type=str, choices=[
         'diario_sin_fronteras', 'los_andes', 'pachamama', 'puno_noticias'
     ], help='Ejecutar solo una fuente específica')
+    parser.add_argument('--profile', action='store_true',
+                       help='Perfilar la ejecución (solo --mode once); genera .prof y .collapsed por fuente')
+    parser.add_argument('--metrics-port', type=int, default=MetricsConfig.PORT,
+                       help='Puerto local del endpoint de métricas Prometheus')
     
     args = parser.parse_args()
     
+    metrics.start_metrics_server(args.metrics_port)
+    
     scheduler = NewsScrapingScheduler()
     
+    if args.profile:
+        if args.mode == 'once':
+            scheduler.manager.enable_profiling()
+        else:
+            logger.warning("--profile solo está disponible con --mode once; se ignora")
+    
     try:
         if args.mode == 'once':
             if args.source:
@@ -1,14 +1,84 @@
 """
 Módulo de scrapers para diferentes fuentes de noticias
+
+Los scrapers se registran en NewsSources.SOURCES[...]['scraper'] (ruta
+'modulo.Clase') y se importan recién cuando su fuente se usa.
 """
-from .diario_sin_fronteras_scraper import DiarioSinFronterasScraper
-from .los_andes_scraper import LosAndesScraper
-from .pachamama_scraper import PachamamaScraper
-from .puno_noticias_scraper import PunoNoticiasScraper
+import importlib
+import logging
+from collections.abc import Mapping
+from typing import Dict, Iterator, Type
+
+from config import NewsSources
+
+logger = logging.getLogger(__name__)
+
+# Nombres históricos exportados por el paquete (se resuelven bajo demanda)
+_EXPORTS = {
+    'DiarioSinFronterasScraper': 'diario_sin_fronteras',
+    'LosAndesScraper': 'los_andes',
+    'PachamamaScraper': 'pachamama',
+    'PunoNoticiasScraper': 'puno_noticias',
+}
+
+_classes: Dict[str, Type] = {}
+
+
+def load_scraper_class(source_key: str) -> Type:
+    """Importar y devolver la clase de scraper de una fuente"""
+    scraper_class = _classes.get(source_key)
+    if scraper_class is None:
+        module_path, class_name = NewsSources.SOURCES[source_key]['scraper'].rsplit('.', 1)
+        scraper_class = getattr(importlib.import_module(module_path), class_name)
+        _classes[source_key] = scraper_class
+    return scraper_class
+
+
+class ScraperRegistry(Mapping):
+    """Scrapers de las fuentes habilitadas, creados al primer acceso"""
+
+    def __init__(self):
+        self._instances = {}
+
+    def _enabled_keys(self):
+        return [key for key, source in NewsSources.SOURCES.items() if source['enabled']]
+
+    def __getitem__(self, source_key: str):
+        scraper = self._instances.get(source_key)
+        if scraper is None:
+            if source_key not in self:
+                raise KeyError(source_key)
+            scraper = load_scraper_class(source_key)()
+            self._instances[source_key] = scraper
+            logger.info(f"Scraper inicializado: {NewsSources.SOURCES[source_key]['name']}")
+        return scraper
+
+    def __contains__(self, source_key) -> bool:
+        source = NewsSources.SOURCES.get(source_key)
+        return bool(source and source['enabled'])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._enabled_keys())
+
+    def __len__(self) -> int:
+        return len(self._enabled_keys())
+
+    def loaded(self) -> Dict[str, object]:
+        """Scrapers ya creados (sin forzar la importación de los demás)"""
+        return dict(self._instances)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return load_scraper_class(_EXPORTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'DiarioSinFronterasScraper',
-    'LosAndesScraper', 
+    'LosAndesScraper',
     'PachamamaScraper',
-    'PunoNoticiasScraper'
+    'PunoNoticiasScraper',
+    'ScraperRegistry',
+    'load_scraper_class',
 ]
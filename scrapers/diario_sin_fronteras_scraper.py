@@ -9,6 +9,7 @@ from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 
 from base_scraper import BaseNewsScraper
+from config import NewsSources
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +17,16 @@ class DiarioSinFronterasScraper(BaseNewsScraper):
     """Scraper para Diario Sin Fronteras"""
     
     def __init__(self):
+        source = NewsSources.SOURCES['diario_sin_fronteras']
         super().__init__(
             source_name="Diario Sin Fronteras",
-            base_url="https://diariosinfronteras.com.pe/",
-            delay=2
+            base_url=source['base_url'],
+            delay=source['delay'],
+            min_delay=source['min_delay'],
+            max_delay=source['max_delay'],
+            max_rate=source.get('max_rate'),
+            burst=source.get('burst'),
+            source_key='diario_sin_fronteras'
         )
     
     def is_news_url(self, url: str) -> bool:
@@ -88,7 +95,7 @@ class DiarioSinFronterasScraper(BaseNewsScraper):
                     if self.is_news_url(full_url):
                         article_urls.add(full_url)
         
-        return list(article_urls)
+        return self.canonicalize_urls(article_urls)
     
     def extract_pagination_urls(self, soup: BeautifulSoup, base_url: str) -> List[str]:
         """Extraer URLs de paginación"""
@@ -141,40 +148,31 @@ class DiarioSinFronterasScraper(BaseNewsScraper):
         """Descubrir todas las URLs del sitio de forma recursiva"""
         logger.info(f"[{self.source_name}] Iniciando descubrimiento de URLs...")
         
-        urls_to_visit = {self.base_url}
-        all_article_urls = set()
-        visited_urls = set()
-        pages_processed = 0
+        frontier = self.create_frontier()
+        frontier.push(self.base_url)
         
-        while urls_to_visit and pages_processed < max_pages:
-            current_urls = list(urls_to_visit)[:10]  # Procesar en lotes
-            urls_to_visit = set(list(urls_to_visit)[10:])
+        while frontier.processed_count() < max_pages and not self.should_stop():
+            url = frontier.pop()
+            if url is None:
+                break
             
-            for url in current_urls:
-                if url in visited_urls:
-                    continue
-                
-                logger.info(f"[{self.source_name}] Explorando: {url}")
-                soup = self.make_request(url)
-                if not soup:
-                    continue
-                
-                # Extraer URLs de artículos
-                article_urls = self.extract_news_urls(soup, url)
-                all_article_urls.update(article_urls)
-                
-                # Extraer URLs de paginación y categorías para continuar explorando
-                pagination_urls = self.extract_pagination_urls(soup, url)
-                category_urls = self.extract_category_urls(soup, url)
-                
-                new_urls = set(pagination_urls + category_urls)
-                for new_url in new_urls:
-                    if new_url not in visited_urls:
-                        urls_to_visit.add(new_url)
-                
-                visited_urls.add(url)
-                pages_processed += 1
+            frontier.mark_visited(url)
+            logger.info(f"[{self.source_name}] Explorando: {url}")
+            soup = self.make_request(url)
+            if not soup:
+                continue
+            frontier.mark_processed()
+            
+            # Extraer URLs de artículos
+            frontier.add_found(self.extract_news_urls(soup, url))
+            
+            # Extraer URLs de paginación y categorías para continuar explorando
+            pagination_urls = self.extract_pagination_urls(soup, url)
+            category_urls = self.extract_category_urls(soup, url)
+            
+            self.enqueue_urls(frontier, pagination_urls + category_urls)
         
+        all_article_urls = frontier.found()
         logger.info(f"[{self.source_name}] Descubrimiento completado. Encontradas {len(all_article_urls)} URLs de artículos")
         return list(all_article_urls)
     
@@ -204,7 +202,8 @@ class DiarioSinFronterasScraper(BaseNewsScraper):
                 'categoria': categoria,
                 'autor': autor,
                 'tags': tags,
-                'url': url,
+                'url': self.extract_canonical_url(soup, url),
+                'modified_at': self.extract_modified_time(soup, url),
                 'link_imagenes': imagenes
             }
             
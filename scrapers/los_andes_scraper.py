@@ -9,6 +9,8 @@ from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 
 from base_scraper import BaseNewsScraper
+from config import NewsSources
+from url_canonicalizer import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +18,16 @@ class LosAndesScraper(BaseNewsScraper):
     """Scraper para Los Andes"""
     
     def __init__(self):
+        source = NewsSources.SOURCES['los_andes']
         super().__init__(
             source_name="Los Andes",
-            base_url="https://losandes.com.pe",
-            delay=1
+            base_url=source['base_url'],
+            delay=source['delay'],
+            min_delay=source['min_delay'],
+            max_delay=source['max_delay'],
+            max_rate=source.get('max_rate'),
+            burst=source.get('burst'),
+            source_key='los_andes'
         )
     
     def is_news_url(self, url: str) -> bool:
@@ -101,7 +109,7 @@ class LosAndesScraper(BaseNewsScraper):
                     if self.is_news_url(full_url):
                         article_urls.add(full_url)
         
-        return list(article_urls)
+        return self.canonicalize_urls(article_urls)
     
     def discover_news_urls(self, max_pages: int = 50) -> List[str]:
         """Obtener todas las URLs de artículos del sitio"""
@@ -124,6 +132,8 @@ class LosAndesScraper(BaseNewsScraper):
         
         # Explorar páginas principales y sus paginaciones
         for section in main_sections:
+            if self.should_stop():
+                break
             section_url = urljoin(self.base_url, section)
             logger.info(f"[{self.source_name}] Explorando sección: {section_url}")
             
@@ -172,6 +182,8 @@ class LosAndesScraper(BaseNewsScraper):
         ]
         
         for sitemap in sitemaps:
+            if self.should_stop():
+                break
             sitemap_url = urljoin(self.base_url, sitemap)
             logger.info(f"[{self.source_name}] Explorando sitemap: {sitemap_url}")
             
@@ -182,7 +194,7 @@ class LosAndesScraper(BaseNewsScraper):
                 for url_tag in urls:
                     url = url_tag.get_text().strip()
                     if self.is_news_url(url):
-                        article_urls.add(url)
+                        article_urls.add(canonicalize_url(url))
                 
                 logger.info(f"[{self.source_name}] URLs encontradas en sitemap: {len(urls)}")
     
@@ -212,7 +224,8 @@ class LosAndesScraper(BaseNewsScraper):
                 'categoria': categoria,
                 'autor': autor,
                 'tags': tags,
-                'url': url,
+                'url': self.extract_canonical_url(soup, url),
+                'modified_at': self.extract_modified_time(soup, url),
                 'link_imagenes': imagenes
             }
             
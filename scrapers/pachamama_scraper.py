@@ -9,6 +9,7 @@ from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 
 from base_scraper import BaseNewsScraper
+from config import NewsSources
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +17,16 @@ class PachamamaScraper(BaseNewsScraper):
     """Scraper para Pachamama Radio"""
     
     def __init__(self):
+        source = NewsSources.SOURCES['pachamama']
         super().__init__(
             source_name="Pachamama Radio",
-            base_url="https://pachamamaradio.org/",
-            delay=2
+            base_url=source['base_url'],
+            delay=source['delay'],
+            min_delay=source['min_delay'],
+            max_delay=source['max_delay'],
+            max_rate=source.get('max_rate'),
+            burst=source.get('burst'),
+            source_key='pachamama'
         )
     
     def is_news_url(self, url: str) -> bool:
@@ -101,49 +108,40 @@ class PachamamaScraper(BaseNewsScraper):
                         ]):
                             enlaces.add(href)
         
-        return list(enlaces)
+        return self.canonicalize_urls(enlaces)
     
     def discover_news_urls(self, max_pages: int = 50) -> List[str]:
         """Ejecuta descubrimiento recursivo de URLs"""
         logger.info(f"[{self.source_name}] Iniciando descubrimiento recursivo de URLs")
         
-        urls_por_procesar = {self.base_url}
-        urls_visitadas = set()
-        all_news_urls = set()
-        pages_processed = 0
+        frontier = self.create_frontier()
+        frontier.push(self.base_url)
         
-        while urls_por_procesar and pages_processed < max_pages:
-            logger.info(f"[{self.source_name}] Procesando nivel, URLs pendientes: {len(urls_por_procesar)}")
+        while frontier.processed_count() < max_pages and not self.should_stop():
+            url = frontier.pop()
+            if url is None:
+                break
             
-            urls_nivel_actual = list(urls_por_procesar)[:10]  # Procesar en lotes
-            urls_por_procesar = set(list(urls_por_procesar)[10:])
+            logger.info(f"[{self.source_name}] Procesando: {url} (pendientes: {len(frontier)})")
+            frontier.mark_visited(url)
             
-            for url in urls_nivel_actual:
-                if url in urls_visitadas:
-                    continue
-                
-                logger.info(f"[{self.source_name}] Procesando: {url}")
-                urls_visitadas.add(url)
-                
-                soup = self.make_request(url)
-                if not soup:
-                    continue
-                
-                # Si parece ser una noticia individual, agregarla
-                if self.es_noticia_individual(soup, url):
-                    all_news_urls.add(url)
-                
-                # Buscar más enlaces
-                enlaces_noticias = self.extract_news_urls(soup, url)
-                enlaces_paginas = self.encontrar_paginas_navegacion(soup, url)
-                
-                # Añadir enlaces no visitados
-                for enlace in enlaces_noticias + enlaces_paginas:
-                    if enlace not in urls_visitadas:
-                        urls_por_procesar.add(enlace)
-                
-                pages_processed += 1
+            soup = self.make_request(url)
+            if not soup:
+                continue
+            frontier.mark_processed()
+            
+            # Si parece ser una noticia individual, agregarla
+            if self.es_noticia_individual(soup, url):
+                frontier.add_found([url])
+            
+            # Buscar más enlaces
+            enlaces_noticias = self.extract_news_urls(soup, url)
+            enlaces_paginas = self.encontrar_paginas_navegacion(soup, url)
+            
+            # Añadir enlaces nunca encolados, los más prometedores primero
+            self.enqueue_urls(frontier, enlaces_noticias + enlaces_paginas)
         
+        all_news_urls = frontier.found()
         logger.info(f"[{self.source_name}] Descubrimiento completado. Total de noticias encontradas: {len(all_news_urls)}")
         return list(all_news_urls)
     
@@ -216,7 +214,8 @@ class PachamamaScraper(BaseNewsScraper):
                 'categoria': categoria,
                 'autor': autor,
                 'tags': tags,
-                'url': url,
+                'url': self.extract_canonical_url(soup, url),
+                'modified_at': self.extract_modified_time(soup, url),
                 'link_imagenes': imagenes
             }
             
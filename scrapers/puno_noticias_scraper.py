@@ -9,6 +9,7 @@ from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 
 from base_scraper import BaseNewsScraper
+from config import NewsSources
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +17,16 @@ class PunoNoticiasScraper(BaseNewsScraper):
     """Scraper para Puno Noticias"""
     
     def __init__(self):
+        source = NewsSources.SOURCES['puno_noticias']
         super().__init__(
             source_name="Puno Noticias",
-            base_url="https://punonoticias.pe/",
-            delay=1
+            base_url=source['base_url'],
+            delay=source['delay'],
+            min_delay=source['min_delay'],
+            max_delay=source['max_delay'],
+            max_rate=source.get('max_rate'),
+            burst=source.get('burst'),
+            source_key='puno_noticias'
         )
     
     def is_news_url(self, url: str) -> bool:
@@ -65,7 +72,7 @@ class PunoNoticiasScraper(BaseNewsScraper):
                     if self.is_news_url(full_url):
                         news_urls.append(full_url)
         
-        return list(set(news_urls))
+        return self.canonicalize_urls(news_urls)
     
     def extract_pagination_urls(self, soup: BeautifulSoup, base_url: str) -> List[str]:
         """Extraer URLs de paginación"""
@@ -118,40 +125,32 @@ class PunoNoticiasScraper(BaseNewsScraper):
     
     def discover_news_urls(self, max_pages: int = 50) -> List[str]:
         """Descubrir todas las URLs del sitio"""
-        discovered_urls = set()
-        to_visit = [self.base_url]
-        visited = set()
-        pages_processed = 0
+        frontier = self.create_frontier()
+        frontier.push(self.base_url)
 
         logger.info(f"[{self.source_name}] Iniciando descubrimiento de URLs...")
 
-        while to_visit and pages_processed < max_pages:
-            current_url = to_visit.pop(0)
-            
-            if current_url in visited:
-                continue
+        while frontier.processed_count() < max_pages and not self.should_stop():
+            current_url = frontier.pop()
+            if current_url is None:
+                break
                 
-            visited.add(current_url)
+            frontier.mark_visited(current_url)
             logger.info(f"[{self.source_name}] Explorando: {current_url}")
             
             soup = self.make_request(current_url)
             if not soup:
                 continue
+            frontier.mark_processed()
 
             # Encontrar URLs de noticias
-            news_urls = self.extract_news_urls(soup, current_url)
-            discovered_urls.update(news_urls)
-            
-            # Encontrar páginas de paginación
-            pagination_urls = self.extract_pagination_urls(soup, current_url)
-            to_visit.extend([url for url in pagination_urls if url not in visited])
-            
-            # Encontrar URLs de categorías
-            category_urls = self.extract_category_urls(soup, current_url)
-            to_visit.extend([url for url in category_urls if url not in visited])
+            frontier.add_found(self.extract_news_urls(soup, current_url))
             
-            pages_processed += 1
+            # Encolar paginación y categorías
+            self.enqueue_urls(frontier, self.extract_pagination_urls(soup, current_url))
+            self.enqueue_urls(frontier, self.extract_category_urls(soup, current_url))
 
+        discovered_urls = frontier.found()
         logger.info(f"[{self.source_name}] Descubiertas {len(discovered_urls)} URLs de noticias")
         return list(discovered_urls)
     
@@ -181,7 +180,8 @@ class PunoNoticiasScraper(BaseNewsScraper):
                 'categoria': categoria,
                 'autor': autor,
                 'tags': tags,
-                'url': url,
+                'url': self.extract_canonical_url(soup, url),
+                'modified_at': self.extract_modified_time(soup, url),
                 'link_imagenes': imagenes
             }
 
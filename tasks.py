@@ -1,12 +1,27 @@
 """
 Tareas Celery para ejecutar scraping y programación periódica
+
+Flujo fan-out de scrape_all_sources:
+
+    chord(discover_source(fuente) por fuente)           -> finalize_scraping_run
+            └─ chord(scrape_article_batch(lote) por lote) -> aggregate_source_results
+
+Cada tarea de descubrimiento se reemplaza por un chord de lotes de artículos, de
+modo que todos los workers (de todos los nodos) comparten el trabajo.
 """
 import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, List
 
-from celery import Celery
+from billiard.process import current_process
+from celery import Celery, chord, group
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
 
-from config import CeleryConfig
+import metrics
+from config import CeleryConfig, MetricsConfig, NewsSources, RecrawlConfig, RetentionConfig
+from frontier import new_run_id
 from news_scraper_manager import NewsScraperManager
 
 logger = logging.getLogger(__name__)
@@ -21,7 +36,19 @@ celery_app.conf.timezone = CeleryConfig.TIMEZONE
 celery_app.conf.task_routes = {
     'tasks.scrape_all_sources': {'queue': 'scraping'},
     'tasks.scrape_single_source': {'queue': 'scraping'},
+    'tasks.discover_source': {'queue': 'scraping'},
+    'tasks.scrape_article_batch': {'queue': 'scraping'},
+    'tasks.aggregate_source_results': {'queue': 'scraping'},
+    'tasks.finalize_scraping_run': {'queue': 'scraping'},
+    'tasks.recrawl_updated_articles': {'queue': 'scraping'},
+    'tasks.archive_cold_content': {'queue': 'scraping'},
 }
+# Los lotes son largos: cada worker toma una tarea a la vez para repartir mejor
+celery_app.conf.worker_prefetch_multiplier = 1
+celery_app.conf.task_acks_late = True
+# init_worker_manager conecta a PostgreSQL y verifica el esquema antes de avisar
+# que el proceso está listo (el límite por defecto de Celery es 4 s)
+celery_app.conf.worker_proc_alive_timeout = CeleryConfig.PROCESS_INIT_TIMEOUT
 
 # Programación periódica (cada hora por defecto)
 celery_app.conf.beat_schedule = {
@@ -30,31 +57,204 @@ celery_app.conf.beat_schedule = {
         'schedule': crontab(minute=0),  # cada hora al minuto 0
     },
 }
+if RecrawlConfig.ENABLED:
+    # Revisión de noticias recientes con calendario decreciente (ver recrawl.py)
+    celery_app.conf.beat_schedule['recrawl-updated-articles'] = {
+        'task': 'tasks.recrawl_updated_articles',
+        'schedule': RecrawlConfig.SCHEDULE_MINUTES * 60,
+    }
+if RetentionConfig.ENABLED:
+    # Contenido de noticias antiguas a la tabla fría (ver retention.py), una vez al día
+    celery_app.conf.beat_schedule['archive-cold-content'] = {
+        'task': 'tasks.archive_cold_content',
+        'schedule': crontab(minute=30, hour=RetentionConfig.SCHEDULE_HOUR),
+    }
+
+@worker_process_init.connect
+def start_worker_metrics(**kwargs):
+    """Exponer métricas en cada proceso hijo del worker (puerto base + índice)"""
+    index = getattr(current_process(), 'index', 0) or 0
+    metrics.start_metrics_server(MetricsConfig.WORKER_PORT + index)
+
+# Un NewsScraperManager por proceso del worker (pool prefork: una tarea a la vez
+# por proceso). Scrapers, sesiones HTTP con keep-alive, caché de páginas,
+# conexión a PostgreSQL y esquema verificado se reutilizan entre tareas.
+_worker_manager = None
+
+def get_worker_manager() -> NewsScraperManager:
+    """Manager del proceso actual, creado en el primer uso"""
+    global _worker_manager
+    if _worker_manager is None:
+        _worker_manager = NewsScraperManager()
+    return _worker_manager
+
+@worker_process_init.connect
+def init_worker_manager(**kwargs):
+    """Crear el manager y preparar la BD al arrancar el proceso, no en la primera tarea"""
+    if not get_worker_manager().setup_database():
+        logger.warning("[Celery] BD no disponible al iniciar el proceso; se reintentará en cada tarea")
+
+@worker_process_shutdown.connect
+def close_worker_manager(**kwargs):
+    if _worker_manager is not None:
+        _worker_manager.close()
 
-@celery_app.task(name='tasks.scrape_all_sources')
-def scrape_all_sources():
+@contextmanager
+def scraper_manager(setup_db: bool = True):
+    """Manager del proceso para una tarea, con la conexión a la BD verificada si se requiere"""
+    manager = get_worker_manager()
+    # Tras la primera vez setup_database solo hace el health check de la conexión
+    if setup_db and not manager.setup_database():
+        raise RuntimeError('db_setup_failed')
+    yield manager
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+@celery_app.task(name='tasks.scrape_all_sources', bind=True)
+def scrape_all_sources(self, profile: bool = False):
     logger.info("[Celery] Ejecutando scraping de todas las fuentes")
-    manager = NewsScraperManager()
-    try:
+
+    if profile:
+        # El perfilado necesita la ejecución completa en un solo proceso
+        manager = get_worker_manager()
         if not manager.setup_database():
             logger.error("[Celery] Error configurando BD")
             return {'status': 'error', 'message': 'db_setup_failed'}
-        results = manager.run_incremental_scraping()
-        logger.info(f"[Celery] Resultados: {results}")
-        return {'status': 'ok', 'results': results}
-    finally:
-        manager.close()
+        manager.enable_profiling()
+        try:
+            results = manager.run_incremental_scraping()
+            logger.info(f"[Celery] Resultados: {results}")
+            return {'status': 'ok', 'results': results}
+        finally:
+            manager.disable_profiling()
+
+    source_keys = [key for key, source in NewsSources.SOURCES.items() if source['enabled']]
+    # Todas las tareas de la ejecución comparten el mismo límite de tiempo
+    run_deadline = NewsScraperManager.run_deadline()
+    # y la misma frontera: un reintento de discover_source continúa la de su ejecución
+    run_id = new_run_id()
+    workflow = chord(
+        group(discover_source.s(key, run_deadline, run_id) for key in source_keys),
+        finalize_scraping_run.s()
+    )
+    logger.info(f"[Celery] Fan-out de {len(source_keys)} fuentes")
+    # El resultado de esta tarea pasa a ser el del chord
+    raise self.replace(workflow)
+
+@celery_app.task(name='tasks.discover_source', bind=True)
+def discover_source(self, source_key: str, run_deadline: float = None, run_id: str = None):
+    """Descubrir URLs de una fuente y reemplazarse por un chord de lotes de artículos"""
+    logger.info(f"[Celery] Descubriendo URLs de {source_key}")
+    empty = {'source': source_key, 'urls': 0, 'batches': 0, 'extracted': 0, 'inserted': 0}
+    try:
+        with scraper_manager(setup_db=False) as manager:
+            urls = manager.discover_source(source_key, run_deadline, run_id)
+            # Los artículos ya descargados al descubrir se extraen aquí, desde la caché
+            pending, prefetched = manager.scrape_prefetched(source_key, urls, run_deadline, run_id)
+    except Exception as e:
+        # Una fuente caída no debe romper el chord: las demás se exportan igual
+        logger.error(f"[Celery] Error descubriendo URLs de {source_key}: {e}")
+        return {**empty, 'error': str(e)}
+
+    batches = _chunks(pending, CeleryConfig.ARTICLE_BATCH_SIZE)
+    if not batches:
+        return {**empty, 'urls': len(urls), **prefetched}
+
+    logger.info(f"[Celery] {source_key}: {len(urls)} URLs, {len(urls) - len(pending)} ya descargadas, "
+                f"{len(pending)} en {len(batches)} lotes")
+    raise self.replace(chord(
+        group(scrape_article_batch.s(source_key, batch, run_deadline, run_id) for batch in batches),
+        aggregate_source_results.s(source_key, len(urls), prefetched)
+    ))
+
+@celery_app.task(name='tasks.scrape_article_batch')
+def scrape_article_batch(source_key: str, urls: List[str], run_deadline: float = None,
+                         run_id: str = None):
+    """Scrapear e insertar un lote de artículos de una fuente"""
+    if run_deadline is not None and time.time() >= run_deadline:
+        # Lotes que quedaron en cola tras agotarse la ejecución: no pisar el próximo beat
+        logger.warning(f"[Celery] Presupuesto agotado, lote de {source_key} omitido")
+        return {'source': source_key, 'extracted': 0, 'inserted': 0, 'skipped': len(urls)}
+    try:
+        with scraper_manager() as manager:
+            result = manager.scrape_url_batch(source_key, urls, run_deadline, run_id)
+    except Exception as e:
+        # Un lote fallido no debe romper el chord de la fuente
+        logger.error(f"[Celery] Error en lote de {source_key}: {e}")
+        result = {'extracted': 0, 'inserted': 0, 'error': str(e)}
+    result['source'] = source_key
+    return result
+
+@celery_app.task(name='tasks.aggregate_source_results')
+def aggregate_source_results(batch_results: List[Dict], source_key: str, url_count: int,
+                             prefetched: Dict = None):
+    """Sumar los resultados de los lotes de una fuente (y de lo extraído al descubrir)"""
+    prefetched = prefetched or {}
+    summary = {
+        'source': source_key,
+        'urls': url_count,
+        'batches': len(batch_results),
+        'extracted': prefetched.get('extracted', 0) + sum(r.get('extracted', 0) for r in batch_results),
+        'inserted': prefetched.get('inserted', 0) + sum(r.get('inserted', 0) for r in batch_results),
+        'failed_batches': sum(1 for r in batch_results if r.get('error')),
+        'skipped_urls': sum(r.get('skipped', 0) for r in batch_results),
+    }
+    logger.info(f"[Celery] Fuente completada: {summary}")
+    return summary
+
+@celery_app.task(name='tasks.finalize_scraping_run')
+def finalize_scraping_run(source_results: List[Dict]):
+    """Consolidar resultados de todas las fuentes y generar los archivos de exportación"""
+    results = {r['source']: r['inserted'] for r in source_results}
+    logger.info(f"[Celery] Resultados: {results}")
+
+    manager = get_worker_manager()
+    manager.db_manager.health_check()
+    manager.generate_consolidated_files()
+    stats = manager.get_statistics()
+    logger.info(f"[Celery] Estadísticas actuales: {stats}")
+
+    return {'status': 'ok', 'results': results, 'sources': source_results}
 
 @celery_app.task(name='tasks.scrape_single_source')
-def scrape_single_source(source_key: str):
+def scrape_single_source(source_key: str, profile: bool = False):
     logger.info(f"[Celery] Ejecutando scraping de fuente: {source_key}")
-    manager = NewsScraperManager()
+    manager = get_worker_manager()
+    if not manager.setup_database():
+        logger.error("[Celery] Error configurando BD")
+        return {'status': 'error', 'message': 'db_setup_failed'}
+    if profile:
+        manager.enable_profiling()
     try:
-        if not manager.setup_database():
-            logger.error("[Celery] Error configurando BD")
-            return {'status': 'error', 'message': 'db_setup_failed'}
         count = manager.scrape_single_source(source_key)
         logger.info(f"[Celery] Noticias insertadas: {count}")
         return {'status': 'ok', 'inserted': count}
     finally:
-        manager.close()
+        manager.disable_profiling()
+
+@celery_app.task(name='tasks.recrawl_updated_articles')
+def recrawl_updated_articles(limit: int = None):
+    """Revisitar las noticias con revisión vencida y actualizar solo las que cambiaron"""
+    try:
+        with scraper_manager() as manager:
+            results = manager.recrawl_due_articles(limit)
+    except Exception as e:
+        # El próximo beat vuelve a tomar las revisiones vencidas
+        logger.error(f"[Celery] Error en la revisión de noticias: {e}")
+        return {'status': 'error', 'message': str(e)}
+    logger.info(f"[Celery] Revisión de noticias: {results}")
+    return {'status': 'ok', 'results': results}
+
+@celery_app.task(name='tasks.archive_cold_content')
+def archive_cold_content(hot_days: int = None):
+    """Mover a la tabla fría el contenido de las noticias antiguas"""
+    try:
+        with scraper_manager() as manager:
+            result = manager.db_manager.archive_old_content(hot_days)
+    except Exception as e:
+        # Lo que no se archivó hoy sigue siendo candidato en la próxima ejecución
+        logger.error(f"[Celery] Error en la retención de contenido: {e}")
+        return {'status': 'error', 'message': str(e)}
+    logger.info(f"[Celery] Retención de contenido: {result}")
+    return {'status': 'ok', **result}
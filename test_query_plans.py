@@ -0,0 +1,187 @@
+"""
+Prueba de regresión de planes de consulta
+
+Crea un esquema temporal, le aplica las migraciones, lo llena con datos
+sintéticos y revisa con EXPLAIN que cada consulta de DatabaseManager use sus
+índices: ningún Seq Scan ni Sort en el plan. El planificador corre con su
+configuración por defecto sobre una tabla con estadísticas y mapa de visibilidad
+al día, así que la prueba verifica el plan que elige, no solo que exista uno con
+índice. Si un cambio de esquema o de SQL deja una consulta sin índice, falla.
+
+Requiere la base de datos configurada en .env; el esquema temporal se borra al
+terminar.
+
+Uso:
+    python test_query_plans.py
+"""
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import migrations
+from database import (
+    ARCHIVE_CANDIDATES_SQL, COLD_CONTENT_SQL, COUNT_BY_SOURCE_SQL, COUNT_NEWS_SQL,
+    COUNT_RECENT_SQL, DUE_FOR_CHECK_SQL, HEADLINES_BY_SOURCE_SQL, NEWS_BY_SOURCE_SQL, NEWS_BY_TAG_SQL, NEWS_BY_URL_SQL, NEWS_IMAGES_SQL,
+    NEWS_PUBLISHED_BETWEEN_SQL, NEWS_TAGS_SQL, RECENT_NEWS_SQL, REVISIONS_BY_URL_SQL,
+    DatabaseManager,
+)
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = f"plan_test_{os.getpid()}"
+# Suficientes filas para que recorrer la tabla entera nunca sea lo más barato
+SEED_ROWS = 200000
+
+# Nodos que indican que una consulta dejó de usar su índice
+FORBIDDEN_NODES = {'Seq Scan', 'Sort', 'Incremental Sort'}
+
+SEED_SQL = [
+    """
+    INSERT INTO noticias (titulo, fecha, hora, resumen, contenido, tags, url, fuente,
+                          fecha_extraccion, created_at, published_at, next_check)
+    SELECT 'Titular ' || i, (NOW() - i * INTERVAL '1 minute')::date, '12:00', 'Resumen ' || i,
+           repeat('contenido ', 50), 'politica, economia',
+           'https://example.com/noticia/' || i, 'Fuente ' || (i % 5),
+           NOW() - i * INTERVAL '1 minute', NOW() - i * INTERVAL '1 minute',
+           NOW() - i * INTERVAL '1 minute',
+           CASE WHEN i % 10 = 0 THEN NOW() - i * INTERVAL '1 second' END
+    FROM generate_series(1, %s) AS i
+    """,
+    """
+    INSERT INTO noticia_tags (noticia_id, tag, published_at)
+    SELECT id, 'tag ' || (id % 200), published_at FROM noticias
+    """,
+    """
+    INSERT INTO noticia_imagenes (noticia_id, posicion, url)
+    SELECT id, 1, url || '/imagen.jpg' FROM noticias
+    """,
+    """
+    INSERT INTO noticias_revisiones (noticia_id, revision, delta)
+    SELECT id, 1, '\\x00'::bytea FROM noticias WHERE id % 20 = 0
+    """,
+]
+
+
+def query_cases():
+    """(nombre, SQL, parámetros, nodo que debe aparecer o None)"""
+    now = datetime.now(timezone.utc)
+    return [
+        ("Noticia por URL", NEWS_BY_URL_SQL, ('https://example.com/noticia/42',), None),
+        ("Noticias por fuente", NEWS_BY_SOURCE_SQL, ('Fuente 1', 100), None),
+        ("Titulares por fuente", HEADLINES_BY_SOURCE_SQL, ('Fuente 1', 100), 'Index Only Scan'),
+        ("Noticias recientes", RECENT_NEWS_SQL, (24,), None),
+        ("Noticias por tag", NEWS_BY_TAG_SQL, ('tag 7', 100), None),
+        ("Noticias publicadas entre fechas", NEWS_PUBLISHED_BETWEEN_SQL,
+         (now - timedelta(days=2), now - timedelta(days=1), 1000), None),
+        ("Tags de una noticia", NEWS_TAGS_SQL, (42,), None),
+        ("Imágenes de una noticia", NEWS_IMAGES_SQL, (42,), None),
+        ("Revisiones por URL", REVISIONS_BY_URL_SQL, ('https://example.com/noticia/40',), None),
+        ("Cola de revisión", DUE_FOR_CHECK_SQL, (200,), 'Index Only Scan'),
+        ("Candidatas a archivar", ARCHIVE_CANDIDATES_SQL, (7, 500), None),
+        ("Contenido en frío", COLD_CONTENT_SQL, ([40, 42],), None),
+        # Conteos de get_statistics: recorren un índice entero, pero nunca la tabla
+        ("Total de noticias", COUNT_NEWS_SQL, None, 'Index Only Scan'),
+        ("Noticias por fuente (conteo)", COUNT_BY_SOURCE_SQL, None, 'Index Only Scan'),
+        ("Noticias de las últimas 24 horas", COUNT_RECENT_SQL, None, 'Index Only Scan'),
+    ]
+
+
+def plan_nodes(plan):
+    """Tipos de nodo del plan JSON de EXPLAIN, recorrido en profundidad"""
+    nodes = [plan['Node Type']]
+    for child in plan.get('Plans', []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def setup_schema(db_manager):
+    """Esquema temporal migrado y con datos"""
+    cursor = db_manager.cursor
+    cursor.execute(f"CREATE SCHEMA {SCHEMA}")
+    cursor.execute(f"SET search_path TO {SCHEMA}")
+    db_manager.connection.commit()
+    migrations.migrate(db_manager.connection)
+
+    for statement in SEED_SQL:
+        cursor.execute(statement, (SEED_ROWS,) if '%s' in statement else None)
+    db_manager.connection.commit()
+
+    # VACUUM no corre dentro de una transacción. Deja el mapa de visibilidad como
+    # en una tabla en producción (sin él los index-only scan nunca convienen)
+    db_manager.connection.autocommit = True
+    try:
+        cursor.execute("VACUUM ANALYZE")
+    finally:
+        db_manager.connection.autocommit = False
+
+
+def check_query_plans(db_manager):
+    """Revisar el plan de cada consulta"""
+    failures = 0
+    for name, sql, params, expected_node in query_cases():
+        db_manager.cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        row = db_manager.cursor.fetchone()
+        plan = row['QUERY PLAN'][0]['Plan']
+        nodes = plan_nodes(plan)
+
+        forbidden = FORBIDDEN_NODES.intersection(nodes)
+        if forbidden:
+            print(f"❌ {name}: {', '.join(sorted(forbidden))} en el plan ({' -> '.join(nodes)})")
+            failures += 1
+        elif expected_node and expected_node not in nodes:
+            print(f"❌ {name}: se esperaba {expected_node} ({' -> '.join(nodes)})")
+            failures += 1
+        else:
+            print(f"✅ {name}: {' -> '.join(nodes)}")
+    db_manager.connection.rollback()
+    return failures
+
+
+def main():
+    """Función principal de pruebas"""
+    print("🚀 PRUEBA DE PLANES DE CONSULTA")
+    print("=" * 60)
+    print(f"Iniciado en: {datetime.now()}")
+    print()
+
+    db_manager = DatabaseManager()
+    if not db_manager.ensure_connection():
+        print("❌ Error conectando a la base de datos")
+        return 1
+
+    try:
+        print(f"🔍 Creando esquema temporal {SCHEMA} con {SEED_ROWS} noticias...")
+        setup_schema(db_manager)
+        total = len(query_cases())
+        failures = check_query_plans(db_manager)
+    except Exception as e:
+        print(f"❌ Error en prueba de planes: {e}")
+        return 1
+    finally:
+        db_manager.connection.rollback()
+        db_manager.cursor.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        db_manager.connection.commit()
+        db_manager.close()
+
+    print("\n" + "=" * 60)
+    print("📊 RESUMEN DE PRUEBAS")
+    print("=" * 60)
+    print(f"Consultas con índice: {total - failures}/{total}")
+
+    if failures == 0:
+        print("🎉 ¡Todas las consultas usan sus índices!")
+        return 0
+    else:
+        print("⚠️ Algunas consultas perdieron su índice. Revisar migraciones.")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -93,6 +93,61 @@ def test_single_scraper():
         print(f"❌ Error en prueba de scraper individual: {e}")
         return False
 
+def test_breaker_retry_after():
+    """Probar que un Retry-After diferido no consume la prueba del circuito semiabierto"""
+    print("🔍 Probando circuito semiabierto con Retry-After...")
+    
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    from circuit_breaker import CircuitBreaker
+    from rate_limiter import AdaptiveRateLimiter
+    from scrapers.puno_noticias_scraper import PunoNoticiasScraper
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = b'<html><body>ok</body></html>'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/noticia/prueba/"
+        scraper = PunoNoticiasScraper()
+        scraper.request_attempts = 1
+        # Circuito abierto que ya puede probar, y el host pidió más espera que max_delay
+        scraper.breaker = CircuitBreaker('prueba', failure_threshold=1, reset_timeout=0)
+        scraper.breaker.record_failure()
+        limiter = AdaptiveRateLimiter('prueba', 0, 0, 0.1)
+        scraper.get_rate_limiter = lambda host: limiter
+        limiter.record_throttle(0.5)
+        
+        if scraper.make_request(url) is not None or not (scraper.last_failure or {}).get('deferred'):
+            print("❌ La petición debía diferirse por Retry-After")
+            return False
+        
+        # Vencido el Retry-After la prueba del semiabierto debe salir y cerrar el circuito
+        time.sleep(0.6)
+        if scraper.make_request(url) is None or scraper.breaker.state != CircuitBreaker.CLOSED:
+            print(f"❌ El circuito quedó en {scraper.breaker.state}")
+            return False
+        
+        print("✅ El circuito se cerró tras el Retry-After")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error en prueba de circuito: {e}")
+        return False
+    finally:
+        server.shutdown()
+
 def test_file_generation():
     """Probar generación de archivos"""
     print("🔍 Probando generación de archivos...")
@@ -171,6 +226,7 @@ def main():
     tests = [
         ("Conexión a Base de Datos", test_database_connection),
         ("Inicialización de Scrapers", test_scrapers_initialization),
+        ("Circuito y Retry-After", test_breaker_retry_after),
         ("Generación de Archivos", test_file_generation),
         ("Scraper Individual", test_single_scraper),
     ]
@@ -0,0 +1,131 @@
+"""
+Canonicalización de URLs de noticias
+
+Colapsa las variantes de una misma URL (http/https, www, puerto por defecto,
+barra final, parámetros de seguimiento, fragmentos) en una sola forma antes de
+descargarla y antes de insertarla, ya que `url UNIQUE` compara cadenas tal cual.
+Las fuentes conocidas imponen el esquema y host de su base_url y pueden agregar
+reglas propias en NewsSources.SOURCES[...]['url_rules'], p. ej. quitar la
+versión AMP (strip_amp) donde se sabe que /amp/ no es parte de una ruta real.
+"""
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from config import NewsSources
+
+if TYPE_CHECKING:
+    # database.py importa este módulo; bs4 solo hace falta en los workers que parsean
+    from bs4 import BeautifulSoup
+
+# Parámetros de seguimiento que nunca cambian el contenido
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', '_ga', '_gl',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Variante AMP al final de la ruta (/nota/amp/ o /nota/amp) y su parámetro ?amp=1,
+# solo con la regla strip_amp de la fuente
+AMP_PARAMS = {'amp'}
+AMP_SUFFIX_RE = re.compile(r'/amp/?$')
+MULTIPLE_SLASHES_RE = re.compile(r'/{2,}')
+
+
+def _host_key(host: str, port: int) -> Tuple[str, int]:
+    return (host[4:] if host.startswith('www.') else host), port
+
+
+@lru_cache(maxsize=8)
+def _source_index(sources: Tuple[Tuple[str, str], ...]) -> Dict[Tuple[str, int], Tuple[str, str, str]]:
+    """(host sin www, puerto) -> (clave de fuente, esquema, netloc) según cada base_url"""
+    index = {}
+    for source_key, base_url in sources:
+        parts = urlsplit(base_url)
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or '').lower()
+        port = parts.port or DEFAULT_PORTS.get(scheme)
+        index[_host_key(host, port)] = (source_key, scheme, parts.netloc.lower())
+    return index
+
+
+def _find_source(scheme: str, host: str, port: Optional[int]):
+    # Las base_url pueden cambiar en tiempo de ejecución (pruebas de carga)
+    index = _source_index(tuple((key, s['base_url']) for key, s in NewsSources.SOURCES.items()))
+    if port is None:
+        # Sin puerto explícito vale cualquiera de los esquemas por defecto
+        for default_port in (DEFAULT_PORTS.get(scheme), 443, 80):
+            match = index.get(_host_key(host, default_port))
+            if match:
+                return match
+        return None
+    return index.get(_host_key(host, port))
+
+
+def canonicalize_url(url: str) -> str:
+    """Forma canónica de una URL http(s); cualquier otra cosa se devuelve igual"""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    rules = {}
+    source = _find_source(scheme, host, port)
+    if source:
+        source_key, scheme, netloc = source
+        rules = NewsSources.SOURCES[source_key].get('url_rules', {})
+    else:
+        netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+
+    path = MULTIPLE_SLASHES_RE.sub('/', parts.path) or '/'
+    if rules.get('strip_amp'):
+        path = AMP_SUFFIX_RE.sub('/', path)
+    last_segment = path.rsplit('/', 1)[-1]
+    if rules.get('trailing_slash') and last_segment and '.' not in last_segment:
+        path += '/'
+
+    strip_params = TRACKING_PARAMS.union(rules.get('strip_params', ()))
+    if rules.get('strip_amp'):
+        strip_params |= AMP_PARAMS
+    params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in strip_params and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query = urlencode(sorted(params))
+
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def canonical_url_from_soup(soup: 'BeautifulSoup', url: str,
+                            accept: Callable[[str], bool] = None) -> str:
+    """URL declarada por la página (rel=canonical u og:url) si es del mismo sitio
+
+    `accept` descarta además candidatas que no sirven como URL del artículo
+    (p. ej. sitios que ponen la portada como canonical de todas sus páginas).
+    """
+    fallback = canonicalize_url(url)
+    candidates = []
+    link = soup.find('link', rel='canonical')
+    if link and link.get('href'):
+        candidates.append(link['href'])
+    og_url = soup.find('meta', {'property': 'og:url'})
+    if og_url and og_url.get('content'):
+        candidates.append(og_url['content'])
+
+    fallback_host = _host_key(urlsplit(fallback).hostname or '', 0)
+    for candidate in candidates:
+        canonical = canonicalize_url(urljoin(url, candidate))
+        # Un canonical hacia otro dominio (agregadores, sindicación) no reemplaza la URL
+        if _host_key(urlsplit(canonical).hostname or '', 0) != fallback_host:
+            continue
+        if accept is None or accept(canonical):
+            return canonical
+    return fallback
@@ -0,0 +1,195 @@
+"""
+Registro de URLs reclamadas para que cada artículo se descargue una sola vez en el cluster
+"""
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, Tuple
+
+from config import DistributedConfig
+from redis_client import get_redis, redis_key
+
+logger = logging.getLogger(__name__)
+
+
+class LocalUrlRegistry:
+    """Registro en memoria, válido para un solo proceso
+
+    Con los mismos TTL que el registro en Redis (reclamo, completada y fallos):
+    en un worker de larga vida las entradas vencidas se purgan y la memoria no
+    crece sin límite.
+    """
+
+    # Segundos entre purgas de entradas vencidas
+    PURGE_INTERVAL = 60
+
+    def __init__(self, claim_ttl: int = None, done_ttl: int = None, failure_ttl: int = None):
+        self.claim_ttl = claim_ttl or DistributedConfig.URL_CLAIM_TTL
+        self.done_ttl = done_ttl or DistributedConfig.URL_DONE_TTL
+        self.failure_ttl = failure_ttl or DistributedConfig.URL_FAILURE_TTL
+        # url -> vencimiento (y cantidad de fallos en _failures)
+        self._claimed: Dict[str, float] = {}
+        self._done: Dict[str, float] = {}
+        self._failures: Dict[str, Tuple[int, float]] = {}
+        self._next_purge = time.monotonic() + self.PURGE_INTERVAL
+        self._lock = threading.Lock()
+
+    def _purge(self, now: float):
+        if now < self._next_purge:
+            return
+        self._next_purge = now + self.PURGE_INTERVAL
+        for entries in (self._claimed, self._done):
+            for url in [url for url, expires in entries.items() if expires <= now]:
+                del entries[url]
+        for url in [url for url, (_, expires) in self._failures.items() if expires <= now]:
+            del self._failures[url]
+
+    def claim(self, url: str) -> bool:
+        """Reclamar una URL; False si ya está reclamada o completada"""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            if self._done.get(url, 0) > now or self._claimed.get(url, 0) > now:
+                return False
+            self._claimed[url] = now + self.claim_ttl
+            return True
+
+    def complete(self, url: str):
+        """Marcar una URL como procesada"""
+        with self._lock:
+            self._claimed.pop(url, None)
+            self._done[url] = time.monotonic() + self.done_ttl
+            self._failures.pop(url, None)
+
+    def release(self, url: str):
+        """Liberar una URL reclamada para que otro intento la procese"""
+        with self._lock:
+            self._claimed.pop(url, None)
+
+    def is_done(self, url: str) -> bool:
+        return self._done.get(url, 0) > time.monotonic()
+
+    def record_failure(self, url: str, permanent: bool = False):
+        """Contar una ejecución fallida; un fallo permanente (404/410) la descarta de inmediato"""
+        now = time.monotonic()
+        with self._lock:
+            step = DistributedConfig.URL_MAX_FAILURES if permanent else 1
+            failures, expires = self._failures.get(url, (0, 0))
+            if expires <= now:
+                failures = 0
+            # Como el EXPIRE de Redis: cada fallo renueva el plazo
+            self._failures[url] = (failures + step, now + self.failure_ttl)
+
+    def is_dead(self, url: str) -> bool:
+        """True si la URL acumuló demasiados fallos para volver a intentarla"""
+        failures, expires = self._failures.get(url, (0, 0))
+        return expires > time.monotonic() and failures >= DistributedConfig.URL_MAX_FAILURES
+
+
+class RedisUrlRegistry:
+    """Registro compartido en Redis: reclamo con TTL, completado y liberación atómicos"""
+
+    # Reclamar solo si no está completada y nadie más la tiene
+    CLAIM_SCRIPT = """
+    if redis.call('EXISTS', KEYS[2]) == 1 then
+        return 0
+    end
+    if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+        return 1
+    end
+    return 0
+    """
+
+    # Completar, olvidar fallos previos y soltar el reclamo si sigue siendo nuestro
+    COMPLETE_SCRIPT = """
+    redis.call('SET', KEYS[2], '1', 'EX', ARGV[2])
+    redis.call('DEL', KEYS[3])
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        redis.call('DEL', KEYS[1])
+    end
+    return 1
+    """
+
+    RELEASE_SCRIPT = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, client, claim_ttl: int = None, done_ttl: int = None):
+        self.client = client
+        self.claim_ttl = claim_ttl or DistributedConfig.URL_CLAIM_TTL
+        self.done_ttl = done_ttl or DistributedConfig.URL_DONE_TTL
+        # Identificador de este dueño para no liberar reclamos ajenos
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._claim = client.register_script(self.CLAIM_SCRIPT)
+        self._complete = client.register_script(self.COMPLETE_SCRIPT)
+        self._release = client.register_script(self.RELEASE_SCRIPT)
+
+    def _keys(self, url: str):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return [redis_key('url', 'claim', digest), redis_key('url', 'done', digest),
+                redis_key('url', 'fail', digest)]
+
+    def claim(self, url: str) -> bool:
+        try:
+            return bool(self._claim(keys=self._keys(url)[:2], args=[self.owner, self.claim_ttl]))
+        except Exception as e:
+            # Si Redis falla es preferible un duplicado a perder la noticia
+            logger.warning(f"Error reclamando URL en Redis ({url}): {e}")
+            return True
+
+    def complete(self, url: str):
+        try:
+            self._complete(keys=self._keys(url), args=[self.owner, self.done_ttl])
+        except Exception as e:
+            logger.warning(f"Error marcando URL como completada en Redis ({url}): {e}")
+
+    def release(self, url: str):
+        try:
+            self._release(keys=self._keys(url)[:1], args=[self.owner])
+        except Exception as e:
+            logger.warning(f"Error liberando URL en Redis ({url}): {e}")
+
+    def is_done(self, url: str) -> bool:
+        try:
+            return bool(self.client.exists(self._keys(url)[1]))
+        except Exception:
+            return False
+
+    def record_failure(self, url: str, permanent: bool = False):
+        step = DistributedConfig.URL_MAX_FAILURES if permanent else 1
+        try:
+            pipe = self.client.pipeline()
+            pipe.incrby(self._keys(url)[2], step)
+            pipe.expire(self._keys(url)[2], DistributedConfig.URL_FAILURE_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Error registrando fallo de URL en Redis ({url}): {e}")
+
+    def is_dead(self, url: str) -> bool:
+        try:
+            failures = self.client.get(self._keys(url)[2])
+            return int(failures or 0) >= DistributedConfig.URL_MAX_FAILURES
+        except Exception:
+            return False
+
+
+def create_url_registry(current=None):
+    """Registro en Redis si está habilitado y disponible; si no, uno local
+
+    Con `current` se conserva el registro actual salvo que sea local y Redis haya
+    vuelto: entonces se pasa al registro compartido.
+    """
+    if isinstance(current, RedisUrlRegistry):
+        return current
+    if DistributedConfig.URL_CLAIMS_ENABLED:
+        client = get_redis()
+        if client is not None:
+            return RedisUrlRegistry(client)
+    return current or LocalUrlRegistry()
@@ -0,0 +1,337 @@
+"""
+Archivo WARC de las páginas de artículos descargadas
+
+Cada respuesta de artículo que pasa por extract_news_data se guarda como un
+registro WARC/1.1 'response' comprimido como un frame zstd independiente (gzip
+por registro si zstandard no está instalado), en archivos que rotan al llegar a
+WARC_MAX_FILE_MB. Un índice SQLite (url -> archivo, offset, largo) permite leer
+cualquier registro con un seek, sin descomprimir el resto del archivo.
+
+Con este corpus local un error de extracción se corrige volviendo a procesar las
+páginas guardadas, a velocidad de disco, en vez de volver a visitar los sitios.
+Cada proceso escribe en su propio archivo; el índice es compartido.
+
+Uso:
+    python warc_archive.py --stats          # registros, URLs y bytes por fuente
+    python warc_archive.py --get URL        # HTML de la última versión archivada
+"""
+import base64
+import gzip
+import hashlib
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from http.client import responses
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import metrics
+from config import ArchiveConfig
+from page_cache import CachedPage
+
+try:
+    import zstandard
+except ImportError:  # zstandard es opcional: gzip por registro
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.sqlite3'
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    url TEXT NOT NULL,
+    fuente TEXT,
+    archivo TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_url ON records (url, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_records_fuente ON records (fuente, url);
+"""
+
+# La última versión archivada de cada URL (la más reciente gana). El rowid crece
+# con cada registro indexado, sea cual sea el proceso o archivo que lo escribió
+LATEST_RECORDS_SQL = """
+SELECT r.rowid, r.url, r.fuente, r.archivo, r.offset, r.length FROM records r
+WHERE r.fetched_at = (SELECT MAX(fetched_at) FROM records WHERE url = r.url)
+"""
+
+# El cuerpo ya viene decodificado por requests: estas cabeceras ya no lo describen
+DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+
+def payload_digest(content: bytes) -> str:
+    """WARC-Payload-Digest (SHA-1 en base32)"""
+    return 'sha1:' + base64.b32encode(hashlib.sha1(content).digest()).decode('ascii')
+
+
+WARC_DATE_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def _warc_date(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(WARC_DATE_FORMAT)
+
+
+def _parse_warc_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, WARC_DATE_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+
+def _warc_record(warc_type: str, headers: Dict[str, str], block: bytes) -> bytes:
+    lines = ['WARC/1.1', f'WARC-Type: {warc_type}',
+             f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>']
+    lines.extend(f'{name}: {value}' for name, value in headers.items())
+    lines.append(f'Content-Length: {len(block)}')
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+
+
+def response_record(page: CachedPage, digest: str) -> bytes:
+    """Registro 'response' con la respuesta HTTP reconstruida de una CachedPage"""
+    http_lines = [f'HTTP/1.1 {page.status} {responses.get(page.status, "")}'.rstrip()]
+    http_lines.extend(f'{name}: {value}' for name, value in page.headers.items()
+                      if name.lower() not in DROPPED_HEADERS)
+    http_lines.append(f'Content-Length: {len(page.content)}')
+    http_block = ('\r\n'.join(http_lines) + '\r\n\r\n').encode('latin-1', errors='replace') + page.content
+    return _warc_record('response', {
+        'WARC-Date': _warc_date(page.fetched_at),
+        'WARC-Target-URI': page.url,
+        'WARC-Payload-Digest': digest,
+        'Content-Type': 'application/http; msgtype=response',
+    }, http_block)
+
+
+def parse_response_record(record: bytes) -> CachedPage:
+    """CachedPage a partir de un registro 'response' ya descomprimido"""
+    warc_head, _, rest = record.partition(b'\r\n\r\n')
+    warc_headers = _parse_headers(warc_head.decode('utf-8').split('\r\n')[1:])
+    block = rest[:int(warc_headers['content-length'])]
+    http_head, _, body = block.partition(b'\r\n\r\n')
+    http_lines = http_head.decode('latin-1').split('\r\n')
+    status = int(http_lines[0].split()[1])
+    headers = {name: value for name, value in
+               (line.split(': ', 1) for line in http_lines[1:] if ': ' in line)}
+    return CachedPage(warc_headers['warc-target-uri'], body, status, headers,
+                      fetched_at=_parse_warc_date(warc_headers.get('warc-date')))
+
+
+def _parse_headers(lines) -> Dict[str, str]:
+    headers = {}
+    for line in lines:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+def decompress_record(data: bytes, file_name: str) -> bytes:
+    """Descomprimir un registro según la extensión de su archivo"""
+    if file_name.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard no está instalado, no se puede leer {file_name}")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def read_record(directory: str, file_name: str, offset: int, length: int) -> CachedPage:
+    """Leer un registro con un seek a su offset (no necesita el índice)"""
+    with open(os.path.join(directory, file_name), 'rb') as archive:
+        archive.seek(offset)
+        data = archive.read(length)
+    return parse_response_record(decompress_record(data, file_name))
+
+
+class WarcArchive:
+    """Escritor y lector de los archivos WARC y su índice"""
+
+    def __init__(self, directory: str = None, max_file_bytes: int = None):
+        self.directory = directory or ArchiveConfig.DIR
+        self.max_file_bytes = max_file_bytes or ArchiveConfig.MAX_FILE_BYTES
+        os.makedirs(self.directory, exist_ok=True)
+        if zstandard is not None:
+            self.extension = '.warc.zst'
+            self._compressor = zstandard.ZstdCompressor(level=ArchiveConfig.ZSTD_LEVEL)
+        else:
+            self.extension = '.warc.gz'
+            self._compressor = None
+        self._file = None
+        self._file_name = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+        # Varios procesos escriben el índice: WAL y espera en vez de fallar por bloqueo
+        self._index = sqlite3.connect(os.path.join(self.directory, INDEX_FILE),
+                                      timeout=30, check_same_thread=False)
+        self._index.execute('PRAGMA journal_mode=WAL')
+        self._index.executescript(INDEX_SCHEMA)
+
+    def compress(self, record: bytes) -> bytes:
+        if self._compressor is not None:
+            return self._compressor.compress(record)
+        return gzip.compress(record)
+
+    def write(self, page: CachedPage, source: str = None) -> bool:
+        """Archivar una respuesta; False si es igual a la última versión archivada o falla"""
+        digest = payload_digest(page.content)
+        try:
+            with self._lock:
+                latest = self._index.execute(
+                    "SELECT digest FROM records WHERE url = ? ORDER BY fetched_at DESC LIMIT 1",
+                    (page.url,)
+                ).fetchone()
+                if latest is not None and latest[0] == digest:
+                    metrics.WARC_RECORDS.labels(fuente=source or '', resultado='duplicada').inc()
+                    return False
+                data = self.compress(response_record(page, digest))
+                archive = self._current_file()
+                offset = archive.tell()
+                archive.write(data)
+                archive.flush()
+                with self._index:
+                    self._index.execute(
+                        "INSERT INTO records (url, fuente, archivo, offset, length, fetched_at, digest) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (page.url, source, self._file_name, offset, len(data),
+                         datetime.fromtimestamp(page.fetched_at, timezone.utc).isoformat(), digest)
+                    )
+        except (OSError, sqlite3.Error) as e:
+            metrics.WARC_RECORDS.labels(fuente=source or '', resultado='error').inc()
+            logger.warning(f"No se pudo archivar {page.url}: {e}")
+            return False
+        metrics.WARC_RECORDS.labels(fuente=source or '', resultado='escrita').inc()
+        metrics.WARC_BYTES.labels(fuente=source or '').inc(len(data))
+        return True
+
+    def _current_file(self):
+        """Archivo abierto del proceso; rota al superar max_file_bytes"""
+        if self._file is not None and self._file.tell() >= self.max_file_bytes:
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            self._sequence += 1
+            stamp = datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+            self._file_name = (f"noticias-{stamp}-{socket.gethostname()}-{os.getpid()}-"
+                               f"{self._sequence:05d}{self.extension}")
+            self._file = open(os.path.join(self.directory, self._file_name), 'ab')
+            self._file.write(self.compress(_warc_record('warcinfo', {
+                'WARC-Date': _warc_date(datetime.now(timezone.utc).timestamp()),
+                'WARC-Filename': self._file_name,
+                'Content-Type': 'application/warc-fields',
+            }, b'software: news-scraper\r\nformat: WARC File Format 1.1\r\n')))
+        return self._file
+
+    def read_at(self, file_name: str, offset: int, length: int) -> CachedPage:
+        """Leer un registro con un seek a su offset"""
+        return read_record(self.directory, file_name, offset, length)
+
+    def read(self, url: str) -> Optional[CachedPage]:
+        """Última versión archivada de una URL (None si no está)"""
+        row = self._index.execute(
+            "SELECT archivo, offset, length FROM records WHERE url = ? ORDER BY fetched_at DESC LIMIT 1",
+            (url,)
+        ).fetchone()
+        return None if row is None else self.read_at(*row)
+
+    def _latest_query(self, sources: List[str] = None, after: int = None) -> Tuple[str, list]:
+        sql, params = LATEST_RECORDS_SQL, []
+        if sources:
+            sql += f" AND r.fuente IN ({', '.join('?' for _ in sources)})"
+            params.extend(sources)
+        if after is not None:
+            sql += " AND r.rowid > ?"
+            params.append(after)
+        return sql, params
+
+    def iter_latest(self, sources: List[str] = None,
+                    after: int = None) -> Iterator[Tuple[str, str, str, int, int, int]]:
+        """(url, fuente, archivo, offset, largo, rowid) de la última versión de cada URL
+
+        En orden de indexación (rowid); `after` continúa después del rowid de un
+        registro ya procesado. Con workers archivando a la vez, lo indexado
+        después del corte siempre queda detrás: una página nueva o una versión
+        más reciente se procesa al continuar, aunque caiga en un archivo anterior.
+        """
+        sql, params = self._latest_query(sources, after)
+        for rowid, url, fuente, archivo, offset, length in self._index.execute(
+                sql + " ORDER BY r.rowid", params):
+            yield url, fuente, archivo, offset, length, rowid
+
+    def count_latest(self, sources: List[str] = None, after: int = None) -> int:
+        sql, params = self._latest_query(sources, after)
+        return self._index.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        rows = self._index.execute(
+            "SELECT COALESCE(fuente, ''), COUNT(*), COUNT(DISTINCT url), SUM(length) FROM records GROUP BY fuente"
+        ).fetchall()
+        return {source: {'registros': records, 'urls': urls, 'bytes': size}
+                for source, records, urls, size in rows}
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._index.close()
+
+
+_archive: Optional[WarcArchive] = None
+_archive_pid: Optional[int] = None
+_archive_lock = threading.Lock()
+
+
+def get_warc_archive() -> Optional[WarcArchive]:
+    """Archivo WARC del proceso (None si WARC_ARCHIVE_ENABLED=false)
+
+    Se vuelve a crear tras un fork para que cada worker escriba su propio archivo.
+    """
+    global _archive, _archive_pid
+
+    if not ArchiveConfig.ENABLED:
+        return None
+    if _archive is None or _archive_pid != os.getpid():
+        with _archive_lock:
+            if _archive is None or _archive_pid != os.getpid():
+                _archive = WarcArchive()
+                _archive_pid = os.getpid()
+    return _archive
+
+
+def main(argv=None) -> int:
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Archivo WARC de páginas de noticias')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--stats', action='store_true', help='Registros y bytes por fuente')
+    group.add_argument('--get', metavar='URL', help='Escribir en stdout el HTML archivado de una URL')
+    parser.add_argument('--dir', default=None, help='Directorio del archivo (por defecto WARC_DIR)')
+    args = parser.parse_args(argv)
+
+    archive = WarcArchive(args.dir)
+    try:
+        if args.stats:
+            for source, stats in sorted(archive.stats().items()):
+                print(f"{source or '(sin fuente)'}: {stats['registros']} registros, "
+                      f"{stats['urls']} URLs, {stats['bytes'] / 1024 / 1024:.1f} MB")
+            return 0
+        page = archive.read(args.get)
+        if page is None:
+            print(f"{args.get} no está archivada", file=sys.stderr)
+            return 1
+        sys.stdout.buffer.write(page.content)
+        return 0
+    finally:
+        archive.close()
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())